@@ -6,36 +6,181 @@ The most comprehensive security verification system for BSC token sniping
 
 import asyncio
 import aiohttp
+import functools
 import json
 import logging
 import time
-from typing import Dict, Any, List, Tuple, Optional
-from web3 import Web3
+from collections import deque, OrderedDict
+from typing import Dict, Any, Awaitable, Callable, List, Tuple, Optional
+from web3 import Web3, AsyncWeb3
 from colorama import Fore, Style
+from multicall import Multicall3
+from v2_quote import V2QuoteEngine, PANCAKE_V2_FEE_BPS, PANCAKE_V2_INIT_CODE_HASH
+from goplus_batcher import GoPlusBatcher
+from security_verdict_cache import SecurityVerdictCache, DEFINITE_REJECTIONS
+from bytecode_fingerprint import BytecodeFingerprintIndex, fingerprint_bytecode
+from selector_scanner import SelectorScanner
+from local_evm import HoneypotSimulator
+from provider_guard import ProviderGuard, CircuitOpenError
+
+# Checks that need only local math or on-chain reads run before any remote API
+DEFAULT_SECURITY_STAGES = [
+    ['similarity', 'selectors', 'liquidity', 'honeypot', 'ownership', 'holders', 'taxes', 'whales', 'dev_wallets', 'rugpull'],
+    ['goplus', 'contract']
+]
+
+# Checks whose result depends on the pair - every other check is shared across a token's pairs
+# (the honeypot simulation always routes through the router's WBNB pair, whichever pair was found)
+PAIR_DEPENDENT_CHECKS = ('liquidity',)
+
+# detailed_results key -> (failure reason prefix, default reason, log label)
+SIMPLE_CHECK_LABELS = {
+    'similarity': ("Bytecode", "Matches a known-bad contract", "Contract similarity"),
+    'selectors': ("Functions", "Blacklisted function found", "Selector scan"),
+    'holders': ("Holders", "Failed check", "Holder analysis"),
+    'ownership': ("Ownership", "Not renounced", "Ownership check"),
+    'taxes': ("Tax", "High taxes", "Tax analysis"),
+    'whales': ("Whales", "High concentration", "Whale analysis"),
+    'dev_wallets': ("Dev wallets", "Suspicious activity", "Dev wallet analysis"),
+    'rugpull': ("Rugpull risk", "Suspicious patterns", "Rugpull analysis")
+}
+
+# Hosts every token check talks to - connections are opened ahead of the first token
+SECURITY_API_HOSTS = [
+    "https://api.gopluslabs.io",
+    "https://api.bscscan.com",
+    "https://api.binance.com"
+]
 
 class AdvancedSecurityEngine:
-    def __init__(self, config: Dict[str, Any], web3_client: Web3):
+    def __init__(self, config: Dict[str, Any], web3_client: Web3, metadata_cache=None, reserve_book=None,
+                 price_feed=None):
         self.config = config
         self.w3 = web3_client
+        self.metadata_cache = metadata_cache
+        self.reserve_book = reserve_book
+        self.price_feed = price_feed
+        self.async_mode = isinstance(web3_client, AsyncWeb3)
+        self.multicall = Multicall3(self, config['blockchain'].get('multicall3_address'))
+        self.quote_engine = V2QuoteEngine(
+            config['blockchain']['pancakeswap_factory'],
+            config['blockchain'].get('pancakeswap_fee_bps', PANCAKE_V2_FEE_BPS),
+            config['blockchain'].get('pancakeswap_init_code_hash', PANCAKE_V2_INIT_CODE_HASH)
+        )
         self.api_keys = config['api_keys']
         self.security_config = config['security']
         self.advanced_config = config['advanced_checks']
         
-        # Initialize session for API calls
+        # One keep-alive session shared by every token check
         self.session = None
+        self.session_config = self.security_config.get('http_session', {})
+
+        # Rate limit and circuit breaker per external API
+        api_limits = self.security_config.get('api_limits', {})
+        self.api_guards = {
+            name: ProviderGuard(label, api_limits.get(name))
+            for name, label in (('goplus', 'GoPlus'), ('bscscan', 'BSCScan'), ('binance', 'Binance'))
+        }
+
+        # Concurrent GoPlus lookups share one request
+        self.goplus_batcher = GoPlusBatcher(config, self.open_session, self.api_guards['goplus'])
+
+        # Verdicts reused across pairs and restarts
+        self.verdict_cache = SecurityVerdictCache(config)
+
+        # Normalized bytecode hash -> past verdicts, so clones are judged from one eth_getCode
+        similarity_config = self.advanced_config.get('additional_security', {})
+        self.check_similarity = similarity_config.get('check_contract_similarity', False)
+        self.min_bad_matches = similarity_config.get('min_bad_clone_matches', 2)
+        self.min_bad_ratio = similarity_config.get('min_bad_clone_ratio', 0.8)
+        self.fingerprint_index = BytecodeFingerprintIndex(
+            similarity_config.get('fingerprint_index_file', 'bytecode_fingerprints.db')
+        )
+        # Blacklisted function selectors matched against the token's dispatcher
+        self.selector_scanner = SelectorScanner(config)
+
+        # Real buy-then-sell swaps executed locally against lazily fetched state
+        self.evm_simulator = HoneypotSimulator(config, web3_client, self._rpc, self.quote_engine)
+        self.evm_fallback_to_quote = self.security_config.get('evm_simulation', {}).get('fallback_to_quote', False)
+
+        # token -> runtime bytecode request, shared by every check that reads the code
+        self._code_requests: OrderedDict = OrderedDict()
+
+        # Staged, fail-fast check order
+        pipeline_config = self.security_config.get('pipeline', {})
+        self.pipeline_stages = pipeline_config.get('stages', DEFAULT_SECURITY_STAGES)
+        self.fail_fast = pipeline_config.get('fail_fast', True)
+        self.check_latencies: Dict[str, deque] = {}
+
+        # (token, pair) -> shared analysis future for concurrent callers
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        # (token, check) -> pair-independent check shared across analyses of the token's pairs
+        self._token_checks: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.check_stats = {
+            'analyses': 0,
+            'coalesced': 0,
+            'shared_checks': 0
+        }
         
         # Security check results
         self.security_results = {}
         
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        await self.open_session()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit"""
-        if self.session:
+        """Async context manager exit - the shared session stays open until close()"""
+        pass
+
+    async def open_session(self) -> aiohttp.ClientSession:
+        """Create the shared API session with a pooled keep-alive connector"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.session_config.get('max_connections', 100),
+                limit_per_host=self.session_config.get('max_connections_per_host', 20),
+                ttl_dns_cache=self.session_config.get('dns_cache_seconds', 300),
+                keepalive_timeout=self.session_config.get('keepalive_seconds', 60),
+                enable_cleanup_closed=True
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    async def warm_connections(self, hosts: Optional[List[str]] = None) -> int:
+        """Open pooled connections to the security APIs, returns how many hosts answered"""
+        session = await self.open_session()
+        hosts = hosts if hosts is not None else SECURITY_API_HOSTS
+
+        async def warm(host: str) -> bool:
+            try:
+                async with session.head(host, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                    return response.status < 500
+            except Exception as e:
+                logging.debug(f"Connection warm-up to {host} failed: {e}")
+                return False
+
+        results = await asyncio.gather(*(warm(host) for host in hosts))
+        return sum(results)
+
+    async def close(self) -> None:
+        """Close the shared API session and the caches"""
+        if self.session and not self.session.closed:
             await self.session.close()
+        self.session = None
+        self.verdict_cache.close()
+        self.fingerprint_index.close()
+
+    @property
+    def active_w3(self):
+        """Web3 client used for contract reads"""
+        return self.w3
+
+    async def _rpc(self, call):
+        """Run a Web3 call without blocking the event loop"""
+        if self.async_mode:
+            return await call()
+        return await asyncio.to_thread(call)
 
     async def comprehensive_security_check(self, token_address: str, pair_address: str) -> Tuple[bool, List[str], Dict[str, Any]]:
         """
@@ -45,250 +190,317 @@ class AdvancedSecurityEngine:
         token_address = Web3.to_checksum_address(token_address)
         pair_address = Web3.to_checksum_address(pair_address)
         
+        cached = self.verdict_cache.get(token_address, pair_address)
+        if cached is not None:
+            logging.info(f"{Fore.CYAN}♻️ Reusing cached security verdict for {token_address}{Style.RESET_ALL}")
+            return cached
+        
+        # Same token and pair requested twice at once - one analysis, every caller shares it.
+        # Other pairs of the token get their own analysis but share its pair-independent checks.
+        key = (token_address, pair_address)
+        analysis = self._in_flight.get(key)
+        if analysis is not None:
+            self.check_stats['coalesced'] += 1
+            logging.info(f"{Fore.CYAN}⏳ Joining in-flight security check for {token_address}{Style.RESET_ALL}")
+            return await asyncio.shield(analysis)
+        
+        analysis = asyncio.ensure_future(self._run_security_checks(token_address, pair_address))
+        self._in_flight[key] = analysis
+        analysis.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        self.check_stats['analyses'] += 1
+        # A cancelled caller leaves the analysis running for the others
+        return await asyncio.shield(analysis)
+
+    async def _run_security_checks(self, token_address: str, pair_address: str) -> Tuple[bool, List[str], Dict[str, Any]]:
+        """Run the check pipeline for one token and cache the verdict"""
         logging.info(f"{Fore.YELLOW}🔍 Running comprehensive security check for {token_address}{Style.RESET_ALL}")
         
         failed_reasons = []
         detailed_results = {}
         
         try:
-            # Create session if not exists
-            if not self.session:
-                self.session = aiohttp.ClientSession()
-            
-            # Run all security checks in parallel for speed
-            results = await asyncio.gather(
-                self._check_goplus_security(token_address),
-                self._check_honeypot_simulation(token_address, pair_address),
-                self._check_contract_verification(token_address),
-                self._check_liquidity_analysis(pair_address, token_address),
-                self._check_holder_analysis(token_address),
-                self._check_ownership_renounced(token_address),
-                self._check_trading_taxes(token_address),
-                self._check_whale_concentration(token_address),
-                self._check_dev_wallet_analysis(token_address),
-                self._check_rugpull_patterns(token_address),
-                return_exceptions=True
-            )
+            await self.open_session()
+            
+            checks = {
+                'goplus': lambda: self._check_goplus_security(token_address),
+                'honeypot': lambda: self._check_honeypot_simulation(token_address, pair_address),
+                'contract': lambda: self._check_contract_verification(token_address),
+                'liquidity': lambda: self._check_liquidity_analysis(pair_address, token_address),
+                'holders': lambda: self._check_holder_analysis(token_address),
+                'ownership': lambda: self._check_ownership_renounced(token_address),
+                'taxes': lambda: self._check_trading_taxes(token_address),
+                'whales': lambda: self._check_whale_concentration(token_address),
+                'dev_wallets': lambda: self._check_dev_wallet_analysis(token_address),
+                'rugpull': lambda: self._check_rugpull_patterns(token_address)
+            }
+            if self.check_similarity:
+                checks['similarity'] = lambda: self._check_contract_similarity(token_address)
+            if self.selector_scanner.enabled:
+                checks['selectors'] = lambda: self._check_blacklisted_functions(token_address)
+            for name, check in checks.items():
+                if name not in PAIR_DEPENDENT_CHECKS:
+                    checks[name] = functools.partial(self._shared_token_check, token_address, name, check)
             
-            # Process results
-            goplus_result = results[0]
-            honeypot_result = results[1]
-            contract_result = results[2]
-            liquidity_result = results[3]
-            holder_result = results[4]
-            ownership_result = results[5]
-            tax_result = results[6]
-            whale_result = results[7]
-            dev_wallet_result = results[8]
-            rugpull_result = results[9]
-            
-            # GoPlus Security Check
-            if isinstance(goplus_result, Exception):
-                failed_reasons.append(f"GoPlus API error: {str(goplus_result)}")
-                detailed_results['goplus'] = {'error': str(goplus_result)}
+            # Cheap on-chain stages first - remote APIs only for tokens that survive them
+            detailed_results['pipeline'] = await self._run_check_pipeline(checks, failed_reasons, detailed_results)
+            
+            # Final safety determination
+            is_safe = len(failed_reasons) == 0
+            
+            if is_safe:
+                logging.info(f"{Fore.GREEN}✅ Token passed all security checks: {token_address}{Style.RESET_ALL}")
+            else:
+                logging.warning(f"{Fore.RED}❌ Token failed security checks: {', '.join(failed_reasons)}{Style.RESET_ALL}")
+            
+            self.verdict_cache.put(token_address, pair_address, is_safe, failed_reasons, detailed_results)
+            self._record_fingerprint_verdict(token_address, is_safe, failed_reasons, detailed_results)
+            return is_safe, failed_reasons, detailed_results
+            
+        except Exception as e:
+            logging.error(f"Comprehensive security check error: {e}")
+            return False, [f"Security check error: {str(e)}"], {}
+
+    async def _shared_token_check(self, token_address: str, name: str, check: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a pair-independent check once for every concurrent analysis of the token
+
+        The shared run is cancelled only once every analysis waiting on it has
+        been cancelled, so fail-fast in one pair's analysis never aborts it for
+        another.
+        """
+        key = (token_address, name)
+        shared = self._token_checks.get(key)
+        if shared is None:
+            shared = {'future': asyncio.ensure_future(check()), 'waiters': 0}
+            self._token_checks[key] = shared
+            shared['future'].add_done_callback(
+                lambda _: self._token_checks.pop(key) if self._token_checks.get(key) is shared else None
+            )
+        else:
+            self.check_stats['shared_checks'] += 1
+
+        shared['waiters'] += 1
+        try:
+            return await asyncio.shield(shared['future'])
+        finally:
+            shared['waiters'] -= 1
+            if shared['waiters'] == 0 and not shared['future'].done():
+                shared['future'].cancel()
+
+    async def _run_check_pipeline(self, checks: Dict[str, Any], failed_reasons: List[str],
+                                  detailed_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Run checks stage by stage, cancelling the rest once any check fails
+
+        Returns per-check latency plus which checks were cancelled or never started.
+        """
+        stages = [[name for name in stage if name in checks] for stage in self.pipeline_stages]
+        staged = {name for stage in stages for name in stage}
+        # Checks missing from the configured stages still run, last
+        stages.append([name for name in checks if name not in staged])
+
+        latencies = {}
+        cancelled = []
+        skipped = []
+        stages_run = 0
+        for stage in filter(None, stages):
+            if failed_reasons and self.fail_fast:
+                skipped.extend(stage)
+                continue
+            stages_run += 1
+            started = time.perf_counter()
+            tasks = {asyncio.ensure_future(checks[name]()): name for name in stage}
+            pending = set(tasks)
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        name = tasks[task]
+                        latencies[name] = round((time.perf_counter() - started) * 1000, 1)
+                        self.check_latencies.setdefault(name, deque(maxlen=100)).append(latencies[name])
+                        result = task.exception() or task.result()
+                        failed_reasons.extend(self._record_check_result(name, result, detailed_results))
+
+                    if failed_reasons and self.fail_fast and pending:
+                        cancelled.extend(tasks[task] for task in pending)
+                        for task in pending:
+                            task.cancel()
+                        await asyncio.gather(*pending, return_exceptions=True)
+                        pending = set()
+            finally:
+                # Caller cancelled - take the in-flight checks down too
+                for task in pending:
+                    task.cancel()
+
+        return {
+            'latency_ms': latencies,
+            'stages_run': stages_run,
+            'cancelled': cancelled,
+            'skipped': skipped
+        }
+
+    def get_api_guard_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Rate limiter and circuit breaker state per external API"""
+        return {name: guard.get_metrics() for name, guard in self.api_guards.items()}
+
+    def get_check_latency_metrics(self) -> Dict[str, Dict[str, float]]:
+        """p50/p95 latency per check over recent runs"""
+        metrics = {}
+        for name, latencies in self.check_latencies.items():
+            ordered = sorted(latencies)
+            metrics[name] = {
+                'p50_ms': ordered[len(ordered) // 2],
+                'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                'runs': len(ordered)
+            }
+        return metrics
+
+    def _record_check_result(self, name: str, result: Any, detailed_results: Dict[str, Any]) -> List[str]:
+        """Store one check's result and return its failure reasons"""
+        failed_reasons = []
+        
+        # GoPlus Security Check
+        if name == 'goplus':
+            if isinstance(result, Exception):
+                failed_reasons.append(f"GoPlus API error: {str(result)}")
+                detailed_results['goplus'] = {'error': str(result)}
             else:
-                goplus_safe, goplus_reasons, goplus_data = goplus_result
+                goplus_safe, goplus_reasons, goplus_data = result
                 detailed_results['goplus'] = goplus_data
                 if not goplus_safe:
                     failed_reasons.extend([f"GoPlus: {r}" for r in goplus_reasons])
-            
-            # Honeypot Simulation
-            if isinstance(honeypot_result, Exception):
-                failed_reasons.append(f"Honeypot check error: {str(honeypot_result)}")
-                detailed_results['honeypot'] = {'error': str(honeypot_result)}
+        
+        # Honeypot Simulation
+        elif name == 'honeypot':
+            if isinstance(result, Exception):
+                failed_reasons.append(f"Honeypot check error: {str(result)}")
+                detailed_results['honeypot'] = {'error': str(result)}
             else:
-                if len(honeypot_result) >= 2:
-                    honeypot_safe, honeypot_reason = honeypot_result[0], honeypot_result[1]
+                if len(result) >= 2:
+                    honeypot_safe, honeypot_reason = result[0], result[1]
                     detailed_results['honeypot'] = {'safe': honeypot_safe, 'reason': honeypot_reason}
+                    if len(result) >= 3:
+                        detailed_results['honeypot'].update(result[2])
                     if not honeypot_safe:
                         failed_reasons.append(f"Honeypot: {honeypot_reason}")
                 else:
                     failed_reasons.append("Honeypot check failed: Invalid result")
-            
-            # Contract Verification
-            if isinstance(contract_result, Exception):
-                logging.warning(f"Contract verification error: {str(contract_result)}")
-                detailed_results['contract'] = {'error': str(contract_result)}
+        
+        # Contract Verification
+        elif name == 'contract':
+            if isinstance(result, Exception):
+                logging.warning(f"Contract verification error: {str(result)}")
+                detailed_results['contract'] = {'error': str(result)}
             else:
-                if len(contract_result) >= 2:
-                    contract_safe, contract_data = contract_result[0], contract_result[1]
+                if len(result) >= 2:
+                    contract_safe, contract_data = result[0], result[1]
                     detailed_results['contract'] = contract_data
                     if self.security_config['require_verified_contract'] and not contract_safe:
                         failed_reasons.append("Contract not verified")
                 else:
                     detailed_results['contract'] = {'error': 'Invalid contract result'}
-            
-            # Liquidity Analysis
-            if isinstance(liquidity_result, Exception):
-                failed_reasons.append(f"Liquidity check error: {str(liquidity_result)}")
-                detailed_results['liquidity'] = {'error': str(liquidity_result)}
+        
+        # Liquidity Analysis
+        elif name == 'liquidity':
+            if isinstance(result, Exception):
+                failed_reasons.append(f"Liquidity check error: {str(result)}")
+                detailed_results['liquidity'] = {'error': str(result)}
             else:
-                if len(liquidity_result) >= 2:
-                    liquidity_safe, liquidity_data = liquidity_result[0], liquidity_result[1]
+                if len(result) >= 2:
+                    liquidity_safe, liquidity_data = result[0], result[1]
                     detailed_results['liquidity'] = liquidity_data
                     if not liquidity_safe:
                         reason = liquidity_data.get('reason', 'Failed check') if isinstance(liquidity_data, dict) else 'Failed check'
                         failed_reasons.append(f"Liquidity: {reason}")
                 else:
                     failed_reasons.append("Liquidity check failed: Invalid result")
-            
-            # Holder Analysis
-            if isinstance(holder_result, Exception):
-                logging.warning(f"Holder analysis error: {str(holder_result)}")
-                detailed_results['holders'] = {'error': str(holder_result)}
-            else:
-                holder_safe, holder_data = holder_result
-                detailed_results['holders'] = holder_data
-                if not holder_safe:
-                    failed_reasons.append(f"Holders: {holder_data.get('reason', 'Failed check')}")
-            
-            # Ownership Check
-            if isinstance(ownership_result, Exception):
-                logging.warning(f"Ownership check error: {str(ownership_result)}")
-                detailed_results['ownership'] = {'error': str(ownership_result)}
-            else:
-                ownership_safe, ownership_data = ownership_result
-                detailed_results['ownership'] = ownership_data
-                if not ownership_safe:
-                    failed_reasons.append(f"Ownership: {ownership_data.get('reason', 'Not renounced')}")
-            
-            # Tax Analysis
-            if isinstance(tax_result, Exception):
-                logging.warning(f"Tax analysis error: {str(tax_result)}")
-                detailed_results['taxes'] = {'error': str(tax_result)}
-            else:
-                tax_safe, tax_data = tax_result
-                detailed_results['taxes'] = tax_data
-                if not tax_safe:
-                    failed_reasons.append(f"Tax: {tax_data.get('reason', 'High taxes')}")
-            
-            # Whale Concentration
-            if isinstance(whale_result, Exception):
-                logging.warning(f"Whale analysis error: {str(whale_result)}")
-                detailed_results['whales'] = {'error': str(whale_result)}
-            else:
-                whale_safe, whale_data = whale_result
-                detailed_results['whales'] = whale_data
-                if not whale_safe:
-                    failed_reasons.append(f"Whales: {whale_data.get('reason', 'High concentration')}")
-            
-            # Dev Wallet Analysis
-            if isinstance(dev_wallet_result, Exception):
-                logging.warning(f"Dev wallet analysis error: {str(dev_wallet_result)}")
-                detailed_results['dev_wallets'] = {'error': str(dev_wallet_result)}
-            else:
-                dev_safe, dev_data = dev_wallet_result
-                detailed_results['dev_wallets'] = dev_data
-                if not dev_safe:
-                    failed_reasons.append(f"Dev wallets: {dev_data.get('reason', 'Suspicious activity')}")
-            
-            # Rugpull Pattern Analysis
-            if isinstance(rugpull_result, Exception):
-                logging.warning(f"Rugpull analysis error: {str(rugpull_result)}")
-                detailed_results['rugpull'] = {'error': str(rugpull_result)}
-            else:
-                rugpull_safe, rugpull_data = rugpull_result
-                detailed_results['rugpull'] = rugpull_data
-                if not rugpull_safe:
-                    failed_reasons.append(f"Rugpull risk: {rugpull_data.get('reason', 'Suspicious patterns')}")
-            
-            # Final safety determination
-            is_safe = len(failed_reasons) == 0
-            
-            if is_safe:
-                logging.info(f"{Fore.GREEN}✅ Token passed all security checks: {token_address}{Style.RESET_ALL}")
+        
+        # Remaining checks share one shape: (safe, data with an optional reason)
+        else:
+            label, default_reason, log_label = SIMPLE_CHECK_LABELS[name]
+            if isinstance(result, Exception):
+                logging.warning(f"{log_label} error: {str(result)}")
+                detailed_results[name] = {'error': str(result)}
             else:
-                logging.warning(f"{Fore.RED}❌ Token failed security checks: {', '.join(failed_reasons)}{Style.RESET_ALL}")
-            
-            return is_safe, failed_reasons, detailed_results
-            
-        except Exception as e:
-            logging.error(f"Comprehensive security check error: {e}")
-            return False, [f"Security check error: {str(e)}"], {}
+                check_safe, check_data = result
+                detailed_results[name] = check_data
+                if not check_safe:
+                    failed_reasons.append(f"{label}: {check_data.get('reason', default_reason)}")
+        
+        return failed_reasons
 
     async def _check_goplus_security(self, token_address: str) -> Tuple[bool, List[str], Dict[str, Any]]:
         """Check token security using GoPlus API"""
         try:
-            # GoPlus API endpoint for BSC
-            url = f"https://api.gopluslabs.io/api/v1/token_security/56"
-            params = {'contract_addresses': token_address}
-            
-            headers = {}
-            if self.api_keys.get('goplus_app_key'):
-                headers['X-API-KEY'] = self.api_keys['goplus_app_key']
-            
-            async with self.session.get(url, params=params, headers=headers, timeout=10) as response:
-                if response.status == 200:
-                    data = await response.json()
+            status, token_data = await self.goplus_batcher.lookup(token_address)
+            if status == 200:
+                if token_data is not None:
+                    failed_reasons = []
                     
-                    if 'result' in data and token_address.lower() in data['result']:
-                        token_data = data['result'][token_address.lower()]
-                        
-                        failed_reasons = []
-                        
-                        # Check critical security issues
-                        if token_data.get('is_honeypot', '0') == '1':
-                            failed_reasons.append("Detected as honeypot")
-                        
-                        if token_data.get('is_blacklisted', '0') == '1':
-                            failed_reasons.append("Token is blacklisted")
-                        
-                        if token_data.get('is_whitelisted', '0') == '0' and token_data.get('is_open_source', '0') == '0':
-                            failed_reasons.append("Contract not open source")
-                        
-                        # Enhanced tax checking with error handling
-                        try:
-                            buy_tax_str = str(token_data.get('buy_tax', '0')).strip()
-                            sell_tax_str = str(token_data.get('sell_tax', '0')).strip()
-                            
-                            buy_tax = float(buy_tax_str) if buy_tax_str else 0.0
-                            sell_tax = float(sell_tax_str) if sell_tax_str else 0.0
-                        except (ValueError, TypeError):
-                            # If we can't parse taxes, assume reasonable defaults
-                            buy_tax = 5.0
-                            sell_tax = 5.0
-                            logging.warning(f"Could not parse tax data for {token_address}, using defaults")
-                        
-                        max_buy_tax = self.config['trading'].get('max_buy_tax', 10)
-                        max_sell_tax = self.config['trading'].get('max_sell_tax', 10)
-                        
-                        if buy_tax > max_buy_tax:
-                            failed_reasons.append(f"High buy tax: {buy_tax}%")
-                        
-                        if sell_tax > max_sell_tax:
-                            failed_reasons.append(f"High sell tax: {sell_tax}%")
-                        
-                        # Check for suspicious functions
-                        if token_data.get('is_mintable', '0') == '1':
-                            failed_reasons.append("Token is mintable")
-                        
-                        if token_data.get('can_take_back_ownership', '0') == '1':
-                            failed_reasons.append("Ownership can be reclaimed")
-                        
-                        # Smart holder analysis - focus on concentration, not just count
-                        holder_count = int(token_data.get('holder_count', '0'))
-                        min_holders = self.config['trading']['min_holders']
-                        
-                        # Only check holder count if token isn't brand new
-                        if holder_count > 0 and holder_count < min_holders:
-                            # For new tokens, check concentration instead of absolute count
-                            top_holders = token_data.get('top10_holders', [])
-                            if top_holders:
-                                max_concentration = max([float(h.get('percent', '0')) for h in top_holders if h.get('percent')])
-                                if max_concentration > 50:  # If any holder has >50%
-                                    failed_reasons.append(f"High holder concentration: {max_concentration}%")
-                            else:
-                                # Only reject if very few holders AND no concentration data
-                                if holder_count < 3:
-                                    failed_reasons.append(f"Too few holders: {holder_count}")
+                    # Check critical security issues
+                    if token_data.get('is_honeypot', '0') == '1':
+                        failed_reasons.append("Detected as honeypot")
+                    
+                    if token_data.get('is_blacklisted', '0') == '1':
+                        failed_reasons.append("Token is blacklisted")
+                    
+                    if token_data.get('is_whitelisted', '0') == '0' and token_data.get('is_open_source', '0') == '0':
+                        failed_reasons.append("Contract not open source")
+                    
+                    # Enhanced tax checking with error handling
+                    try:
+                        buy_tax_str = str(token_data.get('buy_tax', '0')).strip()
+                        sell_tax_str = str(token_data.get('sell_tax', '0')).strip()
                         
-                        return len(failed_reasons) == 0, failed_reasons, token_data
-                    else:
-                        return False, ["Token data not found in GoPlus"], {}
+                        buy_tax = float(buy_tax_str) if buy_tax_str else 0.0
+                        sell_tax = float(sell_tax_str) if sell_tax_str else 0.0
+                    except (ValueError, TypeError):
+                        # If we can't parse taxes, assume reasonable defaults
+                        buy_tax = 5.0
+                        sell_tax = 5.0
+                        logging.warning(f"Could not parse tax data for {token_address}, using defaults")
+                    
+                    max_buy_tax = self.config['trading'].get('max_buy_tax', 10)
+                    max_sell_tax = self.config['trading'].get('max_sell_tax', 10)
+                    
+                    if buy_tax > max_buy_tax:
+                        failed_reasons.append(f"High buy tax: {buy_tax}%")
+                    
+                    if sell_tax > max_sell_tax:
+                        failed_reasons.append(f"High sell tax: {sell_tax}%")
+                    
+                    # Check for suspicious functions
+                    if token_data.get('is_mintable', '0') == '1':
+                        failed_reasons.append("Token is mintable")
+                    
+                    if token_data.get('can_take_back_ownership', '0') == '1':
+                        failed_reasons.append("Ownership can be reclaimed")
+                    
+                    # Smart holder analysis - focus on concentration, not just count
+                    holder_count = int(token_data.get('holder_count', '0'))
+                    min_holders = self.config['trading']['min_holders']
+                    
+                    # Only check holder count if token isn't brand new
+                    if holder_count > 0 and holder_count < min_holders:
+                        # For new tokens, check concentration instead of absolute count
+                        top_holders = token_data.get('top10_holders', [])
+                        if top_holders:
+                            max_concentration = max([float(h.get('percent', '0')) for h in top_holders if h.get('percent')])
+                            if max_concentration > 50:  # If any holder has >50%
+                                failed_reasons.append(f"High holder concentration: {max_concentration}%")
+                        else:
+                            # Only reject if very few holders AND no concentration data
+                            if holder_count < 3:
+                                failed_reasons.append(f"Too few holders: {holder_count}")
+                    
+                    return len(failed_reasons) == 0, failed_reasons, token_data
                 else:
-                    logging.warning(f"GoPlus API returned status {response.status}")
-                    return False, [f"GoPlus API error: {response.status}"], {}
+                    return False, ["Token data not found in GoPlus"], {}
+            else:
+                logging.warning(f"GoPlus API returned status {status}")
+                return False, [f"GoPlus API error: {status}"], {}
                     
+        except CircuitOpenError as e:
+            # Same provider behind the fallback key - fail fast instead
+            return False, [str(e)], {}
         except Exception as e:
             logging.error(f"GoPlus security check error: {e}")
             # Try fallback API if available
@@ -306,7 +518,8 @@ class AdvancedSecurityEngine:
             params = {'contract_addresses': token_address}
             headers = {'X-API-KEY': fallback_key}
             
-            async with self.session.get(url, params=params, headers=headers, timeout=15) as response:
+            async with self.api_guards['goplus'], self.session.get(url, params=params, headers=headers, timeout=15) as response:
+                self.api_guards['goplus'].check_status(response.status, response.headers)
                 if response.status == 200:
                     data = await response.json()
                     if 'result' in data and token_address.lower() in data['result']:
@@ -327,49 +540,62 @@ class AdvancedSecurityEngine:
             logging.error(f"Fallback API also failed: {e}")
             return False, ["All security APIs unavailable"], {}
 
-    async def _check_honeypot_simulation(self, token_address: str, pair_address: str) -> Tuple[bool, str]:
+    async def _check_honeypot_simulation(self, token_address: str, pair_address: str) -> Tuple:
         """Simulate buy/sell to detect honeypots"""
         try:
-            # Get router contract
-            router_abi = [
-                {
-                    "inputs": [
-                        {"internalType": "uint256", "name": "amountIn", "type": "uint256"},
-                        {"internalType": "address[]", "name": "path", "type": "address[]"}
+            # Pair the router would route WBNB -> token through
+            wbnb_address = Web3.to_checksum_address(self.config['blockchain']['wbnb_address'])
+            router_pair = self.quote_engine.pair_for(wbnb_address, token_address)
+            
+            if self.evm_simulator.enabled:
+                try:
+                    return await self._check_honeypot_evm(token_address, router_pair)
+                except Exception as e:
+                    if not self.evm_fallback_to_quote:
+                        return False, f"EVM simulation failed: {str(e)}"
+                    logging.warning(f"EVM honeypot simulation failed, using reserve math: {e}")
+            pair_contract = self.w3.eth.contract(
+                address=router_pair,
+                abi=[{
+                    "constant": True,
+                    "inputs": [],
+                    "name": "getReserves",
+                    "outputs": [
+                        {"name": "_reserve0", "type": "uint112"},
+                        {"name": "_reserve1", "type": "uint112"},
+                        {"name": "_blockTimestampLast", "type": "uint32"}
                     ],
-                    "name": "getAmountsOut",
-                    "outputs": [{"internalType": "uint256[]", "name": "amounts", "type": "uint256[]"}],
-                    "stateMutability": "view",
                     "type": "function"
-                }
-            ]
-            
-            router_address = self.config['blockchain']['pancakeswap_router']
-            router_contract = self.w3.eth.contract(
-                address=Web3.to_checksum_address(router_address),
-                abi=router_abi
+                }]
             )
             
-            wbnb_address = self.config['blockchain']['wbnb_address']
             test_amount = int(self.security_config['honeypot_simulation_amount'] * 10**18)
             
-            # Test buy simulation
+            # Test buy simulation - same integer math as router getAmountsOut, one reserves read
             try:
-                buy_path = [wbnb_address, token_address]
-                buy_amounts = router_contract.functions.getAmountsOut(test_amount, buy_path).call()
+                reserves = self.reserve_book.get_reserves(router_pair) if self.reserve_book else None
+                if reserves is None:
+                    reserves, = await self.multicall.aggregate([(pair_contract, 'getReserves', [])])
+                if reserves is None:
+                    return False, "Cannot simulate buy transaction"
                 
-                if len(buy_amounts) < 2 or buy_amounts[1] == 0:
+                token0, _ = self.quote_engine.sort_tokens(wbnb_address, token_address)
+                if token0 == wbnb_address:
+                    bnb_reserve, token_reserve = reserves[0], reserves[1]
+                else:
+                    bnb_reserve, token_reserve = reserves[1], reserves[0]
+                
+                buy_amount = self.quote_engine.get_amount_out(test_amount, bnb_reserve, token_reserve)
+                if buy_amount == 0:
                     return False, "Cannot simulate buy transaction"
                 
                 # Test sell simulation
-                sell_path = [token_address, wbnb_address]
-                sell_amounts = router_contract.functions.getAmountsOut(buy_amounts[1], sell_path).call()
-                
-                if len(sell_amounts) < 2 or sell_amounts[1] == 0:
+                sell_amount = self.quote_engine.get_amount_out(buy_amount, token_reserve, bnb_reserve)
+                if sell_amount == 0:
                     return False, "Cannot simulate sell transaction"
                 
                 # Calculate price impact
-                price_impact = (test_amount - sell_amounts[1]) / test_amount * 100
+                price_impact = (test_amount - sell_amount) / test_amount * 100
                 
                 if price_impact > 90:  # More than 90% loss
                     return False, f"Extreme price impact: {price_impact:.1f}%"
@@ -383,6 +609,24 @@ class AdvancedSecurityEngine:
             logging.error(f"Honeypot simulation error: {e}")
             raise e
 
+    async def _check_honeypot_evm(self, token_address: str, pair_address: str) -> Tuple[bool, str, Dict[str, Any]]:
+        """Buy and sell through the router in the local EVM and compare measured taxes to the limits"""
+        test_amount = int(self.security_config['honeypot_simulation_amount'] * 10**18)
+        simulation = await self.evm_simulator.simulate(token_address, pair_address, test_amount)
+        
+        if simulation['honeypot']:
+            return False, simulation['reason'], simulation
+        
+        max_buy_tax = self.config['trading']['max_buy_tax']
+        max_sell_tax = self.config['trading']['max_sell_tax']
+        if simulation['buy_tax'] > max_buy_tax:
+            return False, f"Simulated buy tax {simulation['buy_tax']:.1f}% > {max_buy_tax}%", simulation
+        if simulation['sell_tax'] > max_sell_tax:
+            return False, f"Simulated sell tax {simulation['sell_tax']:.1f}% > {max_sell_tax}%", simulation
+        
+        return True, (f"EVM simulation passed (buy tax {simulation['buy_tax']:.1f}%, sell tax {simulation['sell_tax']:.1f}%, "
+                      f"gas {simulation['buy_gas']}/{simulation['sell_gas']})"), simulation
+
     async def _check_contract_verification(self, token_address: str) -> Tuple[bool, Dict[str, Any]]:
         """Check if contract is verified on BSCScan"""
         try:
@@ -396,7 +640,8 @@ class AdvancedSecurityEngine:
                 'apikey': api_key
             }
             
-            async with self.session.get(url, params=params, timeout=10) as response:
+            async with self.api_guards['bscscan'], self.session.get(url, params=params, timeout=10) as response:
+                self.api_guards['bscscan'].check_status(response.status, response.headers)
                 if response.status == 200:
                     data = await response.json()
                     
@@ -459,10 +704,23 @@ class AdvancedSecurityEngine:
                 abi=pair_abi
             )
             
-            # Get reserves and tokens
-            reserves = pair_contract.functions.getReserves().call()
-            token0 = pair_contract.functions.token0().call()
-            token1 = pair_contract.functions.token1().call()
+            # Get reserves and tokens in one multicall - token0/token1 only on a cache miss
+            pair_tokens = self.metadata_cache.get_pair(pair_address) if self.metadata_cache else None
+            if pair_tokens:
+                token0, token1 = pair_tokens
+                reserves = self.reserve_book.get_reserves(pair_address) if self.reserve_book else None
+                if reserves is None:
+                    reserves, = await self.multicall.aggregate([(pair_contract, 'getReserves', [])])
+            else:
+                reserves, token0, token1 = await self.multicall.aggregate([
+                    (pair_contract, 'getReserves', []),
+                    (pair_contract, 'token0', []),
+                    (pair_contract, 'token1', [])
+                ])
+                if self.metadata_cache and token0 is not None and token1 is not None:
+                    self.metadata_cache.put_pair(pair_address, token0, token1)
+            if reserves is None or token0 is None or token1 is None:
+                raise ValueError("Could not read pair reserves")
             
             wbnb_address = Web3.to_checksum_address(self.config['blockchain']['wbnb_address'])
             
@@ -479,7 +737,7 @@ class AdvancedSecurityEngine:
             else:
                 return False, {'reason': 'No BNB pair found', 'bnb_reserve': 0}
             
-            # Get BNB price (approximate)
+            # BNB price from the on-chain feed - no HTTP call
             bnb_price_usd = await self._get_bnb_price()
             liquidity_usd = bnb_reserve * bnb_price_usd * 2  # Both sides of pool
             
@@ -490,7 +748,8 @@ class AdvancedSecurityEngine:
                 'bnb_reserve': bnb_reserve,
                 'token_reserve': token_reserve,
                 'liquidity_usd': liquidity_usd,
-                'bnb_price_usd': bnb_price_usd
+                'bnb_price_usd': bnb_price_usd,
+                'bnb_price_stale': self.price_feed.is_stale() if self.price_feed else None
             }
             
             if liquidity_usd < min_liquidity:
@@ -520,6 +779,81 @@ class AdvancedSecurityEngine:
             logging.error(f"Holder analysis error: {e}")
             raise e
 
+    async def _get_contract_code(self, token_address: str) -> bytes:
+        """Runtime bytecode of a token, fetched once for every check that needs it"""
+        request = self._code_requests.get(token_address)
+        if request is None:
+            request = asyncio.ensure_future(self._rpc(lambda: self.w3.eth.get_code(token_address)))
+            # A failed fetch is retried by the next caller
+            request.add_done_callback(
+                lambda f: f.cancelled() or f.exception() is None or self._code_requests.pop(token_address, None)
+            )
+            self._code_requests[token_address] = request
+            if len(self._code_requests) > 256:
+                self._code_requests.popitem(last=False)
+        return bytes(await asyncio.shield(request))
+
+    async def _check_contract_similarity(self, token_address: str) -> Tuple[bool, Dict[str, Any]]:
+        """Reject clones of contracts that were already rejected or rugged"""
+        try:
+            code = await self._get_contract_code(token_address)
+            fingerprint = fingerprint_bytecode(code)
+            if fingerprint is None:
+                return False, {'fingerprint': None, 'reason': 'No contract code at token address'}
+
+            entry = self.fingerprint_index.lookup(fingerprint)
+            is_bad, reason = self.fingerprint_index.known_bad(entry, self.min_bad_matches, self.min_bad_ratio)
+            result_data = {
+                'fingerprint': fingerprint,
+                'code_size': len(code),
+                'known_clones': entry['tokens'] if entry else 0,
+                'reason': reason or ('Clone with a clean history' if entry else 'New contract')
+            }
+            if is_bad:
+                logging.warning(f"{Fore.RED}🧬 {token_address} is a known-bad clone: {reason}{Style.RESET_ALL}")
+            return not is_bad, result_data
+
+        except Exception as e:
+            logging.error(f"Contract similarity error: {e}")
+            raise e
+
+    async def _check_blacklisted_functions(self, token_address: str) -> Tuple[bool, Dict[str, Any]]:
+        """Reject tokens whose dispatcher exposes a blacklisted function"""
+        try:
+            code = await self._get_contract_code(token_address)
+            result_data = self.selector_scanner.scan(code)
+            blacklisted = result_data['blacklisted']
+            if blacklisted:
+                result_data['reason'] = f"Exposes blacklisted functions: {', '.join(blacklisted)}"
+            else:
+                result_data['reason'] = f"No blacklisted functions in {result_data['selector_count']} selectors"
+            return not blacklisted, result_data
+
+        except Exception as e:
+            logging.error(f"Selector scan error: {e}")
+            raise e
+
+    def _record_fingerprint_verdict(self, token_address: str, is_safe: bool, failed_reasons: List[str],
+                                    detailed_results: Dict[str, Any]) -> None:
+        """File the verdict under the token's bytecode fingerprint"""
+        fingerprint = detailed_results.get('similarity', {}).get('fingerprint')
+        if not fingerprint:
+            return
+        # A clone match is the index's own output, not new evidence about the bytecode
+        clone_prefix = f"{SIMPLE_CHECK_LABELS['similarity'][0]}:"
+        reasons = [reason for reason in failed_reasons if not reason.startswith(clone_prefix)]
+        if not is_safe and not reasons:
+            return
+        definite = any(marker in reason for reason in reasons for marker in DEFINITE_REJECTIONS)
+        self.fingerprint_index.record_verdict(fingerprint, token_address, is_safe, reasons, definite)
+
+    def record_trade_outcome(self, token_address: str, outcome: str) -> None:
+        """Attach a closed trade's outcome to the token's fingerprint"""
+        try:
+            self.fingerprint_index.record_outcome(token_address, outcome)
+        except Exception as e:
+            logging.warning(f"Could not record trade outcome for {token_address}: {e}")
+
     async def _check_ownership_renounced(self, token_address: str) -> Tuple[bool, Dict[str, Any]]:
         """Check if contract ownership is renounced"""
         try:
@@ -540,7 +874,9 @@ class AdvancedSecurityEngine:
             )
             
             try:
-                owner = token_contract.functions.owner().call()
+                owner, = await self.multicall.aggregate([(token_contract, 'owner', [])])
+                if owner is None:
+                    raise ValueError("owner() call failed")
                 is_renounced = owner == "0x0000000000000000000000000000000000000000"
                 
                 result_data = {
@@ -629,14 +965,27 @@ class AdvancedSecurityEngine:
             raise e
 
     async def _get_bnb_price(self) -> float:
-        """Get current BNB price in USD"""
+        """Get current BNB price in USD - on-chain feed first, Binance only without it"""
+        if self.price_feed:
+            if self.price_feed.get_price() is None:
+                try:
+                    await self.price_feed.refresh()
+                except Exception as e:
+                    logging.warning(f"BNB price feed refresh failed: {e}")
+            price = self.price_feed.get_price()
+            if price is not None:
+                if self.price_feed.is_stale():
+                    logging.warning(f"{Fore.YELLOW}⚠️ BNB price is {self.price_feed.get_age():.0f}s old{Style.RESET_ALL}")
+                return price
+
         try:
             url = "https://api.binance.com/api/v3/ticker/price?symbol=BNBUSDT"
-            async with self.session.get(url, timeout=5) as response:
+            async with self.api_guards['binance'], self.session.get(url, timeout=5) as response:
+                self.api_guards['binance'].check_status(response.status, response.headers)
                 if response.status == 200:
                     data = await response.json()
                     return float(data['price'])
-                else:
-                    return 300.0  # Fallback price
-        except:
-            return 300.0  # Fallback price
\ No newline at end of file
+        except Exception as e:
+            logging.warning(f"Binance BNB price request failed: {e}")
+        logging.warning(f"{Fore.YELLOW}⚠️ No BNB price available, using $300 fallback{Style.RESET_ALL}")
+        return 300.0  # Fallback price
\ No newline at end of file
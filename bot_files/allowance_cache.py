@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Local Allowance Cache
+Tracks our ERC20 allowances from our own receipts so sells never query allowance()
+"""
+
+import json
+import logging
+from typing import Dict, Any, Optional
+
+from hexbytes import HexBytes
+from web3 import Web3
+
+APPROVAL_TOPIC = "0x8c5be1e5ebec7d5bd14f71427d1e84f3dd0314c0f7b2291e5b200ac8c7c3b925"
+MAX_UINT256 = 2**256 - 1
+
+class AllowanceCache:
+    def __init__(self, cache_file: str = 'allowances.json'):
+        self.cache_file = cache_file
+        self.allowances: Dict[str, int] = {}
+        self.load()
+
+    @staticmethod
+    def _key(token_address: str, spender_address: str) -> str:
+        return f"{Web3.to_checksum_address(token_address)}:{Web3.to_checksum_address(spender_address)}"
+
+    def get(self, token_address: str, spender_address: str) -> Optional[int]:
+        """Known allowance, None if we have never seen one"""
+        return self.allowances.get(self._key(token_address, spender_address))
+
+    def set(self, token_address: str, spender_address: str, amount: int) -> None:
+        self.allowances[self._key(token_address, spender_address)] = amount
+        self.save()
+
+    def update_from_receipt(self, receipt: Dict[str, Any], owner_address: str) -> bool:
+        """Apply Approval events emitted for owner_address, True if any were found"""
+        owner = Web3.to_checksum_address(owner_address)
+        found = False
+        for log in receipt.get('logs', []):
+            topics = [HexBytes(topic) for topic in log.get('topics', [])]
+            if len(topics) != 3 or topics[0] != HexBytes(APPROVAL_TOPIC):
+                continue
+            if Web3.to_checksum_address(topics[1][-20:]) != owner:
+                continue
+            spender = Web3.to_checksum_address(topics[2][-20:])
+            self.allowances[self._key(log['address'], spender)] = int.from_bytes(HexBytes(log['data'])[:32], 'big')
+            found = True
+        if found:
+            self.save()
+        return found
+
+    def consume(self, token_address: str, spender_address: str, amount: int) -> None:
+        """Reduce a cached allowance after a transferFrom that emitted no Approval"""
+        key = self._key(token_address, spender_address)
+        current = self.allowances.get(key)
+        if current is None or current == MAX_UINT256:
+            return
+        self.allowances[key] = max(0, current - amount)
+        self.save()
+
+    def save(self) -> None:
+        """Persist allowances so restarts keep instant exits"""
+        try:
+            with open(self.cache_file, 'w') as f:
+                json.dump({key: str(value) for key, value in self.allowances.items()}, f, indent=2)
+        except Exception as e:
+            logging.error(f"Error saving allowance cache: {e}")
+
+    def load(self) -> None:
+        """Load persisted allowances"""
+        try:
+            with open(self.cache_file, 'r') as f:
+                self.allowances = {key: int(value) for key, value in json.load(f).items()}
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, ValueError, TypeError, AttributeError):
+            logging.warning("Corrupted allowance cache, starting fresh")
+            self.allowances = {}
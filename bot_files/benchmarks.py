@@ -0,0 +1,952 @@
+#!/usr/bin/env python3
+"""
+Performance Benchmarks for BSC Sniper Bot 2.0
+Runs the bot's RPC paths against a local stub JSON-RPC node with injected latency
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from aiohttp import web
+from eth_abi import encode, decode
+from eth_account import Account
+from eth_utils import keccak
+from web3 import Web3
+
+from advanced_security_engine import AdvancedSecurityEngine, DEFAULT_SECURITY_STAGES
+from blockchain_interface import BlockchainInterface
+from bytecode_fingerprint import fingerprint_bytecode
+from selector_scanner import SelectorScanner
+from v2_quote import V2QuoteEngine
+
+WBNB_ADDRESS = "0xbb4CdB9CBd36B01bD1cBaEBF2De08d9173bc095c"
+TOKEN_ADDRESS = "0x1111111111111111111111111111111111111111"
+
+# Router getAmountOut/getAmountIn outputs, see the file's "source" field
+V2_QUOTE_VECTORS_FILE = "v2_quote_vectors.json"
+
+# ERC20 surface plus mint(address,uint256)
+STUB_SELECTORS = ['a9059cbb', '70a08231', '095ea7b3', '23b872dd', '18160ddd', '40c10f19']
+
+
+def stub_runtime_code(selectors: List[str] = STUB_SELECTORS, immutable: bytes = b'\x00' * 32,
+                      metadata_seed: bytes = b'\x00') -> bytes:
+    """Solidity-shaped runtime code: selector dispatcher, a PUSH32 immutable and a CBOR metadata trailer"""
+    code = bytes.fromhex('6080604052') + bytes.fromhex('60003560e01c')
+    for index, selector in enumerate(selectors):
+        # DUP1 PUSH4 selector EQ PUSH2 dest JUMPI
+        code += bytes([0x80, 0x63]) + bytes.fromhex(selector) + bytes([0x14, 0x61]) + (0x100 + index).to_bytes(2, 'big') + bytes([0x57])
+    code += bytes([0x7f]) + immutable + bytes([0x50, 0x00])
+    metadata = bytes([0xa2, 0x64]) + b'ipfs' + bytes([0x58, 0x22]) + keccak(metadata_seed) + bytes([0x64]) + b'solc' + bytes([0x43, 0x00, 0x08, 0x13])
+    return code + metadata + len(metadata).to_bytes(2, 'big')
+
+
+class StubRPCServer:
+    """Minimal BSC JSON-RPC node served from a background thread
+
+    Every HTTP request is delayed by `latency` seconds before it is answered,
+    which is enough to make blocking vs concurrent RPC usage visible.
+    """
+
+    def __init__(self, latency: float = 0.05, port: int = 0,
+                 slow_probability: float = 0.0, slow_latency: float = 0.5):
+        self.latency = latency
+        self.slow_probability = slow_probability
+        self.slow_latency = slow_latency
+        self.port = port
+        self.block_number = 1_000_000
+        self.request_count = 0
+        self.call_count = 0
+        self.block_gas_prices_gwei: List[float] = []
+        self.handlers: Dict[str, Callable[[List[Any]], Any]] = {
+            'web3_clientVersion': lambda params: 'stub-rpc/1.0',
+            'net_version': lambda params: '56',
+            'eth_chainId': lambda params: hex(56),
+            'eth_blockNumber': lambda params: hex(self.block_number),
+            'eth_gasPrice': lambda params: hex(3 * 10**9),
+            'eth_getBalance': lambda params: hex(10**18),
+            'eth_getTransactionCount': lambda params: hex(0),
+            'eth_getBlockByNumber': lambda params: self._block(params[0], len(params) > 1 and params[1]),
+            'eth_call': lambda params: self._eth_call(params[0]),
+            'eth_getStorageAt': lambda params: '0x' + self.storage.get((params[0].lower(), int(params[1], 16)), 0).to_bytes(32, 'big').hex(),
+            'eth_getCode': lambda params: '0x' + self.contract_code.get(params[0].lower(), stub_runtime_code()).hex(),
+        }
+        self.contract_code: Dict[str, bytes] = {}
+        self.storage: Dict[Tuple[str, int], int] = {}
+        # Handlers returning a full {'result'|'error'} body
+        self.raw_handlers: Dict[str, Callable[[List[Any]], Dict[str, Any]]] = {}
+        self._loop = None
+        self._runner = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/"
+
+    def start(self) -> 'StubRPCServer':
+        """Start serving in a background thread"""
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=10)
+        return self
+
+    def stop(self) -> None:
+        """Stop the background server"""
+        if self._loop and self._runner:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=10)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+
+    def _serve(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        self._add_routes(app)
+        self._runner = web.AppRunner(app)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, '127.0.0.1', self.port)
+        self._loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    def _add_routes(self, app: web.Application) -> None:
+        app.router.add_post('/', self._handle)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.request_count += 1
+        payload = await request.json()
+        slow = random.random() < self.slow_probability
+        await asyncio.sleep(self.slow_latency if slow else self.latency)
+        if isinstance(payload, list):
+            return web.json_response([self._respond(item) for item in payload])
+        return web.json_response(self._respond(payload))
+
+    def _respond(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        raw_handler = self.raw_handlers.get(item['method'])
+        if raw_handler is not None:
+            return {'jsonrpc': '2.0', 'id': item.get('id'), **raw_handler(item.get('params', []))}
+        handler = self.handlers.get(item['method'])
+        if handler is None:
+            return {'jsonrpc': '2.0', 'id': item.get('id'), 'error': {'code': -32601, 'message': 'Method not found'}}
+        return {'jsonrpc': '2.0', 'id': item.get('id'), 'result': handler(item.get('params', []))}
+
+    def _block(self, number: str = 'latest', full_transactions: bool = False) -> Dict[str, Any]:
+        block_number = self.block_number if not number.startswith('0x') else int(number, 16)
+        transactions = []
+        for index, gwei in enumerate(self.block_gas_prices_gwei if full_transactions else []):
+            transactions.append({
+                'hash': '0x' + f"{block_number:032x}{index:032x}",
+                'blockNumber': hex(block_number),
+                'transactionIndex': hex(index),
+                'from': '0x' + '00' * 20,
+                'to': '0x' + '00' * 20,
+                'gas': hex(21000),
+                'gasPrice': hex(int(gwei * 10**9)),
+                'nonce': hex(index),
+                'value': hex(0),
+                'input': '0x',
+                'type': '0x0',
+            })
+        return {
+            'number': hex(block_number),
+            'hash': '0x' + '11' * 32,
+            'parentHash': '0x' + '22' * 32,
+            'timestamp': hex(int(time.time())),
+            'gasLimit': hex(140_000_000),
+            'gasUsed': hex(0),
+            'miner': '0x' + '00' * 20,
+            'extraData': '0x' + '00' * 97,
+            'transactions': transactions,
+        }
+
+    def _eth_call(self, tx: Dict[str, Any]) -> str:
+        self.call_count += 1
+        data = tx.get('data') or tx.get('input') or '0x'
+        selector = data[:10]
+        responses = {
+            '0x06fdde03': lambda: encode(['string'], ['Stub Token']),
+            '0x95d89b41': lambda: encode(['string'], ['STUB']),
+            '0x313ce567': lambda: encode(['uint8'], [18]),
+            '0x18160ddd': lambda: encode(['uint256'], [10**27]),
+            '0x70a08231': lambda: encode(['uint256'], [10**21]),
+            '0x8da5cb5b': lambda: encode(['address'], ['0x' + '00' * 20]),
+            '0x0dfe1681': lambda: encode(['address'], [WBNB_ADDRESS]),
+            '0xd21220a7': lambda: encode(['address'], [TOKEN_ADDRESS]),
+            '0x0902f1ac': lambda: encode(['uint112', 'uint112', 'uint32'], [50 * 10**18, 10**26, int(time.time())]),
+        }
+        if selector == '0x82ad56cb':
+            return self._aggregate3(data)
+        encoded = responses.get(selector, lambda: b'\x00' * 32)()
+        return '0x' + encoded.hex()
+
+    def _aggregate3(self, data: str) -> str:
+        """Multicall3.aggregate3 - answer each inner call with the same stub responses"""
+        self.call_count -= 1
+        calls, = decode(['(address,bool,bytes)[]'], bytes.fromhex(data[10:]))
+        results = [
+            (True, bytes.fromhex(self._eth_call({'to': target, 'data': '0x' + call_data.hex()})[2:]))
+            for target, _, call_data in calls
+        ]
+        return '0x' + encode(['(bool,bytes)[]'], [results]).hex()
+
+
+class StubNetwork:
+    """Shared chain behind several stub nodes
+
+    Blocks are produced every `block_time` seconds of wall time. A transaction
+    is included in the first block produced after it propagates from the node
+    it was sent to, and other nodes learn it by gossip `gossip_delay` later.
+    """
+
+    def __init__(self, block_time: float = 0.5, gossip_delay: float = 0.05):
+        self.block_time = block_time
+        self.gossip_delay = gossip_delay
+        self.genesis = time.time()
+        self.first_block = 1_000_000
+        self._produced = 0
+        self._lock = threading.Lock()
+        # tx hash -> first time any node saw it / when the block producer has it
+        self.first_seen: Dict[str, float] = {}
+        self.arrivals: Dict[str, float] = {}
+        # block offset -> tx hashes, tx hash -> block offset
+        self.blocks: Dict[int, List[str]] = {}
+        self.included: Dict[str, int] = {}
+
+    def head(self) -> int:
+        """Current block number, producing any blocks that are due"""
+        with self._lock:
+            due = int((time.time() - self.genesis) / self.block_time)
+            while self._produced < due:
+                self._produced += 1
+                produced_at = self.block_timestamp(self._produced)
+                block = [tx_hash for tx_hash, arrival in self.arrivals.items()
+                         if arrival <= produced_at and tx_hash not in self.included]
+                for tx_hash in block:
+                    self.included[tx_hash] = self._produced
+                self.blocks[self._produced] = block
+            return self.first_block + self._produced
+
+    def block_timestamp(self, offset: int) -> float:
+        return self.genesis + offset * self.block_time
+
+    def submit(self, raw_transaction: str, propagation_delay: float) -> Dict[str, Any]:
+        """A node received a raw transaction - returns the JSON-RPC result or error"""
+        tx_hash = '0x' + keccak(bytes.fromhex(raw_transaction[2:])).hex()
+        now = time.time()
+        with self._lock:
+            seen = self.first_seen.setdefault(tx_hash, now)
+            arrival = min(self.arrivals.get(tx_hash, float('inf')), now + propagation_delay)
+            self.arrivals[tx_hash] = arrival
+        if now - seen >= self.gossip_delay:
+            return {'error': {'code': -32000, 'message': 'already known'}}
+        return {'result': tx_hash}
+
+    def inclusion_time(self, tx_hash: str) -> Optional[float]:
+        offset = self.included.get(tx_hash)
+        return self.block_timestamp(offset) if offset is not None else None
+
+    def attach(self, server: 'StubRPCServer', propagation_delay: float) -> 'StubRPCServer':
+        """Serve this network's chain from a stub node"""
+        def block(params):
+            number = self.head() if params[0] == 'latest' else int(params[0], 16)
+            tx_hashes = self.blocks.get(number - self.first_block, [])
+            return dict(server._block(hex(number)), transactions=tx_hashes)
+
+        def receipt(params):
+            tx_hash = params[0]
+            self.head()
+            offset = self.included.get(tx_hash)
+            if offset is None:
+                return None
+            return {
+                'transactionHash': tx_hash,
+                'transactionIndex': hex(self.blocks[offset].index(tx_hash)),
+                'blockHash': '0x' + '11' * 32,
+                'blockNumber': hex(self.first_block + offset),
+                'from': '0x' + '00' * 20,
+                'to': '0x' + '00' * 20,
+                'cumulativeGasUsed': hex(21000),
+                'gasUsed': hex(21000),
+                'effectiveGasPrice': hex(3 * 10**9),
+                'contractAddress': None,
+                'logs': [],
+                'logsBloom': '0x' + '00' * 256,
+                'status': '0x1',
+                'type': '0x0',
+            }
+
+        server.handlers.update({
+            'eth_blockNumber': lambda params: hex(self.head()),
+            'eth_getBlockByNumber': block,
+            'eth_getTransactionReceipt': receipt,
+        })
+        server.raw_handlers['eth_sendRawTransaction'] = lambda params: self.submit(params[0], propagation_delay)
+        return server
+
+
+class StubAPIServer(StubRPCServer):
+    """HTTP API stub (GoPlus/BSCScan/Binance style GETs)
+
+    The first request on each new connection pays `handshake_latency` on top
+    of `latency`, standing in for the TCP and TLS handshakes.
+    """
+
+    def __init__(self, latency: float = 0.05, handshake_latency: float = 0.1, port: int = 0):
+        super().__init__(latency=latency, port=port)
+        self.handshake_latency = handshake_latency
+        self.status_code = 200
+        self.connection_count = 0
+        self._connections = set()
+
+    def _add_routes(self, app: web.Application) -> None:
+        app.router.add_route('*', '/{tail:.*}', self._handle)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.request_count += 1
+        peer = request.transport.get_extra_info('peername')
+        if peer not in self._connections:
+            self._connections.add(peer)
+            self.connection_count += 1
+            await asyncio.sleep(self.handshake_latency)
+        await asyncio.sleep(self.latency)
+        if self.status_code != 200:
+            return web.json_response({'code': 0, 'message': 'stub error'}, status=self.status_code,
+                                     headers={'Retry-After': '0.1'} if self.status_code == 429 else None)
+        # GoPlus style: one entry per requested contract
+        tokens = [token for token in request.query.get('contract_addresses', '').split(',') if token]
+        return web.json_response({'code': 1, 'status': '1', 'result': {token.lower(): {'is_honeypot': '0'} for token in tokens}})
+
+
+def _bench_config(rpc_url: str, **blockchain_overrides) -> Dict[str, Any]:
+    """Load config.json pointed at the stub node"""
+    with open('config.json', 'r') as f:
+        config = json.load(f)
+    config['blockchain']['rpc_endpoints'] = [rpc_url]
+    config['blockchain']['metadata_cache'] = {'cache_file': ':memory:'}
+    config['security']['verdict_cache'] = {'cache_file': ':memory:'}
+    config['advanced_checks']['additional_security']['fingerprint_index_file'] = ':memory:'
+    config['blockchain'].update(blockchain_overrides)
+    return config
+
+
+class _BlockingBlockchainInterface(BlockchainInterface):
+    """Pre-async behaviour: every Web3 call runs inline on the event loop"""
+
+    async def _rpc(self, call):
+        return call()
+
+
+async def _pair_analyses_per_second(blockchain: BlockchainInterface, pairs: int) -> float:
+    pair_address = Web3.to_checksum_address('0x' + '22' * 20)
+
+    async def analyze():
+        await asyncio.gather(
+            blockchain.get_token_info(TOKEN_ADDRESS),
+            blockchain.calculate_token_price_bnb(TOKEN_ADDRESS, pair_address)
+        )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(analyze() for _ in range(pairs)))
+    elapsed = time.perf_counter() - start
+    await blockchain.close()
+    return pairs / elapsed
+
+
+def bench_async_rpc(args: argparse.Namespace) -> None:
+    """Pair analyses per second: blocking Web3 vs thread offload vs AsyncWeb3"""
+    server = StubRPCServer(latency=args.latency).start()
+    try:
+        modes = [
+            ('blocking (before)', _BlockingBlockchainInterface, False),
+            ('sync + threads', BlockchainInterface, False),
+            ('AsyncWeb3', BlockchainInterface, True),
+        ]
+        for label, interface_class, async_web3 in modes:
+            blockchain = interface_class(_bench_config(server.url, async_web3=async_web3))
+            rate = asyncio.run(_pair_analyses_per_second(blockchain, args.pairs))
+            print(f"{label:<20} {rate:8.1f} pair analyses/s")
+    finally:
+        server.stop()
+
+
+def bench_rpc_batching(args: argparse.Namespace) -> None:
+    """HTTP requests and throughput for a PairCreated burst with and without batching"""
+    server = StubRPCServer(latency=args.latency).start()
+    try:
+        for label, enabled in [('unbatched', False), ('batched', True)]:
+            config = _bench_config(server.url, async_web3=True, rpc_batching={'enabled': enabled})
+            blockchain = BlockchainInterface(config)
+            requests_before = server.request_count
+            rate = asyncio.run(_pair_analyses_per_second(blockchain, args.pairs))
+            http_requests = server.request_count - requests_before
+            print(f"{label:<12} {rate:8.1f} pair analyses/s  {http_requests:5d} HTTP requests")
+            provider_stats = getattr(blockchain.async_w3.provider, 'stats', None)
+            if provider_stats:
+                print(f"{'':<12} {provider_stats}")
+    finally:
+        server.stop()
+
+
+def bench_rpc_pool(args: argparse.Namespace) -> None:
+    """Read latency percentiles across a fast, a spiky and a lagging node, hedged vs unhedged"""
+    servers = [
+        StubRPCServer(latency=args.latency).start(),
+        StubRPCServer(latency=args.latency, slow_probability=0.2, slow_latency=args.latency * 20).start(),
+        StubRPCServer(latency=args.latency / 2).start(),
+    ]
+    # Third node is fastest but stuck 10 blocks behind
+    servers[2].block_number -= 10
+    try:
+        for label, hedge_reads in [('unhedged', False), ('hedged', True)]:
+            # Batching off so every read really reaches a node
+            config = _bench_config(servers[1].url, async_web3=True, rpc_batching={'enabled': False},
+                                   rpc_pool={'hedge_reads': hedge_reads, 'hedge_min_delay_ms': args.latency * 1500})
+            config['blockchain']['rpc_endpoints'] = [server.url for server in servers]
+            blockchain = BlockchainInterface(config)
+
+            async def measure():
+                await blockchain.check_rpc_health()
+                latencies = []
+                for _ in range(args.pairs):
+                    start = time.perf_counter()
+                    await blockchain.get_wallet_balance()
+                    await blockchain.get_token_info(TOKEN_ADDRESS)
+                    latencies.append(time.perf_counter() - start)
+                await blockchain.close()
+                return sorted(latencies)
+
+            latencies = asyncio.run(measure())
+            p50 = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            print(f"{label:<10} p50 {p50:7.1f}ms  p99 {p99:7.1f}ms")
+            for metrics in blockchain.rpc_pool.get_metrics():
+                print(f"{'':<10} {metrics}")
+    finally:
+        for server in servers:
+            server.stop()
+
+
+def _check_recorded_v2_quotes() -> None:
+    """Replay getAmountOut/getAmountIn outputs recorded from a compiled V2 router"""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), V2_QUOTE_VECTORS_FILE)) as f:
+        recorded = json.load(f)
+
+    engine = V2QuoteEngine(WBNB_ADDRESS, fee_bps=recorded['fee_bps'])
+    checks = 0
+    mismatches = 0
+    for vector in recorded['vectors']:
+        vector = {key: int(value) for key, value in vector.items()}
+        for name, expected, local in (
+            ('getAmountOut', vector['amount_out'], engine.get_amount_out(vector['amount_in'], vector['reserve_in'], vector['reserve_out'])),
+            ('getAmountIn', vector['required_in'], engine.get_amount_in(vector['target_out'], vector['reserve_in'], vector['reserve_out']))
+        ):
+            checks += 1
+            if expected != local:
+                mismatches += 1
+                print(f"MISMATCH {name} {vector}: router={expected} local={local}")
+
+    print(f"recorded: {recorded['source']}, fee {recorded['fee_bps']} bps")
+    print(f"{checks} quotes checked, {mismatches} mismatches")
+    if mismatches:
+        raise SystemExit(1)
+
+
+def bench_v2_quotes(args: argparse.Namespace) -> None:
+    """Bit-for-bit check of local V2 quotes against router outputs
+
+    Without --rpc the quotes are checked against outputs recorded from a
+    compiled Uniswap V2 router; with --rpc against getAmountsOut on a real or
+    forked BSC node.
+    """
+    if not args.rpc:
+        _check_recorded_v2_quotes()
+        return
+
+    blockchain = BlockchainInterface(_bench_config(args.rpc, async_web3=False))
+    w3 = blockchain.w3
+    block_number = w3.eth.block_number
+    router = w3.eth.contract(address=Web3.to_checksum_address(blockchain.router_address), abi=blockchain.router_abi)
+
+    wbnb = Web3.to_checksum_address(blockchain.wbnb_address)
+    busd = Web3.to_checksum_address(blockchain.busd_address)
+    usdt = Web3.to_checksum_address(blockchain.config['blockchain']['usdt_address'])
+    paths = [[wbnb, busd], [busd, wbnb], [wbnb, usdt], [usdt, wbnb], [busd, wbnb, usdt]]
+
+    checks = 0
+    mismatches = 0
+    rng = random.Random(args.pairs)
+    for path in paths:
+        # Reserves pinned to the same block the router is queried at
+        hop_reserves = []
+        for token_in, token_out in zip(path, path[1:]):
+            pair = w3.eth.contract(address=blockchain.quote_engine.pair_for(token_in, token_out), abi=blockchain.pair_abi)
+            reserve0, reserve1, _ = pair.functions.getReserves().call(block_identifier=block_number)
+            token0, _ = blockchain.quote_engine.sort_tokens(token_in, token_out)
+            hop_reserves.append((reserve0, reserve1) if token0 == token_in else (reserve1, reserve0))
+
+        for exponent in range(12, 24):
+            amount_in = rng.randint(10**exponent, 10**(exponent + 1))
+            expected = router.functions.getAmountsOut(amount_in, path).call(block_identifier=block_number)
+            local = blockchain.quote_engine.get_amounts_out(amount_in, hop_reserves)
+            checks += 1
+            if list(expected) != local:
+                mismatches += 1
+                print(f"MISMATCH {path} amount_in={amount_in}: router={list(expected)} local={local}")
+
+    print(f"block {block_number}: {checks} quotes checked, {mismatches} mismatches")
+    if mismatches:
+        raise SystemExit(1)
+
+
+def bench_gas_oracle(args: argparse.Namespace) -> None:
+    """Send-path gas price latency: eth_gasPrice per send vs the background oracle"""
+    server = StubRPCServer(latency=args.latency).start()
+    rng = random.Random(7)
+    try:
+        blockchain = BlockchainInterface(_bench_config(server.url, async_web3=True))
+
+        async def measure():
+            uncached = time.perf_counter()
+            for _ in range(args.pairs):
+                await blockchain.estimate_gas_price()
+            uncached = (time.perf_counter() - uncached) / args.pairs
+
+            for _ in range(blockchain.gas_oracle.sample_blocks):
+                server.block_number += 1
+                server.block_gas_prices_gwei = [rng.choice([1, 1, 1, 1.5, 2, 3, 5]) for _ in range(50)]
+                await blockchain.gas_oracle.sample()
+
+            cached = time.perf_counter()
+            for _ in range(args.pairs):
+                await blockchain.estimate_gas_price()
+            cached = (time.perf_counter() - cached) / args.pairs
+            await blockchain.close()
+            return uncached, cached
+
+        uncached, cached = asyncio.run(measure())
+        print(f"eth_gasPrice per send  {uncached * 1000:8.2f}ms")
+        print(f"oracle (in memory)     {cached * 1000:8.3f}ms")
+        for estimate in blockchain.gas_oracle.get_history()['estimates']:
+            print(f"block {estimate['block']}: standard {estimate['standard'] / 10**9:.2f} gwei, "
+                  f"fast {estimate['fast'] / 10**9:.2f} gwei -> send {estimate['estimate'] / 10**9:.2f} gwei")
+    finally:
+        server.stop()
+
+
+def bench_broadcast(args: argparse.Namespace) -> None:
+    """Time-to-inclusion: send to the connected node only vs fan out to every node"""
+    # Connected node answers fastest but propagates slowest - a typical public RPC
+    block_time = 0.5
+    nodes = [(args.latency / 5, block_time * 1.2), (args.latency, block_time * 0.1), (args.latency * 2, block_time * 0.3)]
+    rng = random.Random(11)
+
+    for label, fanout in [('single node', False), ('fan-out', True)]:
+        network = StubNetwork(block_time=block_time, gossip_delay=args.latency)
+        servers = [network.attach(StubRPCServer(latency=latency).start(), propagation)
+                   for latency, propagation in nodes]
+        try:
+            # Pool off so the baseline really sends to the connected node only
+            config = _bench_config(servers[0].url, async_web3=True, rpc_batching={'enabled': False},
+                                   rpc_pool={'enabled': False}, broadcast_fanout=fanout,
+                                   receipt_poll_interval_seconds=block_time / 5)
+            config['blockchain']['rpc_endpoints'] = [server.url for server in servers]
+            blockchain = BlockchainInterface(config)
+            blockchain.setup_account(Account.create().key.hex())
+
+            async def send_one(index: int):
+                await asyncio.sleep(rng.uniform(0, block_time * 4))
+                sent_at = time.time()
+                tx_hash = await blockchain._sign_and_send({
+                    'to': Web3.to_checksum_address(TOKEN_ADDRESS), 'value': index, 'gas': 21000,
+                    'gasPrice': 3 * 10**9, 'chainId': 56
+                })
+                await blockchain.receipt_tracker.wait_for_receipt(tx_hash, timeout=30)
+                blockchain.broadcaster.record_inclusion(tx_hash)
+                return network.inclusion_time(tx_hash.hex()) - sent_at
+
+            async def measure():
+                delays = await asyncio.gather(*(send_one(index) for index in range(args.pairs)))
+                await blockchain.close()
+                return sorted(delays)
+
+            delays = asyncio.run(measure())
+            p50 = delays[len(delays) // 2] * 1000
+            p95 = delays[min(len(delays) - 1, int(len(delays) * 0.95))] * 1000
+            print(f"{label:<12} time-to-inclusion p50 {p50:7.1f}ms  p95 {p95:7.1f}ms")
+            for metrics in blockchain.broadcaster.get_metrics():
+                print(f"{'':<12} {metrics}")
+        finally:
+            for server in servers:
+                server.stop()
+
+
+def bench_security_session(args: argparse.Namespace) -> None:
+    """Per-token security API latency: a new session per token vs one warm shared session"""
+    servers = [StubAPIServer(latency=args.latency, handshake_latency=args.latency * 2).start() for _ in range(3)]
+    hosts = [server.url for server in servers]
+    try:
+        for label, shared in [('cold (per token)', False), ('warm (shared)', True)]:
+            engine = AdvancedSecurityEngine(_bench_config(hosts[0]), None)
+            connections_before = sum(server.connection_count for server in servers)
+
+            async def measure():
+                if shared:
+                    await engine.warm_connections(hosts)
+                latencies = []
+                for _ in range(args.pairs):
+                    start = time.perf_counter()
+                    session = await engine.open_session()
+
+                    async def fetch(url: str):
+                        async with session.get(url) as response:
+                            return await response.json()
+
+                    # GoPlus, BSCScan and Binance calls of one token check
+                    await asyncio.gather(*(fetch(host) for host in hosts))
+                    latencies.append(time.perf_counter() - start)
+                    if not shared:
+                        # Previous behaviour - the session died with each token
+                        await session.close()
+                await engine.close()
+                return sorted(latencies)
+
+            latencies = asyncio.run(measure())
+            connections = sum(server.connection_count for server in servers) - connections_before
+            p50 = latencies[len(latencies) // 2] * 1000
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+            print(f"{label:<18} p50 {p50:7.1f}ms  p95 {p95:7.1f}ms  {connections:4d} connections")
+    finally:
+        for server in servers:
+            server.stop()
+
+
+def bench_goplus_batching(args: argparse.Namespace) -> None:
+    """GoPlus requests and burst latency for concurrent token lookups, batched vs one per token"""
+    server = StubAPIServer(latency=args.latency, handshake_latency=0).start()
+    tokens = ['0x' + f"{index:040x}" for index in range(1, args.pairs + 1)]
+    try:
+        for label, enabled in [('per token', False), ('batched', True)]:
+            config = _bench_config(server.url)
+            config['security']['goplus_batching'] = {'enabled': enabled}
+            engine = AdvancedSecurityEngine(config, None)
+            engine.goplus_batcher.url = server.url
+            requests_before = server.request_count
+
+            async def measure():
+                start = time.perf_counter()
+                results = await asyncio.gather(*(engine.goplus_batcher.lookup(token) for token in tokens))
+                elapsed = time.perf_counter() - start
+                await engine.close()
+                return elapsed, sum(1 for _, token_data in results if token_data is not None)
+
+            elapsed, found = asyncio.run(measure())
+            print(f"{label:<10} {elapsed * 1000:8.1f}ms for {len(tokens)} lookups  "
+                  f"{server.request_count - requests_before:4d} requests  {found} results")
+            print(f"{'':<10} {engine.goplus_batcher.get_metrics()}")
+    finally:
+        server.stop()
+
+
+def bench_security_pipeline(args: argparse.Namespace) -> None:
+    """Time to reject a thin-liquidity token: all checks at once vs staged fail-fast"""
+    rpc = StubRPCServer(latency=args.latency).start()
+    # Remote security API an order of magnitude slower than the node
+    goplus = StubAPIServer(latency=args.latency * 10, handshake_latency=0).start()
+    pair_address = Web3.to_checksum_address('0x' + '22' * 20)
+    try:
+        modes = [
+            ('all at once', {'fail_fast': False, 'stages': [sum(DEFAULT_SECURITY_STAGES, [])]}),
+            ('staged', {'fail_fast': True, 'stages': DEFAULT_SECURITY_STAGES}),
+        ]
+        for label, pipeline in modes:
+            config = _bench_config(rpc.url, async_web3=True)
+            config['security']['pipeline'] = pipeline
+            config['security']['verdict_cache'] = {'enabled': False}
+            # The stub token exposes mint() and the stub router cannot swap - keep this about liquidity
+            config['security']['selector_scan'] = {'enabled': False}
+            config['security']['evm_simulation'] = {'enabled': False}
+            blockchain = BlockchainInterface(config)
+            engine = AdvancedSecurityEngine(config, blockchain.active_w3, blockchain.metadata_cache,
+                                            blockchain.reserve_book, blockchain.price_feed)
+            engine.goplus_batcher.url = goplus.url
+
+            async def measure():
+                await blockchain.price_feed.refresh()
+                latencies = []
+                for index in range(args.pairs):
+                    start = time.perf_counter()
+                    is_safe, _, detailed = await engine.comprehensive_security_check(TOKEN_ADDRESS, pair_address)
+                    latencies.append(time.perf_counter() - start)
+                await engine.close()
+                await blockchain.close()
+                return sorted(latencies), is_safe, detailed['pipeline']
+
+            latencies, is_safe, pipeline_report = asyncio.run(measure())
+            p50 = latencies[len(latencies) // 2] * 1000
+            print(f"{label:<12} p50 {p50:7.1f}ms per token (safe={is_safe})  skipped {pipeline_report['skipped']}")
+            print(f"{'':<12} {pipeline_report['latency_ms']}")
+    finally:
+        rpc.stop()
+        goplus.stop()
+
+
+def bench_api_guard(args: argparse.Namespace) -> None:
+    """Per-token GoPlus check latency while the API throttles or hangs, with and without the breaker"""
+    server = StubAPIServer(latency=args.latency, handshake_latency=0).start()
+    phases = [
+        ('429s', 429, args.latency),
+        ('hanging', 200, 2.0),
+    ]
+    try:
+        for phase, status_code, latency in phases:
+            server.status_code = status_code
+            server.latency = latency
+            for label, guard_config in [('unguarded', {'rate_per_second': 10**6, 'burst': 10**6, 'max_concurrency': 10**6,
+                                                       'failure_threshold': 10**9}),
+                                        ('guarded', {'failure_threshold': 3, 'recovery_seconds': 30})]:
+                config = _bench_config(server.url)
+                config['api_keys']['goplus_fallback_key'] = ''
+                config['security']['goplus_batching'] = {'enabled': False, 'timeout_seconds': 0.5}
+                config['security']['api_limits'] = {'goplus': guard_config}
+                engine = AdvancedSecurityEngine(config, None)
+                engine.goplus_batcher.url = server.url
+                requests_before = server.request_count
+
+                async def measure():
+                    latencies = []
+                    for index in range(args.pairs):
+                        start = time.perf_counter()
+                        _, reasons, _ = await engine._check_goplus_security('0x' + f"{index + 1:040x}")
+                        latencies.append(time.perf_counter() - start)
+                    await engine.close()
+                    return sorted(latencies), reasons
+
+                latencies, reasons = asyncio.run(measure())
+                p50 = latencies[len(latencies) // 2] * 1000
+                total = sum(latencies)
+                metrics = engine.api_guards['goplus'].get_metrics()
+                print(f"{phase:<8} {label:<10} p50 {p50:7.1f}ms  total {total:6.2f}s  "
+                      f"{server.request_count - requests_before:4d} requests  breaker {metrics['state']}")
+                print(f"{'':<19} last reason: {reasons[0] if reasons else None}")
+    finally:
+        server.stop()
+
+
+def bench_clone_rejection(args: argparse.Namespace) -> None:
+    """Time and requests to reject clones of tokens already rejected by GoPlus, with and without the fingerprint index"""
+    rpc = StubRPCServer(latency=args.latency).start()
+    goplus = StubAPIServer(latency=args.latency * 10, handshake_latency=0).start()
+    pair_address = Web3.to_checksum_address('0x' + '22' * 20)
+    clones = [Web3.to_checksum_address('0x' + f"{index + 1:040x}") for index in range(args.pairs)]
+    for index, clone in enumerate(clones):
+        # Same source, different constructor arguments and metadata
+        rpc.contract_code[clone.lower()] = stub_runtime_code(immutable=index.to_bytes(32, 'big'),
+                                                             metadata_seed=index.to_bytes(4, 'big'))
+    try:
+        for label, similarity in [('no index', False), ('fingerprints', True)]:
+            config = _bench_config(rpc.url, async_web3=True)
+            config['advanced_checks']['additional_security']['check_contract_similarity'] = similarity
+            # Clones look healthy on-chain - only their bytecode gives them away
+            config['trading']['min_liquidity_usd'] = 0
+            config['security']['goplus_batching'] = {'enabled': False}
+            config['security']['selector_scan'] = {'enabled': False}
+            config['security']['evm_simulation'] = {'enabled': False}
+            blockchain = BlockchainInterface(config)
+            engine = AdvancedSecurityEngine(config, blockchain.active_w3, blockchain.metadata_cache,
+                                            blockchain.reserve_book, blockchain.price_feed)
+            engine.goplus_batcher.url = goplus.url
+            # Two earlier deployments were rejected as honeypots before the clones appeared
+            for original in (TOKEN_ADDRESS, WBNB_ADDRESS):
+                engine.fingerprint_index.record_verdict(
+                    fingerprint_bytecode(stub_runtime_code()), original, False, ["GoPlus: Detected as honeypot"], True
+                )
+
+            async def measure():
+                await blockchain.price_feed.refresh()
+                latencies = []
+                rejected = 0
+                for clone in clones:
+                    start = time.perf_counter()
+                    is_safe, _, _ = await engine.comprehensive_security_check(clone, pair_address)
+                    latencies.append(time.perf_counter() - start)
+                    rejected += not is_safe
+                await engine.close()
+                await blockchain.close()
+                return sorted(latencies), rejected
+
+            rpc_before, goplus_before = rpc.request_count, goplus.request_count
+            latencies, rejected = asyncio.run(measure())
+            p50 = latencies[len(latencies) // 2] * 1000
+            print(f"{label:<13} p50 {p50:7.1f}ms per clone, {rejected}/{len(clones)} rejected, "
+                  f"{(rpc.request_count - rpc_before) / len(clones):.1f} RPC + "
+                  f"{(goplus.request_count - goplus_before) / len(clones):.1f} GoPlus requests per clone")
+    finally:
+        rpc.stop()
+        goplus.stop()
+
+
+def _synthetic_contract(rng: random.Random, size: int) -> bytes:
+    """Dispatcher of 30 selectors followed by random instructions up to `size` bytes"""
+    selectors = [f"{rng.getrandbits(32):08x}" for _ in range(29)] + ['40c10f19']
+    body = bytearray()
+    while len(body) < size:
+        opcode = rng.choice([0x01, 0x02, 0x14, 0x16, 0x35, 0x50, 0x51, 0x52, 0x54, 0x55, 0x56, 0x57, 0x5b, 0x80, 0x90])
+        push_size = rng.choice([0, 0, 0, 1, 2, 4, 20, 32])
+        if push_size:
+            body += bytes([0x5f + push_size]) + rng.randbytes(push_size)
+        else:
+            body.append(opcode)
+    return stub_runtime_code(selectors=selectors, metadata_seed=rng.randbytes(8))[:-2] + bytes(body)
+
+
+def bench_selector_scan(args: argparse.Namespace) -> None:
+    """Selector scan throughput and worst event-loop stall while scanning inline"""
+    rng = random.Random(11)
+    # Up to the EIP-170 runtime code limit
+    contracts = [_synthetic_contract(rng, rng.randint(6_000, 24_576)) for _ in range(args.pairs * 40)]
+    with open('config.json', 'r') as f:
+        config = json.load(f)
+    scanner = SelectorScanner(config)
+
+    async def measure():
+        stalls = []
+
+        async def ticker():
+            while True:
+                tick = time.perf_counter()
+                await asyncio.sleep(0.001)
+                stalls.append(time.perf_counter() - tick - 0.001)
+
+        ticking = asyncio.ensure_future(ticker())
+        start = time.perf_counter()
+        results = []
+        # New pairs arrive in bursts, never all at once
+        for index in range(0, len(contracts), 10):
+            results += [scanner.scan(contract) for contract in contracts[index:index + 10]]
+            await asyncio.sleep(0)
+        elapsed = time.perf_counter() - start
+        ticking.cancel()
+        return elapsed, results, max(stalls, default=elapsed)
+
+    elapsed, results, stall = asyncio.run(measure())
+    flagged = sum(bool(result['blacklisted']) for result in results)
+    print(f"inline {len(contracts) / elapsed:7.0f} bytecodes/s, {flagged}/{len(contracts)} flagged, "
+          f"worst event-loop stall {stall * 1000:6.1f}ms per burst of 10")
+
+
+def _stub_router_code(chain_depth: int, independent_slots: int) -> bytes:
+    """Router stand-in: independent SLOADs plus a chain where each slot index is the previous slot's value"""
+    code = b''.join(bytes([0x60, slot, 0x54, 0x50]) for slot in range(independent_slots))
+    code += bytes([0x5f]) + bytes([0x54]) * chain_depth + bytes([0x50, 0x00])
+    return code
+
+
+def _stub_pair_code(reserve0: int, reserve1: int) -> bytes:
+    """getReserves() stand-in returning fixed reserves for any call"""
+    return (bytes([0x7f]) + reserve0.to_bytes(32, 'big') + bytes([0x5f, 0x52])
+            + bytes([0x7f]) + reserve1.to_bytes(32, 'big') + bytes([0x60, 0x20, 0x52])
+            + bytes([0x60, 0x60, 0x5f, 0xf3]))
+
+
+def bench_evm_simulation(args: argparse.Namespace) -> None:
+    """EVM honeypot simulation: state fetch rounds and reads, cold vs same-block repeats"""
+    if args.rpc:
+        if not args.token:
+            raise SystemExit("evm_simulation against --rpc needs --token")
+        blockchain = BlockchainInterface(_bench_config(args.rpc, async_web3=True))
+        engine = AdvancedSecurityEngine(blockchain.config, blockchain.active_w3)
+        token = Web3.to_checksum_address(args.token)
+        pair = blockchain.quote_engine.pair_for(Web3.to_checksum_address(blockchain.wbnb_address), token)
+
+        async def run_real():
+            amount = int(blockchain.config['security']['honeypot_simulation_amount'] * 10**18)
+            for label in ('cold', 'warm'):
+                result = await engine.evm_simulator.simulate(token, pair, amount)
+                print(f"{label}: {result}")
+            await engine.close()
+            await blockchain.close()
+
+        asyncio.run(run_real())
+        return
+
+    server = StubRPCServer(latency=args.latency).start()
+    try:
+        config = _bench_config(server.url, async_web3=True)
+        wbnb = Web3.to_checksum_address(config['blockchain']['wbnb_address'])
+        blockchain = BlockchainInterface(config)
+        pair = blockchain.quote_engine.pair_for(wbnb, TOKEN_ADDRESS)
+        router = config['blockchain']['pancakeswap_router'].lower()
+        server.contract_code[router] = _stub_router_code(chain_depth=4, independent_slots=40)
+        server.contract_code[pair.lower()] = _stub_pair_code(10**21, 10**24)
+        server.contract_code[TOKEN_ADDRESS.lower()] = bytes([0x00])
+        for slot in range(4):
+            server.storage[(router, slot)] = slot + 1
+        engine = AdvancedSecurityEngine(config, blockchain.active_w3)
+
+        async def measure(label: str, runs: int):
+            reads_before, requests_before = engine.evm_simulator.stats['state_reads'], server.request_count
+            latencies = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                result = await engine.evm_simulator.simulate(TOKEN_ADDRESS, pair, 10**15)
+                latencies.append(time.perf_counter() - start)
+            latencies.sort()
+            print(f"{label:<22} p50 {latencies[len(latencies) // 2] * 1000:7.1f}ms, {result['fetch_rounds']} rounds, "
+                  f"{engine.evm_simulator.stats['state_reads'] - reads_before} state reads, "
+                  f"{server.request_count - requests_before} HTTP requests over {runs} runs")
+
+        async def run_stub():
+            await measure('cold block', 1)
+            await measure('same block x20', 20)
+            server.block_number += 1
+            await asyncio.sleep(engine.evm_simulator.head_refresh)
+            await measure('next block', 1)
+            await engine.close()
+            await blockchain.close()
+
+        asyncio.run(run_stub())
+    finally:
+        server.stop()
+
+
+BENCHMARKS = {
+    'async_rpc': bench_async_rpc,
+    'rpc_batching': bench_rpc_batching,
+    'rpc_pool': bench_rpc_pool,
+    'v2_quotes': bench_v2_quotes,
+    'gas_oracle': bench_gas_oracle,
+    'broadcast': bench_broadcast,
+    'security_session': bench_security_session,
+    'goplus_batching': bench_goplus_batching,
+    'security_pipeline': bench_security_pipeline,
+    'api_guard': bench_api_guard,
+    'clone_rejection': bench_clone_rejection,
+    'selector_scan': bench_selector_scan,
+    'evm_simulation': bench_evm_simulation,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="BSC Sniper Bot 2.0 performance benchmarks")
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS), help="Benchmark to run")
+    parser.add_argument('--latency', type=float, default=0.05, help="Injected RPC latency in seconds")
+    parser.add_argument('--pairs', type=int, default=50, help="Concurrent pair analyses per run")
+    parser.add_argument('--rpc', help="Real or forked BSC node URL for validation benchmarks")
+    parser.add_argument('--token', help="Token address to simulate with evm_simulation --rpc")
+    args = parser.parse_args(argv)
+
+    print(f"⏱️  Running {args.benchmark} benchmark (latency {args.latency * 1000:.0f}ms)")
+    print("=" * 50)
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
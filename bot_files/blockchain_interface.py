@@ -8,18 +8,35 @@ import asyncio
 import logging
 import time
 from typing import Dict, Any, Optional, List, Tuple
-from web3 import Web3
-from web3.middleware import geth_poa_middleware
+import aiohttp
+from web3 import Web3, AsyncWeb3
+from web3.middleware import geth_poa_middleware, async_geth_poa_middleware
 from web3.exceptions import TransactionNotFound, TimeExhausted
 from eth_account import Account
 from colorama import Fore, Style
 import json
 import os # Added import for os.getenv
+from multicall import Multicall3
+from rpc_transport import BatchingHTTPProvider
+from rpc_pool import RPCEndpoint, RPCEndpointPool
+from nonce_manager import NonceManager
+from receipt_tracker import ReceiptTracker
+from token_metadata_cache import TokenMetadataCache
+from reserve_book import ReserveBook
+from gas_oracle import GasOracle
+from allowance_cache import AllowanceCache, MAX_UINT256
+from v2_quote import V2QuoteEngine, PANCAKE_V2_FEE_BPS, PANCAKE_V2_INIT_CODE_HASH
+from tx_broadcaster import TransactionBroadcaster
+from bnb_price_feed import BNBPriceFeed
 
 class BlockchainInterface:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.w3 = None
+        self.async_w3 = None
+        self.rpc_pool = None
+        self.chain_id = None
+        self.async_mode = config['blockchain'].get('async_web3', True)
         self.current_rpc_index = 0
         self.rpc_endpoints = config['blockchain']['rpc_endpoints']
         self.factory_address = config['blockchain']['pancakeswap_factory']
@@ -36,9 +53,49 @@ class BlockchainInterface:
         # Initialize connection
         self.initialize_web3_connection()
 
+        # Batched read-only calls
+        self.multicall = Multicall3(self, config['blockchain'].get('multicall3_address'))
+
+        # Router math done locally - quotes only need pair reserves
+        self.quote_engine = V2QuoteEngine(
+            self.factory_address,
+            config['blockchain'].get('pancakeswap_fee_bps', PANCAKE_V2_FEE_BPS),
+            config['blockchain'].get('pancakeswap_init_code_hash', PANCAKE_V2_INIT_CODE_HASH)
+        )
+
+        # Gas price sampled in the background - sends read it from memory
+        self.gas_oracle = GasOracle(config, self)
+
+        # Pair reserves followed from Sync logs for tracked pairs
+        self.reserve_book = ReserveBook(config, self)
+
+        # BNB/USD from the WBNB stablecoin pools, refreshed every block
+        self.price_feed = BNBPriceFeed(config, self)
+
+        # Decimals/name/symbol and pair tokens never change - read them once
+        cache_config = config['blockchain'].get('metadata_cache', {})
+        self.metadata_cache = TokenMetadataCache(
+            cache_config.get('cache_file', 'token_metadata.db'),
+            cache_config.get('max_memory_entries', 5000)
+        )
+
         # Account management
         self.account = None
         self.wallet_address = None
+        self.nonce_manager = NonceManager(self)
+
+        # Allowances known from our own receipts; router approvals go out right after a buy
+        self.allowance_cache = AllowanceCache(config['trading'].get('allowance_cache_file', 'allowances.json'))
+        self.pre_approve_after_buy = config['trading'].get('pre_approve_after_buy', True)
+        self._approval_broadcasts: Dict[str, asyncio.Future] = {}
+        self._approval_tasks = set()
+
+        # One block watcher confirms every in-flight transaction
+        self.receipt_tracker = ReceiptTracker(self, config['blockchain'].get('receipt_poll_interval_seconds', 1.0))
+
+        # Signed transactions go to every healthy endpoint, not just the connected one
+        self.broadcast_fanout = config['blockchain'].get('broadcast_fanout', True) and self.async_w3 is not None
+        self.broadcaster = TransactionBroadcaster(self)
 
     def initialize_web3_connection(self) -> bool:
         """Initialize Web3 connection with automatic fallback"""
@@ -57,6 +114,8 @@ class BlockchainInterface:
                         if latest_block > 0:
                             self.w3 = w3
                             self.current_rpc_index = i
+                            self.chain_id = w3.eth.chain_id
+                            self.async_w3 = self._create_async_web3() if self.async_mode else None
                             logging.info(f"{Fore.GREEN}✅ Connected to BSC via RPC {i+1} (Block: {latest_block}){Style.RESET_ALL}")
                             return True
 
@@ -71,6 +130,73 @@ class BlockchainInterface:
         logging.error("Failed to connect to any RPC endpoint after 3 attempts")
         return False
 
+    def _create_async_provider(self, rpc_url: str):
+        """Create an async JSON-RPC provider for a single endpoint"""
+        request_kwargs = {'timeout': aiohttp.ClientTimeout(total=30)}
+        batching = self.config['blockchain'].get('rpc_batching', {})
+
+        if batching.get('enabled', True):
+            return BatchingHTTPProvider(
+                rpc_url,
+                request_kwargs=request_kwargs,
+                max_batch_size=batching.get('max_batch_size', 20),
+                latest_cache_ttl=batching.get('latest_cache_ttl_seconds', 1.0)
+            )
+        return AsyncWeb3.AsyncHTTPProvider(rpc_url, request_kwargs=request_kwargs)
+
+    def _create_async_web3(self) -> AsyncWeb3:
+        """Create a native asyncio Web3 client over the RPC endpoint pool"""
+        pool_config = self.config['blockchain'].get('rpc_pool', {})
+        connected_url = self.rpc_endpoints[self.current_rpc_index]
+
+        if pool_config.get('enabled', True) and len(self.rpc_endpoints) > 1:
+            # Connected endpoint first so it wins ties before latency data exists
+            ordered_urls = [connected_url] + [url for url in self.rpc_endpoints if url != connected_url]
+            self.rpc_pool = RPCEndpointPool(
+                [RPCEndpoint(url, self._create_async_provider(url), pool_config.get('latency_window', 100))
+                 for url in ordered_urls],
+                pool_config
+            )
+            provider = self.rpc_pool
+        else:
+            provider = self._create_async_provider(connected_url)
+
+        async_w3 = AsyncWeb3(provider)
+        async_w3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
+        return async_w3
+
+    @property
+    def active_w3(self):
+        """Web3 client used by async call paths (AsyncWeb3 when enabled)"""
+        return self.async_w3 or self.w3
+
+    async def _rpc(self, call):
+        """Run a Web3 call without blocking the event loop
+
+        The call is awaited natively on the AsyncWeb3 backend; on the sync
+        backend it is pushed to a worker thread instead.
+        """
+        if self.async_w3:
+            return await call()
+        return await asyncio.to_thread(call)
+
+    async def check_rpc_health(self) -> None:
+        """Refresh endpoint pool head blocks and eject degraded nodes"""
+        if self.rpc_pool:
+            await self.rpc_pool.check_health()
+
+    async def close(self) -> None:
+        """Stop the receipt tracker, close async provider sessions and the metadata cache"""
+        try:
+            await self.receipt_tracker.close()
+            await self.broadcaster.close()
+            self.metadata_cache.close()
+            provider = self.async_w3.provider if self.async_w3 else None
+            if provider is not None and hasattr(provider, 'close'):
+                await provider.close()
+        except Exception as e:
+            logging.warning(f"Error closing async provider: {e}")
+
     def setup_account(self, private_key: str) -> bool:
         """Setup account from private key with bulletproof validation"""
         try:
@@ -165,18 +291,18 @@ class BlockchainInterface:
 
             if token_address is None or token_address.lower() == self.wbnb_address.lower():
                 # Get BNB balance
-                balance_wei = self.w3.eth.get_balance(self.wallet_address)
+                balance_wei = await self._rpc(lambda: self.active_w3.eth.get_balance(self.wallet_address))
                 return balance_wei / (10**18)
             else:
                 # Get token balance
-                token_contract = self.w3.eth.contract(
+                token_contract = self.active_w3.eth.contract(
                     address=Web3.to_checksum_address(token_address),
                     abi=self.erc20_abi
                 )
 
-                balance = token_contract.functions.balanceOf(self.wallet_address).call()
-                decimals = token_contract.functions.decimals().call()
-                return balance / (10**decimals)
+                balance = await self._rpc(lambda: token_contract.functions.balanceOf(self.wallet_address).call())
+                token_metadata = await self.get_token_metadata(token_address)
+                return balance / (10**token_metadata['decimals'])
 
         except Exception as e:
             logging.error(f"Error getting wallet balance: {e}")
@@ -196,45 +322,85 @@ class BlockchainInterface:
                 logging.error(f"Invalid token address format: {token_address}")
                 return self._get_default_token_info(token_address)
 
-            token_contract = self.w3.eth.contract(
+            token_contract = self.active_w3.eth.contract(
                 address=Web3.to_checksum_address(token_address),
                 abi=self.erc20_abi
             )
 
-            # Get basic token info
-            try:
-                name = token_contract.functions.name().call()
-            except:
-                name = "Unknown"
-
-            try:
-                symbol = token_contract.functions.symbol().call()
-            except:
-                symbol = "UNKNOWN"
-
-            try:
-                decimals = token_contract.functions.decimals().call()
-            except:
-                decimals = 18
-
-            try:
-                total_supply = token_contract.functions.totalSupply().call()
-            except:
-                total_supply = 0
-
-            return {
-                'address': token_address,
-                'name': name,
-                'symbol': symbol,
-                'decimals': decimals,
-                'total_supply': total_supply,
-                'total_supply_formatted': total_supply / (10**decimals) if total_supply > 0 else 0
-            }
+            # Immutable fields come from the cache - only totalSupply is read on a hit
+            cached, calls = self._token_info_plan(token_address, token_contract)
+            values = await self.multicall.aggregate(calls)
+            return self._token_info_from_values(token_address, cached, values)
 
         except Exception as e:
             logging.error(f"Error getting token info for {token_address}: {e}")
             return self._get_default_token_info(token_address)
 
+    async def get_token_metadata(self, token_address: str) -> Dict[str, Any]:
+        """Get name/symbol/decimals, served from the metadata cache when possible"""
+        cached = self.metadata_cache.get_token(token_address)
+        if cached:
+            return cached
+
+        token_contract = self.active_w3.eth.contract(
+            address=Web3.to_checksum_address(token_address),
+            abi=self.erc20_abi
+        )
+        name, symbol, decimals = await self.multicall.aggregate(self._token_metadata_calls(token_contract))
+        self._cache_token_metadata(token_address, name, symbol, decimals)
+        info = self._build_token_info(token_address, name, symbol, decimals, None)
+        return {'name': info['name'], 'symbol': info['symbol'], 'decimals': info['decimals']}
+
+    def _cache_token_metadata(self, token_address: str, name: Optional[str], symbol: Optional[str],
+                              decimals: Optional[int]) -> None:
+        """Cache immutable fields, but only when every read succeeded"""
+        if name is not None and symbol is not None and decimals is not None:
+            self.metadata_cache.put_token(token_address, name, symbol, decimals)
+
+    def _token_metadata_calls(self, token_contract) -> List[Tuple[Any, str, List[Any]]]:
+        """Multicall entries for name/symbol/decimals"""
+        return [
+            (token_contract, 'name', []),
+            (token_contract, 'symbol', []),
+            (token_contract, 'decimals', [])
+        ]
+
+    def _token_info_calls(self, token_contract) -> List[Tuple[Any, str, List[Any]]]:
+        """Multicall entries for name/symbol/decimals/totalSupply"""
+        return self._token_metadata_calls(token_contract) + [(token_contract, 'totalSupply', [])]
+
+    def _token_info_plan(self, token_address: str, token_contract) -> Tuple[Optional[Dict[str, Any]], List[Tuple[Any, str, List[Any]]]]:
+        """(cached metadata, multicall entries) for a token's info - only totalSupply on a cache hit"""
+        cached = self.metadata_cache.get_token(token_address)
+        if cached:
+            return cached, [(token_contract, 'totalSupply', [])]
+        return None, self._token_info_calls(token_contract)
+
+    def _token_info_from_values(self, token_address: str, cached: Optional[Dict[str, Any]],
+                                values: List[Any]) -> Dict[str, Any]:
+        """Token info from the values of the calls _token_info_plan returned"""
+        if cached:
+            return self._build_token_info(token_address, cached['name'], cached['symbol'], cached['decimals'], values[0])
+        self._cache_token_metadata(token_address, *values[:3])
+        return self._build_token_info(token_address, *values)
+
+    def _build_token_info(self, token_address: str, name: Optional[str], symbol: Optional[str],
+                          decimals: Optional[int], total_supply: Optional[int]) -> Dict[str, Any]:
+        """Build token info from multicall values, applying per-field defaults"""
+        name = name if name is not None else "Unknown"
+        symbol = symbol if symbol is not None else "UNKNOWN"
+        decimals = decimals if decimals is not None else 18
+        total_supply = total_supply if total_supply is not None else 0
+
+        return {
+            'address': token_address,
+            'name': name,
+            'symbol': symbol,
+            'decimals': decimals,
+            'total_supply': total_supply,
+            'total_supply_formatted': total_supply / (10**decimals) if total_supply > 0 else 0
+        }
+
     def _get_default_token_info(self, token_address: str) -> Dict[str, Any]:
         """Return default token info structure"""
         return {
@@ -260,19 +426,41 @@ class BlockchainInterface:
                 logging.error(f"Invalid pair address format: {pair_address}")
                 return {}
 
-            pair_contract = self.w3.eth.contract(
+            pair_contract = self.active_w3.eth.contract(
                 address=Web3.to_checksum_address(pair_address),
                 abi=self.pair_abi
             )
 
-            # Get pair data
-            token0 = pair_contract.functions.token0().call()
-            token1 = pair_contract.functions.token1().call()
-            reserves = pair_contract.functions.getReserves().call()
-
-            # Get token info for both tokens
-            token0_info = await self.get_token_info(token0)
-            token1_info = await self.get_token_info(token1)
+            # token0/token1 never change - a cached pair needs one eth_call for reserves and both tokens' info,
+            # an unseen pair one more to learn its tokens first
+            pair_tokens = self.metadata_cache.get_pair(pair_address)
+            reserves = None
+            if pair_tokens is None:
+                token0, token1, reserves = await self.multicall.aggregate([
+                    (pair_contract, 'token0', []),
+                    (pair_contract, 'token1', []),
+                    (pair_contract, 'getReserves', [])
+                ])
+                if token0 is None or token1 is None:
+                    raise ValueError("Could not read pair tokens")
+                self.metadata_cache.put_pair(pair_address, token0, token1)
+                pair_tokens = (token0, token1)
+            token0, token1 = pair_tokens
+
+            plans = [self._token_info_plan(token, self.active_w3.eth.contract(address=Web3.to_checksum_address(token), abi=self.erc20_abi))
+                     for token in pair_tokens]
+            calls = [call for _, token_calls in plans for call in token_calls]
+            if reserves is None:
+                calls.append((pair_contract, 'getReserves', []))
+            values = await self.multicall.aggregate(calls)
+            if reserves is None:
+                reserves = values.pop()
+            if reserves is None:
+                raise ValueError("Could not read pair state")
+
+            split = len(plans[0][1])
+            token0_info = self._token_info_from_values(token0, plans[0][0], values[:split])
+            token1_info = self._token_info_from_values(token1, plans[1][0], values[split:])
 
             return {
                 'pair_address': pair_address,
@@ -299,24 +487,58 @@ class BlockchainInterface:
     async def calculate_token_price_bnb(self, token_address: str, pair_address: str) -> float:
         """Calculate token price in BNB"""
         try:
-            pair_info = await self.get_pair_info(pair_address)
+            pair_contract = self.active_w3.eth.contract(
+                address=Web3.to_checksum_address(pair_address),
+                abi=self.pair_abi
+            )
+            token_contract = self.active_w3.eth.contract(
+                address=Web3.to_checksum_address(token_address),
+                abi=self.erc20_abi
+            )
+
+            # Reserves from the reserve book when tracked, plus whatever is not cached yet,
+            # in at most one multicall
+            reserves = self.reserve_book.get_reserves(pair_address)
+            pair_tokens = self.metadata_cache.get_pair(pair_address)
+            token_metadata = self.metadata_cache.get_token(token_address)
+
+            calls = [(pair_contract, 'getReserves', [])] if reserves is None else []
+            if pair_tokens is None:
+                calls += [(pair_contract, 'token0', []), (pair_contract, 'token1', [])]
+            if token_metadata is None:
+                calls += self._token_metadata_calls(token_contract)
+            values = await self.multicall.aggregate(calls) if calls else []
+
+            if reserves is None:
+                reserves = values.pop(0)
+            if pair_tokens is None:
+                pair_tokens = (values[0], values[1])
+                if None not in pair_tokens:
+                    self.metadata_cache.put_pair(pair_address, *pair_tokens)
+            token0, token1 = pair_tokens
+            if token_metadata is None:
+                name, symbol, decimals = values[-3:]
+                self._cache_token_metadata(token_address, name, symbol, decimals)
+            else:
+                decimals = token_metadata['decimals']
 
-            if not pair_info:
+            if token0 is None or token1 is None or reserves is None:
                 return 0.0
+            token_decimals = decimals if decimals is not None else 18
 
             # Determine which token is WBNB
             wbnb_checksum = Web3.to_checksum_address(self.wbnb_address)
-            token0_address = Web3.to_checksum_address(pair_info['token0']['address'])
-            token1_address = Web3.to_checksum_address(pair_info['token1']['address'])
+            token0_address = Web3.to_checksum_address(token0)
+            token1_address = Web3.to_checksum_address(token1)
 
             if token0_address == wbnb_checksum:
                 # Token1 is our target token, Token0 is WBNB
-                bnb_reserve = pair_info['token0']['reserve_formatted']
-                token_reserve = pair_info['token1']['reserve_formatted']
+                bnb_reserve = reserves[0] / 10**18
+                token_reserve = reserves[1] / 10**token_decimals
             elif token1_address == wbnb_checksum:
                 # Token0 is our target token, Token1 is WBNB
-                bnb_reserve = pair_info['token1']['reserve_formatted']
-                token_reserve = pair_info['token0']['reserve_formatted']
+                bnb_reserve = reserves[1] / 10**18
+                token_reserve = reserves[0] / 10**token_decimals
             else:
                 logging.warning("Neither token in pair is WBNB")
                 return 0.0
@@ -332,19 +554,49 @@ class BlockchainInterface:
             logging.error(f"Error calculating token price: {e}")
             return 0.0
 
+    async def get_path_reserves(self, path: List[str]) -> List[Tuple[int, int]]:
+        """(reserve_in, reserve_out) for every hop of a swap path in one multicall"""
+        hops = list(zip(path, path[1:]))
+        pair_addresses = [self.quote_engine.pair_for(token_in, token_out) for token_in, token_out in hops]
+
+        # Tracked pairs come from the reserve book; only the rest are read on-chain
+        results = [self.reserve_book.get_reserves(pair_address) for pair_address in pair_addresses]
+        missing = [i for i, reserves in enumerate(results) if reserves is None]
+        if missing:
+            fetched = await self.multicall.aggregate([
+                (self.active_w3.eth.contract(address=pair_addresses[i], abi=self.pair_abi), 'getReserves', [])
+                for i in missing
+            ])
+            for i, reserves in zip(missing, fetched):
+                results[i] = reserves
+
+        hop_reserves = []
+        for (token_in, token_out), reserves in zip(hops, results):
+            if reserves is None:
+                raise ValueError(f"No V2 pair for {token_in} -> {token_out}")
+            token0, _ = self.quote_engine.sort_tokens(token_in, token_out)
+            if token0 == Web3.to_checksum_address(token_in):
+                hop_reserves.append((reserves[0], reserves[1]))
+            else:
+                hop_reserves.append((reserves[1], reserves[0]))
+        return hop_reserves
+
+    async def quote_amounts_out(self, amount_in: int, path: List[str]) -> Tuple[List[int], float]:
+        """Router-exact getAmountsOut plus price impact, computed locally from pair reserves"""
+        hop_reserves = await self.get_path_reserves(path)
+        amounts = self.quote_engine.get_amounts_out(amount_in, hop_reserves)
+        return amounts, self.quote_engine.price_impact(amount_in, hop_reserves)
+
     async def estimate_gas_price(self) -> int:
         """Estimate optimal gas price with fallback"""
         try:
-            # Get current gas price
-            current_gas_price = self.w3.eth.gas_price
-
-            # Apply multiplier for faster execution
-            multiplier = self.config['security'].get('gas_multiplier', 1.2)
-            optimal_gas_price = int(current_gas_price * multiplier)
+            # Oracle estimate from recent blocks - no RPC on the send path
+            final_gas_price = self.gas_oracle.get_gas_price()
 
-            # Cap at maximum
-            max_gas_price = int(self.config['security'].get('max_gas_price_gwei', 20) * 10**9)
-            final_gas_price = min(optimal_gas_price, max_gas_price)
+            if final_gas_price is None:
+                # Oracle not warmed up yet - multiplier and cap from trading.gas_optimization
+                current_gas_price = await self._rpc(lambda: self.active_w3.eth.gas_price)
+                final_gas_price = self.gas_oracle.apply_policy(current_gas_price)
 
             logging.info(f"Gas price: {final_gas_price / 10**9:.2f} gwei")
             return final_gas_price
@@ -356,60 +608,97 @@ class BlockchainInterface:
     async def execute_buy_transaction(self, token_address: str, bnb_amount: float, slippage: float = 15) -> Tuple[bool, str, Dict[str, Any]]:
         """Execute buy transaction with perfect error handling"""
         try:
-            if not self.account or not self.wallet_address:
-                return False, "Account not setup", {}
-
-            token_address = Web3.to_checksum_address(token_address)
-            router_address = Web3.to_checksum_address(self.router_address)
-
-            # Get router contract
-            router_contract = self.w3.eth.contract(address=router_address, abi=self.router_abi)
-
-            # Calculate amounts
-            bnb_amount_wei = int(bnb_amount * 10**18)
-            path = [self.wbnb_address, token_address]
-
-            # Get expected output amount
-            amounts_out = router_contract.functions.getAmountsOut(bnb_amount_wei, path).call()
-            expected_tokens = amounts_out[1]
-
-            # Calculate minimum tokens with slippage
-            min_tokens_out = int(expected_tokens * (100 - slippage) / 100)
-
-            # Get current gas price
-            gas_price = await self.estimate_gas_price()
+            prepared = await self.prepare_buy_transaction(token_address, bnb_amount, slippage)
+        except Exception as e:
+            logging.error(f"Buy transaction error: {e}")
+            return False, f"Transaction error: {str(e)}", {}
 
-            # Get nonce
-            nonce = self.w3.eth.get_transaction_count(self.wallet_address)
+        return await self.send_prepared_buy(prepared)
+
+    async def prepare_buy_transaction(self, token_address: str, bnb_amount: float, slippage: float = 15) -> Dict[str, Any]:
+        """Quote, build and sign a buy without broadcasting it
+
+        Uses the reserve-based quote, the cached gas price and the next local
+        nonce, so it can run while the security checks are still in flight.
+        Nothing is reserved - dropping the result costs nothing.
+        """
+        if not self.account or not self.wallet_address:
+            raise ValueError("Account not setup")
+
+        token_address = Web3.to_checksum_address(token_address)
+        router_address = Web3.to_checksum_address(self.router_address)
+
+        # Get router contract
+        router_contract = self.active_w3.eth.contract(address=router_address, abi=self.router_abi)
+
+        # Calculate amounts
+        bnb_amount_wei = int(bnb_amount * 10**18)
+        path = [self.wbnb_address, token_address]
+
+        # Expected output from local V2 math and gas price from the oracle, concurrently
+        (amounts_out, price_impact), gas_price = await asyncio.gather(
+            self.quote_amounts_out(bnb_amount_wei, path),
+            self.estimate_gas_price()
+        )
+        expected_tokens = amounts_out[1]
+
+        # Calculate minimum tokens with slippage
+        min_tokens_out = self.quote_engine.min_amount_out(expected_tokens, slippage)
+
+        # Build transaction
+        deadline = int(time.time()) + 300  # 5 minutes
+
+        transaction = await self._rpc(lambda: router_contract.functions.swapExactETHForTokens(
+            min_tokens_out,
+            path,
+            self.wallet_address,
+            deadline
+        ).build_transaction({
+            'from': self.wallet_address,
+            'value': bnb_amount_wei,
+            'gasPrice': gas_price,
+            'gas': 350000,  # Conservative gas limit
+            'chainId': self.chain_id
+        }))
+
+        # Sign against the nonce we expect to get at broadcast time
+        nonce = await self.nonce_manager.peek()
+        signed_txn = self.w3.eth.account.sign_transaction(dict(transaction, nonce=nonce), self.account.key)
 
-            # Build transaction
-            deadline = int(time.time()) + 300  # 5 minutes
-
-            transaction = router_contract.functions.swapExactETHForTokens(
-                min_tokens_out,
-                path,
-                self.wallet_address,
-                deadline
-            ).build_transaction({
-                'from': self.wallet_address,
-                'value': bnb_amount_wei,
-                'gasPrice': gas_price,
-                'gas': 350000,  # Conservative gas limit
-                'nonce': nonce
-            })
+        return {
+            'token_address': token_address,
+            'bnb_amount': bnb_amount,
+            'expected_tokens': expected_tokens,
+            'min_tokens_out': min_tokens_out,
+            'price_impact': price_impact,
+            'gas_price': gas_price,
+            'transaction': transaction,
+            'signed': signed_txn,
+            'nonce': nonce,
+            'prepared_at': time.time(),
+            'broadcast_at': None
+        }
 
-            # Sign transaction
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, self.account.key)
+    async def send_prepared_buy(self, prepared: Dict[str, Any]) -> Tuple[bool, str, Dict[str, Any]]:
+        """Broadcast a prepared buy and wait for its receipt"""
+        try:
+            token_address = prepared['token_address']
+            gas_price = prepared['gas_price']
 
-            # Send transaction
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+            # Send transaction - re-signed only if another send took the expected nonce
+            tx_hash = await self._sign_and_send(prepared['transaction'], presigned=(prepared['nonce'], prepared['signed']))
+            prepared['broadcast_at'] = time.time()
             tx_hash_hex = tx_hash.hex()
+            sent_block = self.gas_oracle.last_block
 
             logging.info(f"{Fore.GREEN}📡 Buy transaction sent: {tx_hash_hex}{Style.RESET_ALL}")
 
             # Wait for confirmation with timeout
             try:
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+                receipt = await self.receipt_tracker.wait_for_receipt(tx_hash, timeout=120)
+
+                self.gas_oracle.record_inclusion(tx_hash_hex, gas_price, sent_block, receipt.blockNumber)
+                self.broadcaster.record_inclusion(tx_hash)
 
                 if receipt.status == 1:
                     # Success
@@ -420,13 +709,18 @@ class BlockchainInterface:
                         'transaction_hash': tx_hash_hex,
                         'gas_used': gas_used,
                         'gas_cost_bnb': gas_cost_bnb,
-                        'bnb_spent': bnb_amount,
-                        'expected_tokens': expected_tokens,
-                        'min_tokens_out': min_tokens_out,
+                        'bnb_spent': prepared['bnb_amount'],
+                        'expected_tokens': prepared['expected_tokens'],
+                        'min_tokens_out': prepared['min_tokens_out'],
+                        'price_impact': prepared['price_impact'],
                         'block_number': receipt.blockNumber
                     }
 
                     logging.info(f"{Fore.GREEN}✅ Buy transaction confirmed! Gas: {gas_cost_bnb:.6f} BNB{Style.RESET_ALL}")
+
+                    # Approve the router now so the first sell never waits on an approve
+                    if self.pre_approve_after_buy:
+                        self.pre_approve(token_address)
                     return True, "Transaction successful", result_data
                 else:
                     # Failed
@@ -450,38 +744,35 @@ class BlockchainInterface:
             token_address = Web3.to_checksum_address(token_address)
             router_address = Web3.to_checksum_address(self.router_address)
 
-            # Get token info for decimals
-            token_info = await self.get_token_info(token_address)
-            token_amount_wei = int(token_amount * 10**token_info['decimals'])
+            # Get token decimals
+            token_metadata = await self.get_token_metadata(token_address)
+            token_amount_wei = int(token_amount * 10**token_metadata['decimals'])
 
-            # Get contracts
-            router_contract = self.w3.eth.contract(address=router_address, abi=self.router_abi)
-            token_contract = self.w3.eth.contract(address=token_address, abi=self.erc20_abi)
+            # Get router contract
+            router_contract = self.active_w3.eth.contract(address=router_address, abi=self.router_abi)
 
-            # Check and approve if needed
-            allowance = token_contract.functions.allowance(self.wallet_address, router_address).call()
-            if allowance < token_amount_wei:
-                # Need to approve
-                approve_success = await self._approve_token(token_address, router_address, token_amount_wei * 2)
-                if not approve_success:
+            # Allowance from the local cache; otherwise make sure an approve is broadcast -
+            # the sell's higher nonce orders it after the approve, so there is nothing to wait for
+            allowance = self.allowance_cache.get(token_address, router_address)
+            if allowance is None or allowance < token_amount_wei:
+                if not await self.ensure_router_approval(token_address):
                     return False, "Failed to approve token", {}
 
-            # Calculate amounts
+            # Calculate amounts from local V2 math
             path = [token_address, self.wbnb_address]
-            amounts_out = router_contract.functions.getAmountsOut(token_amount_wei, path).call()
+            amounts_out, price_impact = await self.quote_amounts_out(token_amount_wei, path)
             expected_bnb = amounts_out[1]
 
             # Calculate minimum BNB with slippage
-            min_bnb_out = int(expected_bnb * (100 - slippage) / 100)
+            min_bnb_out = self.quote_engine.min_amount_out(expected_bnb, slippage)
 
-            # Get current gas price and nonce
+            # Get current gas price
             gas_price = await self.estimate_gas_price()
-            nonce = self.w3.eth.get_transaction_count(self.wallet_address)
 
             # Build transaction
             deadline = int(time.time()) + 300
 
-            transaction = router_contract.functions.swapExactTokensForETH(
+            transaction = await self._rpc(lambda: router_contract.functions.swapExactTokensForETH(
                 token_amount_wei,
                 min_bnb_out,
                 path,
@@ -491,21 +782,28 @@ class BlockchainInterface:
                 'from': self.wallet_address,
                 'gasPrice': gas_price,
                 'gas': 350000,
-                'nonce': nonce
-            })
+                'chainId': self.chain_id
+            }))
 
             # Sign and send transaction
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, self.account.key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+            tx_hash = await self._sign_and_send(transaction)
             tx_hash_hex = tx_hash.hex()
+            sent_block = self.gas_oracle.last_block
 
             logging.info(f"{Fore.YELLOW}📤 Sell transaction sent: {tx_hash_hex}{Style.RESET_ALL}")
 
             # Wait for confirmation
             try:
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+                receipt = await self.receipt_tracker.wait_for_receipt(tx_hash, timeout=120)
+
+                self.gas_oracle.record_inclusion(tx_hash_hex, gas_price, sent_block, receipt.blockNumber)
+                self.broadcaster.record_inclusion(tx_hash)
 
                 if receipt.status == 1:
+                    # Tokens that emit no Approval on transferFrom still spent allowance
+                    if not self.allowance_cache.update_from_receipt(receipt, self.wallet_address):
+                        self.allowance_cache.consume(token_address, router_address, token_amount_wei)
+
                     gas_used = receipt.gasUsed
                     gas_cost_bnb = (gas_used * gas_price) / 10**18
 
@@ -516,6 +814,7 @@ class BlockchainInterface:
                         'tokens_sold': token_amount,
                         'expected_bnb': expected_bnb / 10**18,
                         'min_bnb_out': min_bnb_out / 10**18,
+                        'price_impact': price_impact,
                         'block_number': receipt.blockNumber
                     }
 
@@ -533,31 +832,110 @@ class BlockchainInterface:
             logging.error(f"Sell transaction error: {e}")
             return False, f"Sell error: {str(e)}", {}
 
-    async def _approve_token(self, token_address: str, spender_address: str, amount: int) -> bool:
-        """Approve token spending"""
-        try:
-            token_contract = self.w3.eth.contract(
-                address=Web3.to_checksum_address(token_address),
-                abi=self.erc20_abi
-            )
+    async def _sign_and_send(self, transaction: Dict[str, Any], presigned: Optional[Tuple[int, Any]] = None):
+        """Assign a local nonce, sign and broadcast - concurrent sends never wait on each other
 
-            gas_price = await self.estimate_gas_price()
-            nonce = self.w3.eth.get_transaction_count(self.wallet_address)
+        presigned is an optional (nonce, signed transaction) reused when the
+        allocated nonce matches.
+        """
+        for attempt in range(2):
+            nonce = await self.nonce_manager.allocate()
+            if presigned and presigned[0] == nonce:
+                signed_txn = presigned[1]
+            else:
+                signed_txn = self.w3.eth.account.sign_transaction(dict(transaction, nonce=nonce), self.account.key)
 
-            transaction = token_contract.functions.approve(
-                Web3.to_checksum_address(spender_address),
-                amount
-            ).build_transaction({
-                'from': self.wallet_address,
-                'gasPrice': gas_price,
-                'gas': 100000,
-                'nonce': nonce
-            })
+            try:
+                if self.broadcast_fanout:
+                    return await self.broadcaster.broadcast(signed_txn.rawTransaction, signed_txn.hash)
+                return await self._rpc(lambda: self.active_w3.eth.send_raw_transaction(signed_txn.rawTransaction))
+
+            except Exception as e:
+                if NonceManager.is_already_known(e):
+                    return signed_txn.hash
+                if NonceManager.is_nonce_error(e) and attempt == 0:
+                    logging.warning(f"{Fore.YELLOW}⚠️ Nonce {nonce} rejected ({e}), resyncing from chain{Style.RESET_ALL}")
+                    await self.nonce_manager.resync()
+                    continue
+                # A timeout may still have propagated the transaction, so never hand the nonce
+                # out again blindly - re-read it from the node before the next send
+                await self.nonce_manager.invalidate()
+                raise
+
+    def pre_approve(self, token_address: str) -> asyncio.Future:
+        """Start an unlimited router approval in the background
+
+        Returns a future that resolves to True once the approve is broadcast.
+        """
+        token_address = Web3.to_checksum_address(token_address)
+        broadcast = self._approval_broadcasts.get(token_address)
+        if broadcast is not None:
+            return broadcast
+
+        broadcast = asyncio.get_running_loop().create_future()
+        self._approval_broadcasts[token_address] = broadcast
+        task = asyncio.create_task(self._run_router_approval(token_address, broadcast))
+        self._approval_tasks.add(task)
+        task.add_done_callback(self._approval_tasks.discard)
+        return broadcast
+
+    async def ensure_router_approval(self, token_address: str) -> bool:
+        """Wait only until a router approval is broadcast, never for its receipt"""
+        return await asyncio.shield(self.pre_approve(token_address))
+
+    async def _run_router_approval(self, token_address: str, broadcast: asyncio.Future) -> None:
+        router_address = Web3.to_checksum_address(self.router_address)
+        try:
+            tx_hash = await self._send_approval(token_address, router_address, MAX_UINT256)
+            broadcast.set_result(True)
+            logging.info(f"{Fore.CYAN}🔓 Router approval sent for {token_address}: {tx_hash.hex()}{Style.RESET_ALL}")
+
+            receipt = await self.receipt_tracker.wait_for_receipt(tx_hash, timeout=60)
+            if receipt.status == 1:
+                if not self.allowance_cache.update_from_receipt(receipt, self.wallet_address):
+                    self.allowance_cache.set(token_address, router_address, MAX_UINT256)
+            else:
+                logging.error(f"{Fore.RED}❌ Router approval failed for {token_address}{Style.RESET_ALL}")
 
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, self.account.key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        except Exception as e:
+            logging.error(f"Approval error: {e}")
+            if not broadcast.done():
+                broadcast.set_result(False)
+
+        finally:
+            # Cache now holds the result - a failed approval is retried by the next sell
+            if self._approval_broadcasts.get(token_address) is broadcast:
+                del self._approval_broadcasts[token_address]
+
+    async def _send_approval(self, token_address: str, spender_address: str, amount: int):
+        """Build, sign and broadcast an approve, returning its hash"""
+        token_contract = self.active_w3.eth.contract(
+            address=Web3.to_checksum_address(token_address),
+            abi=self.erc20_abi
+        )
+
+        gas_price = await self.estimate_gas_price()
+
+        transaction = await self._rpc(lambda: token_contract.functions.approve(
+            Web3.to_checksum_address(spender_address),
+            amount
+        ).build_transaction({
+            'from': self.wallet_address,
+            'gasPrice': gas_price,
+            'gas': 100000,
+            'chainId': self.chain_id
+        }))
+
+        return await self._sign_and_send(transaction)
+
+    async def _approve_token(self, token_address: str, spender_address: str, amount: int) -> bool:
+        """Approve token spending"""
+        try:
+            tx_hash = await self._send_approval(token_address, spender_address, amount)
 
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
+            receipt = await self.receipt_tracker.wait_for_receipt(tx_hash, timeout=60)
+            if receipt.status == 1 and not self.allowance_cache.update_from_receipt(receipt, self.wallet_address):
+                self.allowance_cache.set(token_address, spender_address, amount)
             return receipt.status == 1
 
         except Exception as e:
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+On-Chain BNB/USD Price Feed
+Derives BNB/USD from PancakeSwap WBNB stablecoin pair reserves, refreshed once per block
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Callable, List, Optional
+
+from web3 import Web3
+
+class BNBPriceFeed:
+    def __init__(self, config: Dict[str, Any], blockchain_interface):
+        self.blockchain = blockchain_interface
+
+        feed_config = config['blockchain'].get('bnb_price_feed', {})
+        self.enabled = feed_config.get('enabled', True)
+        self.poll_interval = feed_config.get('poll_interval_seconds', 1.0)
+        self.max_age = feed_config.get('max_age_seconds', 30)
+
+        # BUSD and BSC-USD both use 18 decimals, like WBNB
+        self.wbnb_address = Web3.to_checksum_address(config['blockchain']['wbnb_address'])
+        stablecoins = [config['blockchain']['busd_address'], config['blockchain'].get('usdt_address')]
+        self.pairs: List[Dict[str, Any]] = []
+        for stablecoin in filter(None, stablecoins):
+            stablecoin = Web3.to_checksum_address(stablecoin)
+            token0, _ = blockchain_interface.quote_engine.sort_tokens(self.wbnb_address, stablecoin)
+            self.pairs.append({
+                'address': blockchain_interface.quote_engine.pair_for(self.wbnb_address, stablecoin),
+                'stablecoin': stablecoin,
+                'wbnb_is_token0': token0 == self.wbnb_address
+            })
+
+        self.price: Optional[float] = None
+        self.block: Optional[int] = None
+        self.updated_at = 0.0
+
+        self.stats = {
+            'refreshes': 0,
+            'failures': 0
+        }
+
+    def get_price(self) -> Optional[float]:
+        """Last BNB/USD price (no RPC), None before the first refresh"""
+        return self.price
+
+    def get_age(self) -> Optional[float]:
+        """Seconds since the price was last read from the chain"""
+        return time.time() - self.updated_at if self.price is not None else None
+
+    def is_stale(self) -> bool:
+        age = self.get_age()
+        return age is None or age > self.max_age
+
+    async def run(self, is_running: Callable[[], bool]) -> None:
+        """Refresh on every new block until is_running() is False"""
+        if not self.enabled:
+            return
+        while is_running():
+            try:
+                head = await self.blockchain._rpc(lambda: self.blockchain.active_w3.eth.block_number)
+                if head != self.block:
+                    await self.refresh(head)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['failures'] += 1
+                logging.warning(f"BNB price refresh failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def refresh(self, block_number: Optional[int] = None) -> Optional[float]:
+        """Read both stablecoin pairs in one multicall and update the price"""
+        pair_contracts = [
+            self.blockchain.active_w3.eth.contract(address=pair['address'], abi=self.blockchain.pair_abi)
+            for pair in self.pairs
+        ]
+        results = await self.blockchain.multicall.aggregate(
+            [(pair_contract, 'getReserves', []) for pair_contract in pair_contracts]
+        )
+
+        # Pooled across pairs - the deeper pool dominates
+        wbnb_total = 0
+        stable_total = 0
+        for pair, reserves in zip(self.pairs, results):
+            if reserves is None:
+                continue
+            wbnb_reserve, stable_reserve = (reserves[0], reserves[1]) if pair['wbnb_is_token0'] else (reserves[1], reserves[0])
+            wbnb_total += wbnb_reserve
+            stable_total += stable_reserve
+
+        if wbnb_total == 0:
+            raise ValueError("No WBNB stablecoin reserves available")
+
+        self.price = stable_total / wbnb_total
+        self.block = block_number
+        self.updated_at = time.time()
+        self.stats['refreshes'] += 1
+        return self.price
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Current price, source block and staleness"""
+        age = self.get_age()
+        return {
+            **self.stats,
+            'price': round(self.price, 2) if self.price is not None else None,
+            'block': self.block,
+            'age_seconds': round(age, 1) if age is not None else None,
+            'stale': self.is_stale()
+        }
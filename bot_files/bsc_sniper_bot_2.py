@@ -11,8 +11,9 @@ import time
 import signal
 import sys
 import os
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from web3 import Web3
 from colorama import Fore, Style, init
 from dotenv import load_dotenv
@@ -22,6 +23,7 @@ from advanced_security_engine import AdvancedSecurityEngine
 from blockchain_interface import BlockchainInterface
 from profit_management import ProfitManager
 from telegram_notifier import TelegramNotifier
+from pair_event_stream import PairEventStream
 
 # Initialize colorama
 init()
@@ -54,16 +56,21 @@ class BSCSniperBot2:
         self.running = False
         self.start_time = 0
         self.processed_pairs = set()
+        self.pair_tasks = set()
         self.session_stats = {
             'tokens_detected': 0,
             'tokens_analyzed': 0,
             'tokens_purchased': 0,
             'total_profit_bnb': 0.0
         }
+
+        # Seconds from PairCreated detection to buy broadcast
+        self.broadcast_latencies = deque(maxlen=500)
         
-        # Initialize security engine and profit manager
+        # Initialize security engine, profit manager and pair stream
         self.security_engine = None
         self.profit_manager = None
+        self.pair_stream = None
         
         # Setup logging
         self.setup_logging()
@@ -137,6 +144,10 @@ class BSCSniperBot2:
                 self.monitor_new_pairs(),
                 self.manage_positions(),
                 self.send_periodic_updates(),
+                self.monitor_rpc_health(),
+                self.blockchain.reserve_book.run(lambda: self.running),
+                self.blockchain.gas_oracle.run(lambda: self.running),
+                self.blockchain.price_feed.run(lambda: self.running),
                 return_exceptions=True
             )
             
@@ -220,8 +231,15 @@ class BSCSniperBot2:
                 
                 # Initialize security engine with error handling
                 try:
-                    self.security_engine = AdvancedSecurityEngine(self.config, self.blockchain.w3)
-                    logging.info("✅ Security engine initialized")
+                    self.security_engine = AdvancedSecurityEngine(
+                        self.config, self.blockchain.active_w3,
+                        self.blockchain.metadata_cache, self.blockchain.reserve_book,
+                        self.blockchain.price_feed
+                    )
+                    # Handshakes happen now rather than on the first token
+                    await self.security_engine.open_session()
+                    warmed = await self.security_engine.warm_connections()
+                    logging.info(f"✅ Security engine initialized ({warmed} API hosts warmed)")
                 except Exception as security_error:
                     logging.error(f"Security engine initialization failed: {security_error}")
                     if attempt < initialization_attempts - 1:
@@ -231,7 +249,7 @@ class BSCSniperBot2:
                 
                 # Initialize profit manager with error handling
                 try:
-                    self.profit_manager = ProfitManager(self.config, self.blockchain, self.notifier)
+                    self.profit_manager = ProfitManager(self.config, self.blockchain, self.notifier, self.security_engine)
                     logging.info("✅ Profit manager initialized")
                 except Exception as profit_error:
                     logging.error(f"Profit manager initialization failed: {profit_error}")
@@ -240,6 +258,17 @@ class BSCSniperBot2:
                         continue
                     return False
                 
+                # Initialize push-based pair ingestion
+                try:
+                    self.pair_stream = PairEventStream(self.config, self.blockchain)
+                    logging.info("✅ Pair event stream initialized")
+                except Exception as stream_error:
+                    logging.error(f"Pair event stream initialization failed: {stream_error}")
+                    if attempt < initialization_attempts - 1:
+                        await asyncio.sleep(attempt + 1)
+                        continue
+                    return False
+
                 # Verify all components are properly initialized
                 if not all([self.blockchain, self.security_engine, self.profit_manager]):
                     logging.error("Component verification failed - some components are None")
@@ -315,7 +344,23 @@ class BSCSniperBot2:
     async def monitor_new_pairs(self):
         """Monitor for new pair creation events"""
         logging.info(f"{Fore.YELLOW}🔍 Starting pair monitoring...{Style.RESET_ALL}")
-        
+
+        # Catch up on pairs created while the bot was down
+        try:
+            await self.pair_stream.backfill_from_checkpoint(self.dispatch_pair_event)
+        except Exception as e:
+            logging.error(f"Pair backfill error: {e}")
+
+        # Prefer WebSocket log subscription, fall back to HTTP filter polling
+        if self.pair_stream and self.pair_stream.ws_endpoints:
+            try:
+                if await self.pair_stream.run(self.dispatch_pair_event, lambda: self.running):
+                    return
+            except Exception as e:
+                logging.error(f"WebSocket pair monitoring error: {e}")
+        else:
+            logging.info("No WebSocket endpoints configured, using HTTP filter polling")
+
         try:
             # Get factory contract
             factory_address = Web3.to_checksum_address(self.blockchain.factory_address)
@@ -324,16 +369,22 @@ class BSCSniperBot2:
                 abi=self.blockchain.factory_abi
             )
             
-            # Create event filter for new pairs
-            event_filter = factory_contract.events.PairCreated.create_filter(fromBlock='latest')
+            # Create event filter for new pairs, starting right after the backfilled range
+            from_block = self.pair_stream.last_block + 1 if self.pair_stream.last_block else 'latest'
+            event_filter = factory_contract.events.PairCreated.create_filter(fromBlock=from_block)
             
             while self.running:
                 try:
+                    # Head read before polling is fully covered once the poll returns
+                    head = await asyncio.to_thread(lambda: self.blockchain.w3.eth.block_number)
+
                     # Check for new events
-                    new_events = event_filter.get_new_entries()
+                    new_events = await asyncio.to_thread(event_filter.get_new_entries)
                     
                     for event in new_events:
                         await self.handle_new_pair_event(event)
+
+                    self.pair_stream.mark_covered(head)
                     
                     # Small delay to prevent excessive API calls
                     await asyncio.sleep(1)
@@ -346,8 +397,20 @@ class BSCSniperBot2:
             logging.error(f"Fatal error in pair monitoring: {e}")
             await self.notifier.notify_error("Pair Monitoring Error", str(e))
 
-    async def handle_new_pair_event(self, event):
+    async def dispatch_pair_event(self, event) -> asyncio.Task:
+        """Handle a pushed PairCreated event without blocking ingestion"""
+        return self.spawn(self.handle_new_pair_event(event, time.time()))
+
+    def spawn(self, coro) -> asyncio.Task:
+        """Run a coroutine in the background, keeping a reference until it finishes"""
+        task = asyncio.create_task(coro)
+        self.pair_tasks.add(task)
+        task.add_done_callback(self.pair_tasks.discard)
+        return task
+
+    async def handle_new_pair_event(self, event, detected_at: Optional[float] = None):
         """Handle new pair creation event"""
+        detected_at = detected_at or time.time()
         try:
             pair_address = event['args']['pair']
             token0 = event['args']['token0']
@@ -359,6 +422,9 @@ class BSCSniperBot2:
             
             self.processed_pairs.add(pair_address)
             self.session_stats['tokens_detected'] += 1
+
+            # The event already tells us the pair's tokens - no need to read them again
+            self.blockchain.metadata_cache.put_pair(pair_address, token0, token1)
             
             # Determine which token is new (not WBNB/BUSD/USDT)
             wbnb_address = Web3.to_checksum_address(self.blockchain.wbnb_address)
@@ -395,40 +461,75 @@ class BSCSniperBot2:
                 estimated_age_minutes
             )
             
-            # Run comprehensive security analysis
-            await self.analyze_and_trade_token(new_token, pair_address, token_info)
+            # Follow the candidate's reserves while it is analyzed; keep them only if we buy
+            self.blockchain.reserve_book.track(pair_address)
+            try:
+                # Run comprehensive security analysis
+                await self.analyze_and_trade_token(new_token, pair_address, token_info, detected_at)
+            finally:
+                if new_token not in self.profit_manager.positions:
+                    self.blockchain.reserve_book.untrack(pair_address)
             
         except Exception as e:
             logging.error(f"Error handling new pair event: {e}")
 
-    async def analyze_and_trade_token(self, token_address: str, pair_address: str, token_info: Dict[str, Any]):
+    async def analyze_and_trade_token(self, token_address: str, pair_address: str, token_info: Dict[str, Any],
+                                      detected_at: Optional[float] = None):
         """Analyze token and execute trade if it passes all checks"""
+        speculative_task = None
         try:
             self.session_stats['tokens_analyzed'] += 1
             
             logging.info(f"{Fore.CYAN}🔍 Analyzing {token_info['symbol']} ({token_address[:8]}...){Style.RESET_ALL}")
             
+            # Build and sign the buy while the security checks run
+            if self.config['trading'].get('speculative_buy', True):
+                speculative_task = asyncio.create_task(self.prepare_buy_order(token_address))
+            
             # Run comprehensive security check
-            async with self.security_engine:
-                is_safe, failed_reasons, detailed_results = await self.security_engine.comprehensive_security_check(
-                    token_address, pair_address
-                )
+            is_safe, failed_reasons, detailed_results = await self.security_engine.comprehensive_security_check(
+                token_address, pair_address
+            )
             
-            # Notify security check result
-            await self.notifier.notify_security_check_result(
+            # Notify security check result without holding up the buy
+            self.spawn(self.notifier.notify_security_check_result(
                 token_address, is_safe, failed_reasons, detailed_results
-            )
+            ))
             
             if is_safe:
                 # Token passed all security checks - execute buy
-                await self.execute_buy_order(token_address, pair_address, token_info)
+                speculative = await speculative_task if speculative_task else None
+                await self.execute_buy_order(token_address, pair_address, token_info, speculative, detected_at)
             else:
                 logging.warning(f"{Fore.RED}❌ {token_info['symbol']} failed security checks: {', '.join(failed_reasons[:3])}{Style.RESET_ALL}")
             
         except Exception as e:
             logging.error(f"Error analyzing token {token_address}: {e}")
+        finally:
+            # Unsafe or failed analysis - the pre-signed buy is simply dropped
+            if speculative_task and not speculative_task.done():
+                speculative_task.cancel()
+
+    async def prepare_buy_order(self, token_address: str) -> Optional[Tuple[float, Optional[Dict[str, Any]]]]:
+        """Wallet balance and a signed, unsent buy, gathered concurrently"""
+        buy_amount_bnb = self.config['trading']['buy_amount_bnb']
+        balance, prepared = await asyncio.gather(
+            self.blockchain.get_wallet_balance(),
+            self.blockchain.prepare_buy_transaction(
+                token_address, buy_amount_bnb, self.config['trading']['slippage_tolerance']
+            ),
+            return_exceptions=True
+        )
+        if isinstance(balance, Exception):
+            return None
+        if isinstance(prepared, Exception):
+            logging.warning(f"Speculative buy preparation failed: {prepared}")
+            prepared = None
+        return balance, prepared
 
-    async def execute_buy_order(self, token_address: str, pair_address: str, token_info: Dict[str, Any]):
+    async def execute_buy_order(self, token_address: str, pair_address: str, token_info: Dict[str, Any],
+                                speculative: Optional[Tuple[float, Optional[Dict[str, Any]]]] = None,
+                                detected_at: Optional[float] = None):
         """Execute buy order for approved token"""
         try:
             buy_amount_bnb = self.config['trading']['buy_amount_bnb']
@@ -440,8 +541,8 @@ class BSCSniperBot2:
                 logging.warning(f"Max concurrent positions reached ({len(self.profit_manager.positions)})")
                 return
             
-            # Check wallet balance
-            balance = await self.blockchain.get_wallet_balance()
+            # Check wallet balance (already read during the security checks when speculative)
+            balance, prepared = speculative if speculative else (await self.blockchain.get_wallet_balance(), None)
             required_balance = buy_amount_bnb + self.config['trading']['gas_reserve_bnb']
             
             if balance < required_balance:
@@ -449,15 +550,25 @@ class BSCSniperBot2:
                 await self.notifier.notify_error("Insufficient Balance", f"Need {required_balance:.6f} BNB")
                 return
             
-            # Notify buy attempt
-            await self.notifier.notify_buy_attempt(
+            # Notify buy attempt without holding up the broadcast
+            self.spawn(self.notifier.notify_buy_attempt(
                 token_address, buy_amount_bnb, 0, token_info['symbol']
-            )
+            ))
+            
+            # Quote and gas price go stale - rebuild a speculative buy that waited too long
+            max_age = self.config['trading'].get('speculative_max_age_seconds', 15)
+            if prepared is None or time.time() - prepared['prepared_at'] > max_age:
+                prepared = await self.blockchain.prepare_buy_transaction(
+                    token_address, buy_amount_bnb, self.config['trading']['slippage_tolerance']
+                )
             
             # Execute buy transaction
-            success, message, result_data = await self.blockchain.execute_buy_transaction(
-                token_address, buy_amount_bnb, self.config['trading']['slippage_tolerance']
-            )
+            success, message, result_data = await self.blockchain.send_prepared_buy(prepared)
+            
+            if prepared['broadcast_at'] and detected_at:
+                latency = prepared['broadcast_at'] - detected_at
+                self.broadcast_latencies.append(latency)
+                logging.info(f"{Fore.CYAN}⚡ Detection to broadcast: {latency * 1000:.0f}ms{Style.RESET_ALL}")
             
             if success:
                 # Buy successful
@@ -522,6 +633,19 @@ class BSCSniperBot2:
                 logging.error(f"Error in position management: {e}")
                 await asyncio.sleep(30)  # Longer delay on error
 
+    async def monitor_rpc_health(self):
+        """Keep RPC endpoint pool scores and head blocks fresh"""
+        interval = self.config['blockchain'].get('rpc_pool', {}).get('health_check_interval_seconds', 5)
+
+        while self.running:
+            try:
+                await self.blockchain.check_rpc_health()
+                await asyncio.sleep(interval)
+
+            except Exception as e:
+                logging.error(f"Error checking RPC health: {e}")
+                await asyncio.sleep(30)
+
     async def send_periodic_updates(self):
         """Send periodic status updates"""
         last_update = 0
@@ -563,6 +687,24 @@ class BSCSniperBot2:
             
             # Send daily summary
             await self.notifier.notify_daily_summary(status)
+
+            logging.info(f"Token metadata cache: {self.blockchain.metadata_cache.get_metrics()}")
+            logging.info(f"Reserve book: {self.blockchain.reserve_book.get_metrics()}")
+            logging.info(f"BNB price feed: {self.blockchain.price_feed.get_metrics()}")
+            if self.security_engine:
+                logging.info(f"GoPlus batching: {self.security_engine.goplus_batcher.get_metrics()}")
+                logging.info(f"Security verdict cache: {self.security_engine.verdict_cache.get_metrics()}")
+                logging.info(f"Bytecode fingerprints: {self.security_engine.fingerprint_index.get_metrics()}")
+                logging.info(f"Selector scans: {self.security_engine.selector_scanner.get_metrics()}")
+                logging.info(f"EVM honeypot simulation: {self.security_engine.evm_simulator.get_metrics()}")
+                logging.info(f"Security checks: {self.security_engine.check_stats}, "
+                             f"latency {self.security_engine.get_check_latency_metrics()}")
+                logging.info(f"Security APIs: {self.security_engine.get_api_guard_metrics()}")
+            if self.broadcast_latencies:
+                ordered = sorted(self.broadcast_latencies)
+                logging.info(f"Detection to broadcast: p50 {ordered[len(ordered) // 2] * 1000:.0f}ms, "
+                             f"p95 {ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000:.0f}ms "
+                             f"over {len(ordered)} buys")
             
         except Exception as e:
             logging.error(f"Error sending status update: {e}")
@@ -572,12 +714,18 @@ class BSCSniperBot2:
         try:
             logging.info("Cleaning up resources...")
             
-            if self.security_engine and hasattr(self.security_engine, 'session') and self.security_engine.session:
-                await self.security_engine.session.close()
+            if self.security_engine:
+                await self.security_engine.close()
             
             # Save final positions
             if self.profit_manager:
                 self.profit_manager.save_positions()
+
+            # Save pair ingestion checkpoint for gap-free restart
+            if self.pair_stream:
+                self.pair_stream.save_checkpoint()
+
+            await self.blockchain.close()
             
             logging.info("Cleanup completed")
             
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Bytecode Fingerprint Index
+Normalized runtime-code hashes mapped to past verdicts and trade outcomes, so clones are judged in one RPC call
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from eth_utils import keccak
+from web3 import Web3
+
+# Solidity appends CBOR metadata as a map (0xa1-0xa7 header) followed by its 2-byte length
+CBOR_MAP_HEADERS = range(0xa1, 0xa8)
+
+PUSH1 = 0x60
+PUSH32 = 0x7f
+
+# Outcomes that count against the bytecode - a rug is done to the pool, not by the code, so it is only tracked
+BAD_OUTCOMES = ('sell_failed',)
+
+def normalize_bytecode(code: bytes) -> bytes:
+    """Runtime code with the metadata trailer removed and PUSH32 operands zeroed
+
+    Immutables are written into PUSH32 placeholders at deploy time, so zeroing
+    every PUSH32 operand removes constructor-specific values. Constant hashes
+    such as event topics are masked too, which clones share anyway.
+    """
+    code = bytes(code)
+    if len(code) > 2:
+        metadata_length = int.from_bytes(code[-2:], 'big')
+        start = len(code) - 2 - metadata_length
+        if metadata_length and start >= 0 and code[start] in CBOR_MAP_HEADERS:
+            code = code[:start]
+
+    normalized = bytearray(code)
+    i = 0
+    while i < len(normalized):
+        opcode = normalized[i]
+        if PUSH1 <= opcode <= PUSH32:
+            size = opcode - PUSH1 + 1
+            if opcode == PUSH32:
+                end = min(len(normalized), i + 1 + size)
+                normalized[i + 1:end] = bytes(end - i - 1)
+            i += 1 + size
+        else:
+            i += 1
+    return bytes(normalized)
+
+def fingerprint_bytecode(code: bytes) -> Optional[str]:
+    """keccak of the normalized code, None for an address without code"""
+    if not code:
+        return None
+    return '0x' + keccak(normalize_bytecode(code)).hex()
+
+class BytecodeFingerprintIndex:
+    def __init__(self, cache_file: str = 'bytecode_fingerprints.db'):
+        self.cache_file = cache_file
+        self.fingerprints: Dict[str, Dict[str, Any]] = {}
+        self.token_fingerprints: Dict[str, str] = {}
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.stats = {
+            'lookups': 0,
+            'matches': 0,
+            'bad_matches': 0
+        }
+
+        try:
+            self._db = sqlite3.connect(cache_file)
+            self._db.execute("CREATE TABLE IF NOT EXISTS fingerprints (fingerprint TEXT PRIMARY KEY, data TEXT NOT NULL)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS tokens (token TEXT PRIMARY KEY, fingerprint TEXT NOT NULL)")
+            self._db.commit()
+            self.fingerprints = {row[0]: json.loads(row[1]) for row in self._db.execute("SELECT fingerprint, data FROM fingerprints")}
+            self.token_fingerprints = dict(self._db.execute("SELECT token, fingerprint FROM tokens").fetchall())
+        except Exception as e:
+            logging.warning(f"Bytecode fingerprint index unavailable on disk ({e}), using memory only")
+            self._db = None
+
+    def lookup(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Past verdicts and outcomes for a fingerprint, None if never seen"""
+        self.stats['lookups'] += 1
+        entry = self.fingerprints.get(fingerprint)
+        if entry is not None:
+            self.stats['matches'] += 1
+        return entry
+
+    def known_bad(self, entry: Optional[Dict[str, Any]], min_bad_matches: int = 2,
+                  min_bad_ratio: float = 0.8) -> Tuple[bool, Optional[str]]:
+        """(is_bad, reason) for an index entry
+
+        Only definite rejections and bad outcomes count against the bytecode and
+        only passes and good outcomes count for it; rejections for liquidity or
+        holders say nothing about the code. The entry is bad once it has at
+        least min_bad_matches bad results making up at least min_bad_ratio of
+        the counted ones.
+        """
+        if not entry:
+            return False, None
+        bad = entry['definite_rejections'] + entry['bad_outcomes']
+        counted = bad + entry['passes'] + entry['good_outcomes']
+        if bad < min_bad_matches or bad < min_bad_ratio * counted:
+            return False, None
+        self.stats['bad_matches'] += 1
+        reason = entry['last_bad_reason'] or 'known-bad contract'
+        return True, f"Clone of {entry['sample_token']} ({bad} bad of {counted} judged): {reason}"
+
+    def record_verdict(self, fingerprint: str, token_address: str, is_safe: bool,
+                       failed_reasons: List[str], definite: bool) -> None:
+        """Count a security verdict against the fingerprint"""
+        token_address = Web3.to_checksum_address(token_address)
+        entry = self.fingerprints.get(fingerprint) or {
+            'tokens': 0,
+            'passes': 0,
+            'rejections': 0,
+            'definite_rejections': 0,
+            'good_outcomes': 0,
+            'bad_outcomes': 0,
+            'rugged_outcomes': 0,
+            'last_bad_reason': None,
+            'sample_token': token_address,
+            'first_seen': time.time()
+        }
+        if self.token_fingerprints.get(token_address) != fingerprint:
+            entry['tokens'] += 1
+            self.token_fingerprints[token_address] = fingerprint
+            self._write("INSERT OR REPLACE INTO tokens (token, fingerprint) VALUES (?, ?)", (token_address, fingerprint))
+
+        if is_safe:
+            entry['passes'] += 1
+        else:
+            entry['rejections'] += 1
+            if definite:
+                entry['definite_rejections'] += 1
+                if failed_reasons:
+                    entry['last_bad_reason'] = failed_reasons[0]
+        entry['last_seen'] = time.time()
+        self._store(fingerprint, entry)
+
+    def record_outcome(self, token_address: str, outcome: str) -> None:
+        """Attach a trade outcome (profit, loss, rugged, sell_failed) to the token's fingerprint"""
+        fingerprint = self.token_fingerprints.get(Web3.to_checksum_address(token_address))
+        entry = self.fingerprints.get(fingerprint) if fingerprint else None
+        if entry is None:
+            return
+        if outcome in BAD_OUTCOMES:
+            entry['bad_outcomes'] += 1
+            entry['last_bad_reason'] = f"previous trade {outcome.replace('_', ' ')}"
+        elif outcome == 'rugged':
+            entry['rugged_outcomes'] = entry.get('rugged_outcomes', 0) + 1
+        else:
+            entry['good_outcomes'] += 1
+        self._store(fingerprint, entry)
+
+    def _store(self, fingerprint: str, entry: Dict[str, Any]) -> None:
+        self.fingerprints[fingerprint] = entry
+        self._write("INSERT OR REPLACE INTO fingerprints (fingerprint, data) VALUES (?, ?)", (fingerprint, json.dumps(entry)))
+
+    def _write(self, statement: str, params: Tuple) -> None:
+        if self._db is None:
+            return
+        try:
+            self._db.execute(statement, params)
+            self._db.commit()
+        except Exception as e:
+            logging.warning(f"Bytecode fingerprint index write failed: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Index size and match counts"""
+        return {
+            **self.stats,
+            'fingerprints': len(self.fingerprints),
+            'tokens': len(self.token_fingerprints)
+        }
+
+    def close(self) -> None:
+        """Close the on-disk index"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Background Gas Price Oracle
+Samples recent block gas prices so the send path never waits on eth_gasPrice
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, Callable, List, Optional
+
+class GasOracle:
+    def __init__(self, config: Dict[str, Any], blockchain_interface):
+        self.blockchain = blockchain_interface
+
+        gas_config = config['trading'].get('gas_optimization', {})
+        self.multiplier = gas_config.get('gas_price_multiplier', 1.2)
+        self.max_gas_price = int(gas_config.get('max_gas_price_gwei', 20) * 10**9)
+        self.fast_mode = gas_config.get('fast_execution_mode', True)
+        self.sample_blocks = gas_config.get('oracle_sample_blocks', 5)
+        self.poll_interval = gas_config.get('oracle_poll_interval_seconds', 3)
+        self.fast_percentile = gas_config.get('oracle_fast_percentile', 75)
+        self.standard_percentile = gas_config.get('oracle_standard_percentile', 50)
+        self.max_age = gas_config.get('oracle_max_age_seconds', 30)
+
+        # Per-block sorted gas prices for the sampling window
+        self._block_prices: deque = deque(maxlen=self.sample_blocks)
+        self.last_block: Optional[int] = None
+
+        self.standard: Optional[int] = None
+        self.fast: Optional[int] = None
+        self.updated_at = 0.0
+
+        # Estimate and inclusion history for gas vs latency benchmarking
+        self.history: deque = deque(maxlen=gas_config.get('oracle_history_size', 1000))
+        self.inclusions: deque = deque(maxlen=gas_config.get('oracle_history_size', 1000))
+
+    def get_gas_price(self) -> Optional[int]:
+        """Cached send gas price (no RPC), None until the oracle has fresh samples"""
+        if self.standard is None or time.time() - self.updated_at > self.max_age:
+            return None
+        base = self.fast if self.fast_mode else self.standard
+        return self.apply_policy(base)
+
+    def apply_policy(self, gas_price: int) -> int:
+        """Apply the configured multiplier and cap"""
+        return min(int(gas_price * self.multiplier), self.max_gas_price)
+
+    async def run(self, is_running: Callable[[], bool]) -> None:
+        """Sample new blocks until is_running() is False"""
+        while is_running():
+            try:
+                await self.sample()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"Gas oracle sampling failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def sample(self) -> None:
+        """Read blocks since the last sample and refresh the percentiles"""
+        head = await self.blockchain._rpc(lambda: self.blockchain.active_w3.eth.block_number)
+        first = head - self.sample_blocks + 1 if self.last_block is None else self.last_block + 1
+        first = max(first, head - self.sample_blocks + 1)
+        if first > head:
+            return
+
+        blocks = await asyncio.gather(*(
+            self.blockchain._rpc(lambda number=number: self.blockchain.active_w3.eth.get_block(number, True))
+            for number in range(first, head + 1)
+        ))
+        for block in blocks:
+            self._block_prices.append(self._block_gas_prices(block))
+        self.last_block = head
+
+        prices = sorted(price for block_prices in self._block_prices for price in block_prices)
+        if not prices:
+            return
+
+        self.standard = self._percentile(prices, self.standard_percentile)
+        self.fast = self._percentile(prices, self.fast_percentile)
+        self.updated_at = time.time()
+        self.history.append({
+            'timestamp': self.updated_at,
+            'block': head,
+            'standard': self.standard,
+            'fast': self.fast,
+            'estimate': self.get_gas_price(),
+            'samples': len(prices)
+        })
+
+    def _block_gas_prices(self, block: Dict[str, Any]) -> List[int]:
+        base_fee = block.get('baseFeePerGas') or 0
+        prices = []
+        for tx in block.get('transactions', []):
+            if isinstance(tx, (bytes, str)):
+                continue
+            if tx.get('maxFeePerGas') is not None:
+                price = min(tx['maxFeePerGas'], base_fee + tx.get('maxPriorityFeePerGas', 0))
+            else:
+                price = tx.get('gasPrice', 0)
+            # Zero-price system transactions say nothing about the market
+            if price > 0:
+                prices.append(price)
+        return prices
+
+    @staticmethod
+    def _percentile(ordered: List[int], pct: float) -> int:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def record_inclusion(self, tx_hash: str, gas_price: int, sent_block: Optional[int], included_block: int) -> None:
+        """Log how many blocks a transaction at this gas price took to land"""
+        self.inclusions.append({
+            'timestamp': time.time(),
+            'tx_hash': tx_hash,
+            'gas_price': gas_price,
+            'sent_block': sent_block,
+            'included_block': included_block,
+            'blocks_to_inclusion': included_block - sent_block if sent_block is not None else None
+        })
+
+    def get_history(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Estimate and inclusion history"""
+        return {'estimates': list(self.history), 'inclusions': list(self.inclusions)}
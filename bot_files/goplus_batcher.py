@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+GoPlus Lookup Micro-Batcher
+Coalesces concurrent token_security lookups into one comma-separated request
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
+
+import aiohttp
+
+GOPLUS_TOKEN_SECURITY_URL = "https://api.gopluslabs.io/api/v1/token_security/56"
+
+class GoPlusBatcher:
+    def __init__(self, config: Dict[str, Any], get_session: Callable[[], Awaitable[aiohttp.ClientSession]],
+                 guard=None, url: str = GOPLUS_TOKEN_SECURITY_URL):
+        self.get_session = get_session
+        self.guard = guard
+        self.url = url
+        self.api_key = config['api_keys'].get('goplus_app_key')
+
+        batch_config = config['security'].get('goplus_batching', {})
+        self.enabled = batch_config.get('enabled', True)
+        self.window = batch_config.get('window_ms', 25) / 1000
+        self.max_batch_size = batch_config.get('max_batch_size', 20)
+        self.timeout = batch_config.get('timeout_seconds', 10)
+
+        # lowercase token -> future resolved with (HTTP status, token data or None)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._requests = set()
+
+        self.stats = {
+            'lookups': 0,
+            'requests': 0,
+            'largest_batch': 0
+        }
+
+    async def lookup(self, token_address: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """(HTTP status, token data) for one token, sent together with concurrent lookups
+
+        Token data is None when GoPlus has no entry for the token. Transport
+        errors are raised to every caller in the batch.
+        """
+        self.stats['lookups'] += 1
+        key = token_address.lower()
+        if not self.enabled:
+            status, results = await self._fetch([key])
+            return status, results.get(key)
+
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            # Nobody may be left to read a failure if every waiter was cancelled
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._pending[key] = future
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._flush)
+
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._send(batch))
+        self._requests.add(task)
+        task.add_done_callback(self._requests.discard)
+
+    async def _send(self, batch: Dict[str, asyncio.Future]) -> None:
+        try:
+            status, results = await self._fetch(list(batch))
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result((status, results.get(key)))
+        except Exception as e:
+            logging.debug(f"GoPlus batch of {len(batch)} failed: {e}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _fetch(self, tokens: List[str]) -> Tuple[int, Dict[str, Any]]:
+        """One GoPlus request for every token, result map keyed by lowercase address"""
+        self.stats['requests'] += 1
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(tokens))
+
+        headers = {'X-API-KEY': self.api_key} if self.api_key else {}
+        params = {'contract_addresses': ','.join(tokens)}
+        session = await self.get_session()
+        if self.guard is None:
+            return await self._get(session, params, headers)
+        async with self.guard:
+            return await self._get(session, params, headers)
+
+    async def _get(self, session: aiohttp.ClientSession, params: Dict[str, str],
+                   headers: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        async with session.get(self.url, params=params, headers=headers,
+                               timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+            if self.guard is not None:
+                self.guard.check_status(response.status, response.headers)
+            if response.status != 200:
+                return response.status, {}
+            data = await response.json()
+            results = data.get('result') or {}
+            return response.status, {address.lower(): token_data for address, token_data in results.items()}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Lookups, requests sent and average tokens per request"""
+        return {
+            **self.stats,
+            'tokens_per_request': round(self.stats['lookups'] / self.stats['requests'], 2) if self.stats['requests'] else None
+        }
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Local EVM Honeypot Simulator
+Runs a real buy-then-sell swap in py-evm against chain state fetched on demand and cached per block
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, Set, Tuple
+
+from eth.db.account import AccountDB
+from eth.db.atomic import AtomicDB
+from eth.vm.execution_context import ExecutionContext
+from eth.vm.forks.cancun import CancunVM
+from eth.vm.forks.cancun.computation import CancunComputation
+from eth.vm.forks.cancun.state import CancunState
+from eth_abi import encode, decode
+from eth_keys.datatypes import PrivateKey
+from eth_utils import keccak
+from web3 import Web3
+
+# Throwaway EOA the simulated swaps are signed by - it only exists in the local state
+SIMULATION_KEY = PrivateKey(keccak(b'honeypot simulation wallet'))
+SIMULATION_WALLET = SIMULATION_KEY.public_key.to_canonical_address()
+
+MAX_UINT256 = 2 ** 256 - 1
+ERROR_SELECTOR = bytes.fromhex('08c379a0')
+
+# BSC block interval, for the timestamps of the simulated blocks
+BLOCK_TIME_SECONDS = 3
+
+# GASPRICE floor when the node reports zero (local forks), so gas is never free
+MIN_GAS_PRICE_WEI = 10 ** 8
+
+# Precompiles py-evm runs itself (Cancun: 0x01-0x0a)
+PRECOMPILES = [address.to_bytes(20, 'big') for address in range(0x01, 0x0b)]
+
+# Precompiles BSC has and py-evm does not: BLS12-381 (0x0b-0x11), BSC light client and
+# signature checks (0x64-0x69) and P256VERIFY (0x100)
+UNSUPPORTED_PRECOMPILES = [address.to_bytes(20, 'big') for address in [*range(0x0b, 0x12), *range(0x64, 0x6a), 0x100]]
+
+class UnsupportedPrecompile(Exception):
+    """Execution reached a precompile the local EVM cannot run - the result would be made up"""
+
+def _revert_reason(output: bytes) -> str:
+    if output[:4] == ERROR_SELECTOR:
+        try:
+            return decode(['string'], output[4:])[0]
+        except Exception:
+            pass
+    return output.hex() if output else 'no reason'
+
+class ForkState:
+    """Read-only chain state at one block, filled in from RPC as execution touches it"""
+
+    def __init__(self, block: Dict[str, Any], gas_price: int):
+        self.block_number = block['number']
+        self.block_hash = bytes(block['hash'])
+        self.timestamp = block['timestamp']
+        self.coinbase = bytes.fromhex(block['miner'][2:])
+        self.gas_limit = block['gasLimit']
+        self.base_fee = block.get('baseFeePerGas', 0) or 0
+        self.gas_price = max(gas_price, self.base_fee, MIN_GAS_PRICE_WEI)
+        # BSC answers PREVRANDAO with the block difficulty; post-merge chains with mixHash
+        self.prev_randao = (block.get('difficulty') or int.from_bytes(bytes(block.get('mixHash') or b''), 'big')
+                            or int.from_bytes(keccak(self.block_hash), 'big'))
+
+        self.code: Dict[bytes, bytes] = {address: b'' for address in PRECOMPILES + UNSUPPORTED_PRECOMPILES + [SIMULATION_WALLET]}
+        self.balances: Dict[bytes, int] = {SIMULATION_WALLET: 0}
+        self.storage: Dict[Tuple[bytes, int], int] = {}
+
+class ForkAccountDB(AccountDB):
+    """AccountDB that records every read of chain state the run's snapshot does not hold
+
+    Unfetched state reads as empty, so one run discovers a whole set of reads
+    to fetch in a batch. A read counts as missing even after the run wrote the
+    entry, since the write may be reverted back to the unfetched value.
+    """
+    run: 'SwapRun' = None
+
+    def get_storage(self, address: bytes, slot: int, from_journal: bool = True) -> int:
+        if (address, slot) not in self.run.storage:
+            self.run.missing.add(('storage', address, slot))
+        return super().get_storage(address, slot, from_journal)
+
+    def get_balance(self, address: bytes) -> int:
+        if address not in self.run.balances:
+            self.run.missing.add(('balance', address))
+        return super().get_balance(address)
+
+    def get_code_hash(self, address: bytes) -> bytes:
+        if address not in self.run.code:
+            self.run.missing.add(('code', address))
+        return super().get_code_hash(address)
+
+def _unsupported_precompile(computation: CancunComputation) -> None:
+    # Not a VMError, so it aborts the whole run instead of failing one call
+    raise UnsupportedPrecompile(f"Call to unsupported precompile 0x{computation.msg.code_address.hex()}")
+
+class ForkedComputation(CancunComputation):
+    _precompiles = {**CancunComputation.get_precompiles(),
+                    **{address: _unsupported_precompile for address in UNSUPPORTED_PRECOMPILES}}
+
+class ForkedState(CancunState):
+    account_db_class = ForkAccountDB
+    computation_class = ForkedComputation
+
+class SwapRun:
+    """One buy-approve-sell sequence over a snapshot of a ForkState, with the buy and the sell in different blocks
+
+    The snapshot is taken on the event loop, so fetches for other simulations
+    at the same block never change state under a running execution.
+    """
+
+    def __init__(self, fork: ForkState, chain_id: int, gas_limit: int, sell_delay_blocks: int):
+        self.fork = fork
+        self.chain_id = chain_id
+        self.gas_limit = gas_limit
+        self.sell_delay_blocks = sell_delay_blocks
+        self.code = dict(fork.code)
+        self.balances = dict(fork.balances)
+        self.storage = dict(fork.storage)
+        self.missing: Set[Tuple] = set()
+        self.db = AtomicDB()
+
+    def base_state_root(self) -> bytes:
+        """State root of a trie holding every entry in the snapshot"""
+        account_db = AccountDB(self.db)
+        for address, code in self.code.items():
+            if code:
+                account_db.set_code(address, code)
+        for address, balance in self.balances.items():
+            account_db.set_balance(address, balance)
+        for (address, slot), value in self.storage.items():
+            if value:
+                account_db.set_storage(address, slot, value)
+        account_db.persist()
+        return account_db.state_root
+
+    def state_at(self, block_offset: int, state_root: bytes) -> CancunState:
+        """State for the block block_offset after the fork block, starting from state_root"""
+        fork = self.fork
+        number = fork.block_number + block_offset
+        # Hashes of simulated blocks are made up, the fork block's is real
+        previous = [keccak(number_.to_bytes(32, 'big')) for number_ in range(number - 1, fork.block_number, -1)]
+        context = ExecutionContext(
+            coinbase=fork.coinbase,
+            timestamp=fork.timestamp + block_offset * BLOCK_TIME_SECONDS,
+            block_number=number,
+            difficulty=fork.prev_randao,
+            mix_hash=fork.prev_randao.to_bytes(32, 'big'),
+            gas_limit=fork.gas_limit,
+            prev_hashes=previous + [fork.block_hash],
+            chain_id=self.chain_id,
+            base_fee_per_gas=fork.base_fee,
+            excess_blob_gas=0
+        )
+        state = ForkedState(self.db, context, state_root)
+        state._account_db.run = self
+        return state
+
+    def transact(self, state: CancunState, to: bytes, data: bytes, value: int = 0) -> Tuple[bool, bytes, int]:
+        """Apply one transaction from the wallet, returns (success, output, gas used)"""
+        state.lock_changes()
+        return self._apply(state, to, data, value)
+
+    def call(self, state: CancunState, to: bytes, data: bytes) -> Tuple[bool, bytes]:
+        """Read-only call, every change it makes is reverted"""
+        state.lock_changes()
+        snapshot = state.snapshot()
+        try:
+            success, output, _ = self._apply(state, to, data, 0)
+        finally:
+            state.revert(snapshot)
+        return success, output
+
+    def _apply(self, state: CancunState, to: bytes, data: bytes, value: int) -> Tuple[bool, bytes, int]:
+        transaction = CancunVM.create_unsigned_transaction(
+            nonce=state.get_nonce(SIMULATION_WALLET),
+            gas_price=self.fork.gas_price,
+            gas=self.gas_limit,
+            to=to,
+            value=value,
+            data=data
+        ).as_signed_transaction(SIMULATION_KEY, chain_id=self.chain_id)
+        computation = state.apply_transaction(transaction)
+        # Same accounting as the receipt: everything not returned or refunded
+        gas_used = transaction.gas - computation.get_gas_remaining()
+        gas_used -= state.transaction_executor_class.calculate_gas_refund(computation, gas_used)
+        return computation.is_success, computation.output, gas_used
+
+class HoneypotSimulator:
+    def __init__(self, config: Dict[str, Any], web3_client, rpc: Callable, quote_engine):
+        self.w3 = web3_client
+        self.rpc = rpc
+        self.quote_engine = quote_engine
+        self.router = bytes.fromhex(Web3.to_checksum_address(config['blockchain']['pancakeswap_router'])[2:])
+        self.wbnb = bytes.fromhex(Web3.to_checksum_address(config['blockchain']['wbnb_address'])[2:])
+        self.chain_id = config['blockchain'].get('chain_id', 56)
+
+        sim_config = config['security'].get('evm_simulation', {})
+        self.enabled = sim_config.get('enabled', True)
+        self.gas_limit = sim_config.get('gas_limit', 3_000_000)
+        self.max_fetch_rounds = sim_config.get('max_fetch_rounds', 16)
+        # Same-block sell guards are common and temporary - never judge a token by one
+        self.sell_delay_blocks = max(1, sim_config.get('sell_delay_blocks', 1))
+        self.cached_blocks = sim_config.get('cached_blocks', 2)
+        # Head block reused for this long before asking the node again
+        self.head_refresh = sim_config.get('head_refresh_seconds', 0.5)
+        self._head = (None, 0.0)
+
+        # block number -> ForkState shared by every simulation at that block
+        self._states: OrderedDict = OrderedDict()
+        self._block_requests: Dict[int, asyncio.Future] = {}
+
+        self.stats = {
+            'simulations': 0,
+            'fetch_rounds': 0,
+            'state_reads': 0,
+            'honeypots': 0
+        }
+
+    async def _state_for_latest(self) -> ForkState:
+        """ForkState of the head block, created once per block"""
+        block_number, fetched_at = self._head
+        if block_number is None or time.monotonic() - fetched_at > self.head_refresh:
+            block_number = await self.rpc(lambda: self.w3.eth.block_number)
+            self._head = (block_number, time.monotonic())
+        state = self._states.get(block_number)
+        if state is not None:
+            return state
+
+        request = self._block_requests.get(block_number)
+        if request is None:
+            request = asyncio.ensure_future(asyncio.gather(
+                self.rpc(lambda: self.w3.eth.get_block(block_number)),
+                self.rpc(lambda: self.w3.eth.gas_price)
+            ))
+            self._block_requests[block_number] = request
+            request.add_done_callback(lambda _: self._block_requests.pop(block_number, None))
+        block, gas_price = await asyncio.shield(request)
+
+        state = self._states.get(block_number)
+        if state is None:
+            state = ForkState(block, gas_price)
+            self._states[block_number] = state
+            while len(self._states) > self.cached_blocks:
+                self._states.popitem(last=False)
+        return state
+
+    async def _fetch(self, state: ForkState, keys: List[Tuple]) -> None:
+        """Read every missing entry at the state's block in one concurrent round"""
+        block = state.block_number
+
+        async def read(key: Tuple) -> None:
+            address = Web3.to_checksum_address(key[1])
+            if key[0] == 'code':
+                state.code[key[1]] = bytes(await self.rpc(lambda: self.w3.eth.get_code(address, block)))
+            elif key[0] == 'balance':
+                state.balances[key[1]] = await self.rpc(lambda: self.w3.eth.get_balance(address, block))
+            else:
+                raw = await self.rpc(lambda: self.w3.eth.get_storage_at(address, key[2], block))
+                state.storage[(key[1], key[2])] = int.from_bytes(bytes(raw), 'big')
+
+        self.stats['state_reads'] += len(keys)
+        await asyncio.gather(*(read(key) for key in keys))
+
+    async def simulate(self, token_address: str, pair_address: str, amount_wei: int) -> Dict[str, Any]:
+        """Buy `amount_wei` of BNB worth of the token, then sell it all in a later block
+
+        Returns measured buy/sell tax (percent), gas per swap and whether the
+        sell went through. Raises if execution failed on fully fetched state or
+        the state did not settle in max_fetch_rounds.
+        """
+        started = time.perf_counter()
+        self.stats['simulations'] += 1
+        state = await self._state_for_latest()
+        token = bytes.fromhex(Web3.to_checksum_address(token_address)[2:])
+        pair = bytes.fromhex(Web3.to_checksum_address(pair_address)[2:])
+
+        for round_number in range(1, self.max_fetch_rounds + 1):
+            run = SwapRun(state, self.chain_id, self.gas_limit, self.sell_delay_blocks)
+            try:
+                # CPU-bound execution off the event loop
+                result = await asyncio.to_thread(self._buy_then_sell, run, token, pair, amount_wei)
+            except Exception:
+                # Anything can go wrong on guessed state - only a settled run may fail for real
+                if not run.missing:
+                    raise
+                result = None
+            missing = list(run.missing)
+            if not missing and result is not None:
+                self.stats['fetch_rounds'] += round_number
+                result.update({
+                    'block': state.block_number,
+                    'fetch_rounds': round_number,
+                    'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+                })
+                if result['honeypot']:
+                    self.stats['honeypots'] += 1
+                return result
+            logging.debug(f"EVM simulation round {round_number}: fetching {len(missing)} state entries at block {state.block_number}")
+            await self._fetch(state, missing)
+
+        raise TimeoutError(f"EVM simulation state did not settle after {self.max_fetch_rounds} fetch rounds")
+
+    def _buy_then_sell(self, run: SwapRun, token: bytes, pair: bytes, amount_wei: int) -> Dict[str, Any]:
+        wallet = SIMULATION_WALLET
+        token_address, wbnb_address, wallet_address = (Web3.to_checksum_address(address) for address in (token, self.wbnb, wallet))
+        token0, _ = self.quote_engine.sort_tokens(wbnb_address, token_address)
+        wbnb_is_token0 = token0 == wbnb_address
+
+        state = run.state_at(1, run.base_state_root())
+        # Value plus gas for every transaction at the simulated gas price
+        state.set_balance(wallet, amount_wei + 4 * self.gas_limit * run.fork.gas_price)
+        deadline = run.fork.timestamp + 3600
+
+        def reserves() -> Tuple[int, int]:
+            success, output = run.call(state, pair, bytes.fromhex('0902f1ac'))
+            if not success or len(output) < 64:
+                raise ValueError("getReserves() failed")
+            reserve0, reserve1 = decode(['uint112', 'uint112'], output[:64])
+            return (reserve0, reserve1) if wbnb_is_token0 else (reserve1, reserve0)
+
+        def token_balance() -> int:
+            success, output = run.call(state, token, bytes.fromhex('70a08231') + encode(['address'], [wallet_address]))
+            return decode(['uint256'], output[:32])[0] if success and len(output) >= 32 else 0
+
+        result = {'buy_tax': None, 'sell_tax': None, 'buy_gas': None, 'sell_gas': None, 'honeypot': False,
+                  'gas_price': run.fork.gas_price, 'sell_delay_blocks': run.sell_delay_blocks}
+
+        bnb_reserve, token_reserve = reserves()
+        expected_tokens = self.quote_engine.get_amount_out(amount_wei, bnb_reserve, token_reserve)
+        buy_data = bytes.fromhex('b6f9de95') + encode(
+            ['uint256', 'address[]', 'address', 'uint256'], [0, [wbnb_address, token_address], wallet_address, deadline]
+        )
+        success, output, gas_used = run.transact(state, self.router, buy_data, amount_wei)
+        result['buy_gas'] = gas_used
+        if not success:
+            result.update(honeypot=True, reason=f"Buy reverted: {_revert_reason(output)}")
+            return result
+
+        received = token_balance()
+        if received == 0 or expected_tokens == 0:
+            result.update(honeypot=True, reason="Buy delivered no tokens")
+            return result
+        result['buy_tax'] = round(max(0.0, 1 - received / expected_tokens) * 100, 2)
+
+        approve_data = bytes.fromhex('095ea7b3') + encode(['address', 'uint256'], [Web3.to_checksum_address(self.router), MAX_UINT256])
+        success, output, _ = run.transact(state, token, approve_data)
+        if not success:
+            result.update(honeypot=True, reason=f"Approve reverted: {_revert_reason(output)}")
+            return result
+
+        # Sell in a later block, as a real exit would be
+        state.lock_changes()
+        state.persist()
+        state = run.state_at(1 + run.sell_delay_blocks, state.state_root)
+
+        bnb_reserve, token_reserve = reserves()
+        expected_bnb = self.quote_engine.get_amount_out(received, token_reserve, bnb_reserve)
+        bnb_before = state.get_balance(wallet)
+        sell_data = bytes.fromhex('791ac947') + encode(
+            ['uint256', 'uint256', 'address[]', 'address', 'uint256'],
+            [received, 0, [token_address, wbnb_address], wallet_address, deadline]
+        )
+        success, output, gas_used = run.transact(state, self.router, sell_data)
+        result['sell_gas'] = gas_used
+        if not success:
+            result.update(honeypot=True, reason=f"Sell reverted: {_revert_reason(output)}")
+            return result
+
+        bnb_received = state.get_balance(wallet) - bnb_before + gas_used * run.fork.gas_price
+        result['sell_tax'] = round(max(0.0, 1 - bnb_received / expected_bnb) * 100, 2) if expected_bnb else 100.0
+        if bnb_received <= 0:
+            result.update(honeypot=True, reason="Sell returned no BNB")
+        return result
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Simulation counts and average fetch rounds"""
+        return {
+            **self.stats,
+            'avg_fetch_rounds': round(self.stats['fetch_rounds'] / self.stats['simulations'], 2) if self.stats['simulations'] else None,
+            'cached_blocks': list(self._states)
+        }
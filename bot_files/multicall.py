@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Multicall3 Aggregation Layer
+Batches many read-only contract calls into a single eth_call
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+from web3 import Web3
+from web3.exceptions import BadFunctionCallOutput
+
+# Multicall3 is deployed at the same address on BSC and most EVM chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# (contract, function name, args)
+ContractCall = Tuple[Any, str, List[Any]]
+
+class Multicall3:
+    def __init__(self, blockchain_interface, address: Optional[str] = None):
+        self.blockchain = blockchain_interface
+        self.address = Web3.to_checksum_address(address or MULTICALL3_ADDRESS)
+        self.abi = self._get_multicall3_abi()
+
+        # Set when the chain has no Multicall3 so we stop trying it
+        self.unavailable = False
+
+    async def aggregate(self, calls: List[ContractCall]) -> List[Optional[Any]]:
+        """
+        Execute calls in one aggregate3 eth_call
+        Returns one decoded value per call, or None where that call failed
+        """
+        if not calls:
+            return []
+
+        if not self.unavailable:
+            try:
+                multicall_contract = self.blockchain.active_w3.eth.contract(address=self.address, abi=self.abi)
+                encoded_calls = [
+                    (contract.address, True, contract.encodeABI(fn_name=fn_name, args=args))
+                    for contract, fn_name, args in calls
+                ]
+                results = await self.blockchain._rpc(
+                    lambda: multicall_contract.functions.aggregate3(encoded_calls).call()
+                )
+                return [
+                    self._decode_result(call, success, return_data)
+                    for call, (success, return_data) in zip(calls, results)
+                ]
+
+            except BadFunctionCallOutput:
+                # Empty return data - no Multicall3 contract on this chain
+                logging.warning(f"Multicall3 not found at {self.address}, using individual calls")
+                self.unavailable = True
+            except Exception as e:
+                logging.warning(f"Multicall3 aggregate failed, falling back to individual calls: {e}")
+
+        return await self._aggregate_individually(calls)
+
+    async def _aggregate_individually(self, calls: List[ContractCall]) -> List[Optional[Any]]:
+        """Fallback when Multicall3 is unavailable - same result shape"""
+        results = await asyncio.gather(
+            *(self.blockchain._rpc(lambda c=contract, f=fn_name, a=args: c.get_function_by_name(f)(*a).call())
+              for contract, fn_name, args in calls),
+            return_exceptions=True
+        )
+        return [None if isinstance(result, Exception) else result for result in results]
+
+    def _decode_result(self, call: ContractCall, success: bool, return_data: bytes) -> Optional[Any]:
+        """Decode a single aggregate3 result, None on failure"""
+        if not success or not return_data:
+            return None
+
+        contract, fn_name, _ = call
+        try:
+            output_types = [output['type'] for output in contract.get_function_by_name(fn_name).abi['outputs']]
+            decoded = [
+                Web3.to_checksum_address(value) if output_type == 'address' else value
+                for output_type, value in zip(output_types, contract.w3.codec.decode(output_types, return_data))
+            ]
+            return decoded[0] if len(decoded) == 1 else decoded
+        except Exception:
+            return None
+
+    def _get_multicall3_abi(self) -> List[Dict]:
+        """Get Multicall3 aggregate3 ABI"""
+        return [
+            {
+                "inputs": [
+                    {
+                        "components": [
+                            {"internalType": "address", "name": "target", "type": "address"},
+                            {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                            {"internalType": "bytes", "name": "callData", "type": "bytes"}
+                        ],
+                        "internalType": "struct Multicall3.Call3[]",
+                        "name": "calls",
+                        "type": "tuple[]"
+                    }
+                ],
+                "name": "aggregate3",
+                "outputs": [
+                    {
+                        "components": [
+                            {"internalType": "bool", "name": "success", "type": "bool"},
+                            {"internalType": "bytes", "name": "returnData", "type": "bytes"}
+                        ],
+                        "internalType": "struct Multicall3.Result[]",
+                        "name": "returnData",
+                        "type": "tuple[]"
+                    }
+                ],
+                "stateMutability": "payable",
+                "type": "function"
+            }
+        ]
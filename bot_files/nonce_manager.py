@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Local Nonce Manager
+Hands out transaction nonces from memory so sends can be pipelined without races
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+# Node error fragments that mean our local nonce view is wrong
+NONCE_ERRORS = ('nonce too low', 'nonce too high', 'invalid nonce', 'replacement transaction underpriced')
+
+# The node already has this exact transaction - not a failure
+ALREADY_KNOWN_ERRORS = ('already known', 'known transaction', 'already imported')
+
+class NonceManager:
+    def __init__(self, blockchain_interface):
+        self.blockchain = blockchain_interface
+        self._next_nonce: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+        self.stats = {
+            'allocated': 0,
+            'resyncs': 0,
+            'invalidated': 0
+        }
+
+    async def allocate(self) -> int:
+        """Reserve the next nonce - only the allocation is serialized, not the send"""
+        async with self._lock:
+            if self._next_nonce is None:
+                await self._sync_from_chain()
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            self.stats['allocated'] += 1
+            return nonce
+
+    async def peek(self) -> int:
+        """Nonce the next allocation will most likely return, without reserving it"""
+        async with self._lock:
+            if self._next_nonce is None:
+                await self._sync_from_chain()
+            return self._next_nonce
+
+    async def invalidate(self) -> None:
+        """Forget the local nonce after a send that may or may not have reached the network
+
+        The next allocation re-reads the pending count, which includes the
+        transaction if it propagated and reuses its nonce if it did not.
+        """
+        async with self._lock:
+            self.stats['invalidated'] += 1
+            self._next_nonce = None
+
+    async def resync(self) -> None:
+        """Re-read the pending nonce from the node after a nonce error"""
+        async with self._lock:
+            await self._sync_from_chain()
+            self.stats['resyncs'] += 1
+
+    async def _sync_from_chain(self) -> None:
+        wallet_address = self.blockchain.wallet_address
+        self._next_nonce = await self.blockchain._rpc(
+            lambda: self.blockchain.active_w3.eth.get_transaction_count(wallet_address, 'pending')
+        )
+        logging.info(f"Nonce synced from chain: {self._next_nonce}")
+
+    @staticmethod
+    def is_nonce_error(error: Exception) -> bool:
+        message = str(error).lower()
+        return any(fragment in message for fragment in NONCE_ERRORS)
+
+    @staticmethod
+    def is_already_known(error: Exception) -> bool:
+        message = str(error).lower()
+        return any(fragment in message for fragment in ALREADY_KNOWN_ERRORS)
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Push-Based PairCreated Ingestion
+Streams factory logs over eth_subscribe with automatic reconnect and eth_getLogs backfill
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, Callable, Awaitable, List, Optional
+
+import websockets
+from hexbytes import HexBytes
+from web3 import Web3
+from colorama import Fore, Style
+
+PAIR_CREATED_TOPIC = "0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9"
+
+# Provider errors that mean "ask for a smaller block range"
+RANGE_LIMIT_ERRORS = ('block range', 'range too large', 'range is too large', 'query returned more than',
+                      'response size', 'too many results')
+
+# Provider errors that mean "ask less often" - splitting the range would only add requests
+RATE_LIMIT_ERRORS = ('rate limit', 'too many requests', 'request rate', 'limit exceeded', '429')
+RATE_LIMIT_RETRIES = 5
+
+class PairEventStream:
+    def __init__(self, config: Dict[str, Any], blockchain_interface):
+        self.config = config
+        self.blockchain = blockchain_interface
+        self.ws_endpoints: List[str] = config['blockchain'].get('ws_endpoints', [])
+        self.max_failures = config['blockchain'].get('ws_max_consecutive_failures', 5)
+
+        backfill_config = config['blockchain'].get('pair_backfill', {})
+        self.checkpoint_file = backfill_config.get('checkpoint_file', 'pair_checkpoint.json')
+        self.checkpoint_interval = backfill_config.get('checkpoint_interval_seconds', 5)
+        self.chunk_size = backfill_config.get('initial_chunk_blocks', 500)
+        self.min_chunk_size = backfill_config.get('min_chunk_blocks', 10)
+        self.max_chunk_size = backfill_config.get('max_chunk_blocks', 5000)
+        self.backfill_concurrency = backfill_config.get('concurrency', 4)
+
+        # Pairs older than max_token_age_minutes are never bought, so don't replay them
+        block_time = backfill_config.get('block_time_seconds', 3)
+        self.max_backfill_blocks = int(config['trading']['max_token_age_minutes'] * 60 / block_time)
+        self._last_checkpoint_save = 0.0
+
+        self.factory_address = Web3.to_checksum_address(blockchain_interface.factory_address)
+        self.factory_contract = blockchain_interface.active_w3.eth.contract(
+            address=self.factory_address,
+            abi=blockchain_interface.factory_abi
+        )
+
+        # Highest block whose events have all been delivered
+        self.last_block: Optional[int] = None
+
+        # Block -> handler tasks still running for it, the saved checkpoint stays below these
+        self._pending_blocks: Dict[int, int] = {}
+
+        # Recently delivered (tx hash, log index) pairs - reconnect backfill overlaps live logs
+        self._seen_order = deque(maxlen=5000)
+        self._seen = set()
+
+        self.stats = {
+            'live_events': 0,
+            'backfilled_events': 0,
+            'reconnects': 0,
+            'rate_limited': 0
+        }
+
+    async def run(self, handler: Callable[[Any], Awaitable[Any]], is_running: Callable[[], bool]) -> bool:
+        """
+        Stream PairCreated events into handler until is_running() is False
+        Returns False when WebSocket ingestion gave up and the caller should fall back to polling
+        """
+        if not self.ws_endpoints:
+            return False
+
+        failures = 0
+        endpoint_index = 0
+
+        while is_running():
+            ws_url = self.ws_endpoints[endpoint_index % len(self.ws_endpoints)]
+            try:
+                await self._stream(ws_url, handler, is_running)
+                failures = 0
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                endpoint_index += 1
+                self.stats['reconnects'] += 1
+
+                if failures >= self.max_failures:
+                    logging.error(f"{Fore.RED}❌ WebSocket ingestion failed {failures} times, falling back to HTTP polling{Style.RESET_ALL}")
+                    return False
+
+                delay = min(30, 2 ** (failures - 1))
+                logging.warning(f"WebSocket {ws_url} disconnected ({e}), reconnecting in {delay}s...")
+                await asyncio.sleep(delay)
+
+        return True
+
+    async def _stream(self, ws_url: str, handler: Callable[[Any], Awaitable[Any]],
+                      is_running: Callable[[], bool]) -> None:
+        async with websockets.connect(ws_url, ping_interval=20, ping_timeout=20, max_size=2**22) as ws:
+            await ws.send(json.dumps({
+                'jsonrpc': '2.0',
+                'id': 1,
+                'method': 'eth_subscribe',
+                'params': ['logs', {'address': self.factory_address, 'topics': [PAIR_CREATED_TOPIC]}]
+            }))
+            reply = json.loads(await asyncio.wait_for(ws.recv(), timeout=10))
+            if 'error' in reply:
+                raise ConnectionError(f"eth_subscribe rejected: {reply['error']}")
+            subscription_id = reply['result']
+
+            logging.info(f"{Fore.GREEN}📡 Subscribed to PairCreated logs via {ws_url}{Style.RESET_ALL}")
+
+            # Cover whatever was emitted while we were disconnected
+            head = await self.blockchain._rpc(lambda: self.blockchain.active_w3.eth.block_number)
+            if self.last_block is None:
+                self.last_block = head
+            else:
+                await self.backfill(self.last_block + 1, head, handler)
+
+            last_head_check = time.time()
+            while is_running():
+                try:
+                    message = await asyncio.wait_for(ws.recv(), timeout=1)
+                except asyncio.TimeoutError:
+                    # Quiet factory - keep the checkpoint moving with the chain head
+                    if time.time() - last_head_check >= self.checkpoint_interval:
+                        head = await self.blockchain._rpc(lambda: self.blockchain.active_w3.eth.block_number)
+                        self.mark_covered(head - 1)
+                        last_head_check = time.time()
+                    continue
+
+                notification = json.loads(message)
+                params = notification.get('params', {})
+                if params.get('subscription') != subscription_id:
+                    continue
+
+                raw_log = params['result']
+                if raw_log.get('removed'):
+                    continue
+                log = self._format_log(raw_log)
+                if await self._deliver(log, handler):
+                    self.stats['live_events'] += 1
+                # More logs of this block may still be in flight, only earlier blocks are complete
+                self.mark_covered(log['blockNumber'] - 1)
+
+    async def backfill_from_checkpoint(self, handler: Callable[[Any], Awaitable[Any]]) -> int:
+        """
+        Replay pairs created since the persisted checkpoint up to the current head
+        Returns the head block that is now covered
+        """
+        head = await self.blockchain._rpc(lambda: self.blockchain.active_w3.eth.block_number)
+        checkpoint = self.load_checkpoint()
+
+        if checkpoint is None:
+            logging.info("No pair checkpoint found, starting from the current block")
+            self.mark_covered(head, force_save=True)
+            return head
+
+        from_block = max(checkpoint + 1, head - self.max_backfill_blocks)
+        if from_block > checkpoint + 1:
+            logging.warning(f"Checkpoint {checkpoint} is older than max token age, backfilling from block {from_block}")
+
+        await self.backfill(from_block, head, handler)
+        self.mark_covered(head, force_save=True)
+        return head
+
+    async def backfill(self, from_block: int, to_block: int, handler: Callable[[Any], Awaitable[Any]]) -> int:
+        """Replay PairCreated logs in [from_block, to_block] through handler in block order"""
+        if from_block > to_block:
+            return 0
+
+        logs = await self._get_logs_chunked(from_block, to_block)
+        logs.sort(key=lambda log: (int(log['blockNumber']), int(log['logIndex'])))
+
+        delivered = 0
+        for log in logs:
+            if await self._deliver(log, handler):
+                delivered += 1
+
+        self.stats['backfilled_events'] += delivered
+        self.mark_covered(to_block)
+        if delivered:
+            logging.info(f"{Fore.CYAN}⏪ Backfilled {delivered} PairCreated events from blocks {from_block}-{to_block}{Style.RESET_ALL}")
+        return delivered
+
+    async def _get_logs_chunked(self, from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        """Fetch logs over a block range in concurrent chunks sized to provider limits"""
+        ranges = deque()
+        start = from_block
+        while start <= to_block:
+            end = min(to_block, start + self.chunk_size - 1)
+            ranges.append((start, end))
+            start = end + 1
+
+        logs: List[Dict[str, Any]] = []
+        semaphore = asyncio.Semaphore(self.backfill_concurrency)
+
+        async def fetch(chunk_start: int, chunk_end: int, attempt: int = 0) -> None:
+            try:
+                async with semaphore:
+                    chunk_logs = await self.blockchain._rpc(lambda: self.blockchain.active_w3.eth.get_logs({
+                        'address': self.factory_address,
+                        'topics': [PAIR_CREATED_TOPIC],
+                        'fromBlock': chunk_start,
+                        'toBlock': chunk_end
+                    }))
+                logs.extend(chunk_logs)
+                self.chunk_size = min(self.max_chunk_size, self.chunk_size * 2)
+
+            except Exception as e:
+                span = chunk_end - chunk_start + 1
+                message = str(e).lower()
+                if any(marker in message for marker in RANGE_LIMIT_ERRORS) and span > self.min_chunk_size:
+                    # Provider limit hit - halve the range and retry both halves
+                    self.chunk_size = max(self.min_chunk_size, span // 2)
+                    middle = chunk_start + span // 2
+                    await asyncio.gather(fetch(chunk_start, middle - 1), fetch(middle, chunk_end))
+                elif any(marker in message for marker in RATE_LIMIT_ERRORS) and attempt < RATE_LIMIT_RETRIES:
+                    # Throttled - same range, exponentially later
+                    self.stats['rate_limited'] += 1
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+                    await fetch(chunk_start, chunk_end, attempt + 1)
+                elif attempt < 2:
+                    await asyncio.sleep(attempt + 1)
+                    await fetch(chunk_start, chunk_end, attempt + 1)
+                else:
+                    raise
+
+        await asyncio.gather(*(fetch(chunk_start, chunk_end) for chunk_start, chunk_end in ranges))
+        return logs
+
+    def mark_covered(self, block_number: int, force_save: bool = False) -> None:
+        """Record that every PairCreated log up to block_number has been handled"""
+        self.last_block = max(self.last_block or 0, block_number)
+        if force_save or time.time() - self._last_checkpoint_save >= self.checkpoint_interval:
+            self.save_checkpoint()
+
+    def checkpoint_block(self) -> Optional[int]:
+        """Last block whose events have all been delivered and handled"""
+        if self.last_block is None or not self._pending_blocks:
+            return self.last_block
+        return min(self.last_block, min(self._pending_blocks) - 1)
+
+    def save_checkpoint(self) -> None:
+        """Persist the last covered block"""
+        try:
+            checkpoint = self.checkpoint_block()
+            if checkpoint is None:
+                return
+            with open(self.checkpoint_file, 'w') as f:
+                json.dump({'last_block': checkpoint, 'saved_at': int(time.time())}, f)
+            self._last_checkpoint_save = time.time()
+
+        except Exception as e:
+            logging.error(f"Error saving pair checkpoint: {e}")
+
+    def load_checkpoint(self) -> Optional[int]:
+        """Load the last covered block, None if there is no usable checkpoint"""
+        try:
+            with open(self.checkpoint_file, 'r') as f:
+                return int(json.load(f)['last_block'])
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, KeyError, ValueError, TypeError):
+            logging.warning("Corrupted pair checkpoint, starting from the current block")
+            return None
+
+    async def _deliver(self, log: Dict[str, Any], handler: Callable[[Any], Awaitable[Any]]) -> bool:
+        """Decode a log and pass it to handler once"""
+        key = (HexBytes(log['transactionHash']).hex(), int(log['logIndex']))
+        if key in self._seen:
+            return False
+
+        if len(self._seen_order) == self._seen_order.maxlen:
+            self._seen.discard(self._seen_order[0])
+        self._seen_order.append(key)
+        self._seen.add(key)
+
+        event = self.factory_contract.events.PairCreated().process_log(log)
+        task = await handler(event)
+        if isinstance(task, asyncio.Future) and not task.done():
+            # Handler dispatched the work - hold the checkpoint back until it finishes
+            block_number = int(log['blockNumber'])
+            self._pending_blocks[block_number] = self._pending_blocks.get(block_number, 0) + 1
+            task.add_done_callback(lambda _: self._handler_done(block_number))
+        return True
+
+    def _handler_done(self, block_number: int) -> None:
+        remaining = self._pending_blocks.get(block_number, 1) - 1
+        if remaining > 0:
+            self._pending_blocks[block_number] = remaining
+        else:
+            self._pending_blocks.pop(block_number, None)
+
+    def _format_log(self, raw_log: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a raw JSON-RPC log into the shape web3 event decoding expects"""
+        return {
+            'address': Web3.to_checksum_address(raw_log['address']),
+            'topics': [HexBytes(topic) for topic in raw_log['topics']],
+            'data': HexBytes(raw_log['data']),
+            'blockNumber': int(raw_log['blockNumber'], 16),
+            'blockHash': HexBytes(raw_log['blockHash']),
+            'transactionHash': HexBytes(raw_log['transactionHash']),
+            'transactionIndex': int(raw_log['transactionIndex'], 16),
+            'logIndex': int(raw_log['logIndex'], 16),
+            'removed': raw_log.get('removed', False)
+        }
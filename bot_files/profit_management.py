@@ -12,6 +12,11 @@ from dataclasses import dataclass, asdict, field
 from colorama import Fore, Style
 import json
 
+# A close that recovers less than this share of the investment counts as a rug
+RUGGED_RECOVERY_RATIO = 0.1
+# Consecutive failed full sells before the token is reported as unsellable
+SELL_FAILURES_BEFORE_FLAG = 3
+
 @dataclass
 class Position:
     """Represents a trading position"""
@@ -43,10 +48,12 @@ class Position:
             self.peak_price_bnb = self.entry_price_bnb
 
 class ProfitManager:
-    def __init__(self, config: Dict[str, Any], blockchain_interface, notifier):
+    def __init__(self, config: Dict[str, Any], blockchain_interface, notifier, security_engine=None):
         self.config = config
         self.blockchain = blockchain_interface
         self.notifier = notifier
+        # Trade outcomes feed the bytecode fingerprint index
+        self.security_engine = security_engine
         self.positions: Dict[str, Position] = {}
         self.profit_config = config['profit_management']
         self.trading_config = config['trading']
@@ -57,6 +64,7 @@ class ProfitManager:
         self.total_fees_bnb = 0.0
         self.successful_trades = 0
         self.failed_trades = 0
+        self.sell_failures: Dict[str, int] = {}
         
         # Load existing positions if any
         self.load_positions()
@@ -79,6 +87,7 @@ class ProfitManager:
             
             self.positions[token_address] = position
             self.total_invested_bnb += investment_bnb
+            self.blockchain.reserve_book.track(pair_address)
             
             logging.info(f"{Fore.GREEN}📈 Added position: {token_symbol} ({investment_bnb:.6f} BNB){Style.RESET_ALL}")
             self.save_positions()
@@ -260,6 +269,8 @@ class ProfitManager:
                 
                 # Remove position if fully sold
                 if position.remaining_tokens <= 0.001:  # Dust threshold
+                    # Partial sells only happen at take-profit levels
+                    self._record_outcome(position.token_address, 'profit')
                     await self._close_position(position.token_address)
                 
                 self.save_positions()
@@ -318,6 +329,15 @@ class ProfitManager:
                 else:
                     self.failed_trades += 1
                 
+                recovered = total_profit + position.initial_investment_bnb
+                if total_profit > 0:
+                    outcome = 'profit'
+                elif recovered < position.initial_investment_bnb * RUGGED_RECOVERY_RATIO:
+                    outcome = 'rugged'
+                else:
+                    outcome = 'loss'
+                self._record_outcome(position.token_address, outcome)
+                
                 # Check for compound opportunity
                 if self.trading_config.get('auto_compound', False):
                     await self._check_compound_opportunity(net_bnb)
@@ -336,9 +356,20 @@ class ProfitManager:
                 logging.error(f"{Fore.RED}❌ Failed to sell {position.token_symbol}: {message}{Style.RESET_ALL}")
                 await self.notifier.notify_sell_failed(position.token_symbol, message)
                 
+                # One failure can be gas or RPC trouble - repeated ones look like a sell block
+                failures = self.sell_failures.get(position.token_address, 0) + 1
+                self.sell_failures[position.token_address] = failures
+                if failures == SELL_FAILURES_BEFORE_FLAG:
+                    self._record_outcome(position.token_address, 'sell_failed')
+                
         except Exception as e:
             logging.error(f"Error executing full sell: {e}")
 
+    def _record_outcome(self, token_address: str, outcome: str) -> None:
+        """Report a trade outcome to the security engine"""
+        if self.security_engine is not None:
+            self.security_engine.record_trade_outcome(token_address, outcome)
+
     async def _check_compound_opportunity(self, bnb_amount: float) -> None:
         """Check if we should increase position sizes based on profits"""
         try:
@@ -366,6 +397,8 @@ class ProfitManager:
                 position = self.positions[token_address]
                 logging.info(f"{Fore.BLUE}📊 Closing position: {position.token_symbol}{Style.RESET_ALL}")
                 del self.positions[token_address]
+                self.sell_failures.pop(token_address, None)
+                self.blockchain.reserve_book.untrack(position.pair_address)
                 self.save_positions()
                 
         except Exception as e:
@@ -435,6 +468,7 @@ class ProfitManager:
                 for addr, pos_data in data.get('positions', {}).items():
                     position = Position(**pos_data)
                     self.positions[addr] = position
+                    self.blockchain.reserve_book.track(position.pair_address)
                 
                 # Load totals
                 totals = data.get('totals', {})
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+External API Provider Guard
+Token-bucket rate limit, concurrency cap and circuit breaker for each security API
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Optional
+
+from colorama import Fore, Style
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open"""
+
+class ProviderError(Exception):
+    """Provider answered with a throttling or server error status"""
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate = rate_per_second
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping until one is available - returns seconds waited"""
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+            delay = self.paused_until - now
+            if delay <= 0 and self.tokens >= 1:
+                self.tokens -= 1
+                return waited
+            if delay <= 0:
+                delay = (1 - self.tokens) / self.rate
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request back, e.g. for a Retry-After"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+class ProviderGuard:
+    """Wrap each provider call in `async with guard:` and pass the status to check_status()"""
+
+    def __init__(self, name: str, guard_config: Optional[Dict[str, Any]] = None):
+        guard_config = guard_config or {}
+        self.name = name
+        self.bucket = TokenBucket(guard_config.get('rate_per_second', 5), guard_config.get('burst', 10))
+        self.semaphore = asyncio.Semaphore(guard_config.get('max_concurrency', 5))
+        self.failure_threshold = guard_config.get('failure_threshold', 5)
+        self.recovery_seconds = guard_config.get('recovery_seconds', 30)
+        self.half_open_max_calls = guard_config.get('half_open_max_calls', 1)
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self._half_open_calls = 0
+
+        self.stats = {
+            'calls': 0,
+            'successes': 0,
+            'failures': 0,
+            'throttled': 0,
+            'rejected': 0,
+            'rate_limited_waits': 0,
+            'in_flight': 0
+        }
+
+    async def __aenter__(self) -> 'ProviderGuard':
+        self._admit()
+        try:
+            if await self.bucket.acquire() > 0:
+                self.stats['rate_limited_waits'] += 1
+            await self.semaphore.acquire()
+        except BaseException:
+            self._release_probe()
+            raise
+        self.stats['calls'] += 1
+        self.stats['in_flight'] += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stats['in_flight'] -= 1
+        self.semaphore.release()
+        if exc_type is None:
+            self._record_success()
+        elif issubclass(exc_type, asyncio.CancelledError):
+            # Caller gave up - says nothing about the provider
+            self._release_probe()
+        else:
+            self._record_failure()
+
+    def _admit(self) -> None:
+        if self.state == OPEN:
+            remaining = self.recovery_seconds - (time.monotonic() - self.opened_at)
+            if remaining > 0:
+                self.stats['rejected'] += 1
+                raise CircuitOpenError(f"{self.name} circuit open after {self.consecutive_failures} failures, retry in {remaining:.1f}s")
+            self.state = HALF_OPEN
+            self._half_open_calls = 0
+            logging.info(f"{Fore.YELLOW}🔌 {self.name} circuit half-open, probing{Style.RESET_ALL}")
+
+        if self.state == HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                self.stats['rejected'] += 1
+                raise CircuitOpenError(f"{self.name} circuit half-open, probe in progress")
+            self._half_open_calls += 1
+
+    def _release_probe(self) -> None:
+        if self.state == HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def check_status(self, status: int, headers: Optional[Dict[str, str]] = None) -> None:
+        """Raise ProviderError for 429 and 5xx so the call counts as a failure"""
+        if status == 429:
+            self.stats['throttled'] += 1
+            retry_after = (headers or {}).get('Retry-After')
+            try:
+                self.bucket.pause(float(retry_after) if retry_after else 1.0)
+            except ValueError:
+                self.bucket.pause(1.0)
+            raise ProviderError(f"{self.name} rate limited (429)")
+        if status >= 500:
+            raise ProviderError(f"{self.name} server error ({status})")
+
+    def _record_success(self) -> None:
+        self.stats['successes'] += 1
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            logging.info(f"{Fore.GREEN}🔌 {self.name} circuit closed{Style.RESET_ALL}")
+        self.state = CLOSED
+
+    def _record_failure(self) -> None:
+        self.stats['failures'] += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logging.warning(f"{Fore.RED}🔌 {self.name} circuit open for {self.recovery_seconds}s "
+                                f"after {self.consecutive_failures} failures{Style.RESET_ALL}")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Breaker state and call counters"""
+        return {
+            **self.stats,
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures
+        }
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Block-Driven Receipt Tracker
+Confirms every in-flight transaction from a single new-block watcher
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Any, Optional, Set
+
+from hexbytes import HexBytes
+from web3.exceptions import TimeExhausted
+
+class ReceiptTracker:
+    def __init__(self, blockchain_interface, poll_interval: float = 1.0, recent_blocks: int = 5):
+        self.blockchain = blockchain_interface
+        self.poll_interval = poll_interval
+
+        # tx hash -> future resolved with its receipt
+        self._waiters: Dict[HexBytes, asyncio.Future] = {}
+        self._waiter_counts: Dict[HexBytes, int] = {}
+        # Seen in a block but the receipt was not served yet
+        self._unresolved: Set[HexBytes] = set()
+        self._watch_task: Optional[asyncio.Task] = None
+        self._last_block: Optional[int] = None
+
+        # Transactions of the last few scanned blocks - a hash registered just after
+        # its block was scanned is still found
+        self._recent: deque = deque(maxlen=recent_blocks)
+
+        self.stats = {
+            'tracked': 0,
+            'confirmed': 0,
+            'timeouts': 0,
+            'blocks_scanned': 0
+        }
+
+    async def wait_for_receipt(self, tx_hash, timeout: float = 120) -> Dict[str, Any]:
+        """Wait for a transaction receipt without polling per transaction"""
+        tx_hash = HexBytes(tx_hash)
+        future = self._waiters.get(tx_hash)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[tx_hash] = future
+            self._waiter_counts[tx_hash] = 0
+            self.stats['tracked'] += 1
+
+            for _, block_transactions in self._recent:
+                if tx_hash in block_transactions:
+                    self._unresolved.add(tx_hash)
+                    break
+
+        self._waiter_counts[tx_hash] += 1
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.ensure_future(self._watch_blocks())
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            raise TimeExhausted(f"Transaction {tx_hash.hex()} is not in the chain after {timeout} seconds")
+        finally:
+            remaining = self._waiter_counts.get(tx_hash, 1) - 1
+            if remaining > 0:
+                self._waiter_counts[tx_hash] = remaining
+            else:
+                self._waiter_counts.pop(tx_hash, None)
+                self._waiters.pop(tx_hash, None)
+                self._unresolved.discard(tx_hash)
+
+    async def _watch_blocks(self) -> None:
+        """Scan each new block once while any transaction is waiting"""
+        while self._waiters:
+            try:
+                head = await self.blockchain._rpc(lambda: self.blockchain.active_w3.eth.block_number)
+                if self._last_block is None:
+                    # Start one block back in case the tx landed in the current head
+                    self._last_block = head - 1
+
+                for block_number in range(self._last_block + 1, head + 1):
+                    await self._scan_block(block_number)
+                    self._last_block = block_number
+
+                if self._unresolved:
+                    await asyncio.gather(*(self._resolve(tx_hash) for tx_hash in list(self._unresolved)))
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"Receipt tracker block scan failed: {e}")
+
+            await asyncio.sleep(self.poll_interval)
+
+        # Idle - the next transaction starts from its own head block
+        self._last_block = None
+
+    async def _scan_block(self, block_number: int) -> None:
+        block = await self.blockchain._rpc(lambda: self.blockchain.active_w3.eth.get_block(block_number))
+        block_transactions: Set[HexBytes] = {HexBytes(tx) for tx in block['transactions']}
+        self._recent.append((block_number, block_transactions))
+        self.stats['blocks_scanned'] += 1
+
+        self._unresolved.update(tx_hash for tx_hash in self._waiters if tx_hash in block_transactions)
+
+    async def _resolve(self, tx_hash: HexBytes) -> None:
+        future = self._waiters.get(tx_hash)
+        if future is None or future.done():
+            self._unresolved.discard(tx_hash)
+            return
+        try:
+            receipt = await self.blockchain._rpc(lambda: self.blockchain.active_w3.eth.get_transaction_receipt(tx_hash))
+            self._unresolved.discard(tx_hash)
+            if not future.done():
+                future.set_result(receipt)
+                self.stats['confirmed'] += 1
+        except Exception as e:
+            # Receipt not indexed yet - retried on the next pass
+            logging.debug(f"Receipt for {tx_hash.hex()} not available yet: {e}")
+
+    async def close(self) -> None:
+        """Stop watching blocks and fail any outstanding waiters"""
+        if self._watch_task and not self._watch_task.done():
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+        for future in self._waiters.values():
+            if not future.done():
+                future.cancel()
+        self._waiters.clear()
+        self._waiter_counts.clear()
+        self._unresolved.clear()
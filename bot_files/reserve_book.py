@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Sync-Driven Reserve Book
+Keeps V2 pair reserves in memory from Sync logs so prices and quotes need no RPC calls
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Any, Callable, Iterable, List, Optional, Set, Tuple
+
+import websockets
+from hexbytes import HexBytes
+from web3 import Web3
+from colorama import Fore, Style
+
+SYNC_TOPIC = "0x1c411e9a96e071241c2f21f7726b17ae89e3cab4c78be50e062b03a9fffbbad1"
+
+# A refresh reflects the whole block it was read at - later Sync logs in that block are no newer
+REFRESH_LOG_INDEX = 2**31
+
+class ReserveBook:
+    def __init__(self, config: Dict[str, Any], blockchain_interface):
+        self.config = config
+        self.blockchain = blockchain_interface
+        self.ws_endpoints: List[str] = config['blockchain'].get('ws_endpoints', [])
+        self.max_ws_failures = config['blockchain'].get('ws_max_consecutive_failures', 5)
+
+        book_config = config['blockchain'].get('reserve_book', {})
+        self.enabled = book_config.get('enabled', True)
+        self.poll_interval = book_config.get('poll_interval_seconds', 1.0)
+        self.max_staleness = book_config.get('max_staleness_seconds', 15)
+        self.max_log_range = book_config.get('max_log_range_blocks', 500)
+
+        # pair -> {'reserve0', 'reserve1', 'block', 'log_index', 'updated_at'}
+        self.reserves: Dict[str, Dict[str, Any]] = {}
+        self.pairs: Set[str] = set()
+        self._needs_refresh: Set[str] = set()
+        self._pairs_changed = asyncio.Event()
+
+        # Last time the whole book was confirmed in step with the chain
+        self.synced_at = 0.0
+        self.last_block: Optional[int] = None
+
+        self.stats = {
+            'sync_events': 0,
+            'refreshes': 0,
+            'hits': 0,
+            'stale_misses': 0
+        }
+
+    def track(self, pair_address: str) -> None:
+        """Start following a pair's Sync logs"""
+        if not self.enabled:
+            return
+        pair_address = Web3.to_checksum_address(pair_address)
+        if pair_address not in self.pairs:
+            self.pairs.add(pair_address)
+            self._needs_refresh.add(pair_address)
+            self._pairs_changed.set()
+
+    def untrack(self, pair_address: str) -> None:
+        """Stop following a pair"""
+        pair_address = Web3.to_checksum_address(pair_address)
+        if pair_address in self.pairs:
+            self.pairs.discard(pair_address)
+            self._needs_refresh.discard(pair_address)
+            self.reserves.pop(pair_address, None)
+            self._pairs_changed.set()
+
+    def get_reserves(self, pair_address: str) -> Optional[Tuple[int, int]]:
+        """(reserve0, reserve1) from local state, None if untracked or stale"""
+        entry = self.reserves.get(Web3.to_checksum_address(pair_address))
+        if entry is None:
+            return None
+        if self.is_stale(pair_address):
+            self.stats['stale_misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return entry['reserve0'], entry['reserve1']
+
+    def get_update_age(self, pair_address: str) -> Optional[float]:
+        """Seconds since the pair's reserves were last confirmed against the chain"""
+        entry = self.reserves.get(Web3.to_checksum_address(pair_address))
+        if entry is None:
+            return None
+        # A quiet pair is still current as long as the feed itself is alive
+        return time.time() - max(entry['updated_at'], self.synced_at)
+
+    def is_stale(self, pair_address: str) -> bool:
+        age = self.get_update_age(pair_address)
+        return age is None or age > self.max_staleness
+
+    async def run(self, is_running: Callable[[], bool]) -> None:
+        """Follow Sync logs for tracked pairs until is_running() is False"""
+        if not self.enabled:
+            return
+
+        failures = 0
+        endpoint_index = 0
+        while is_running():
+            try:
+                if self.ws_endpoints and failures < self.max_ws_failures:
+                    await self._stream(self.ws_endpoints[endpoint_index % len(self.ws_endpoints)], is_running)
+                    failures = 0
+                else:
+                    await self._poll_once()
+                    await asyncio.sleep(self.poll_interval)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.ws_endpoints and failures < self.max_ws_failures:
+                    failures += 1
+                    endpoint_index += 1
+                    if failures >= self.max_ws_failures:
+                        logging.error(f"{Fore.RED}❌ Reserve book WebSocket failed {failures} times, polling Sync logs over HTTP{Style.RESET_ALL}")
+                    else:
+                        await asyncio.sleep(min(30, 2 ** (failures - 1)))
+                else:
+                    logging.warning(f"Reserve book update failed: {e}")
+                    await asyncio.sleep(self.poll_interval)
+
+    async def _stream(self, ws_url: str, is_running: Callable[[], bool]) -> None:
+        async with websockets.connect(ws_url, ping_interval=20, ping_timeout=20, max_size=2**22) as ws:
+            request_id = 0
+            active_subscriptions: Set[str] = set()
+            pending_subscribe: Optional[int] = None
+
+            async def subscribe() -> int:
+                nonlocal request_id
+                request_id += 1
+                self._pairs_changed.clear()
+                await ws.send(json.dumps({
+                    'jsonrpc': '2.0',
+                    'id': request_id,
+                    'method': 'eth_subscribe',
+                    'params': ['logs', {'address': sorted(self.pairs), 'topics': [SYNC_TOPIC]}]
+                }))
+                return request_id
+
+            if self.pairs:
+                pending_subscribe = await subscribe()
+
+            last_heartbeat = time.time()
+            while is_running():
+                if self._pairs_changed.is_set() and pending_subscribe is None and self.pairs:
+                    # Overlapping subscriptions are harmless - Sync carries absolute reserves
+                    pending_subscribe = await subscribe()
+
+                try:
+                    message = json.loads(await asyncio.wait_for(ws.recv(), timeout=1))
+                except asyncio.TimeoutError:
+                    message = None
+
+                if message and message.get('id') == pending_subscribe:
+                    if 'error' in message:
+                        raise ConnectionError(f"eth_subscribe rejected: {message['error']}")
+                    # Cover anything emitted before the subscription was live - every pair after a
+                    # (re)connect, only newly tracked pairs when the old subscription overlapped
+                    stale_pairs = self._needs_refresh if active_subscriptions else self.pairs
+                    for old_subscription in active_subscriptions:
+                        request_id += 1
+                        await ws.send(json.dumps({'jsonrpc': '2.0', 'id': request_id,
+                                                  'method': 'eth_unsubscribe', 'params': [old_subscription]}))
+                    active_subscriptions = {message['result']}
+                    pending_subscribe = None
+                    await self.refresh(stale_pairs)
+                    self.synced_at = time.time()
+
+                elif message and message.get('params', {}).get('subscription') in active_subscriptions:
+                    raw_log = message['params']['result']
+                    if not raw_log.get('removed'):
+                        self._apply_sync(raw_log)
+
+                if time.time() - last_heartbeat >= self.poll_interval and not pending_subscribe:
+                    # Connection is alive and subscribed - quiet pairs are still current
+                    if active_subscriptions or not self.pairs:
+                        self.synced_at = time.time()
+                    last_heartbeat = time.time()
+
+    async def _poll_once(self) -> None:
+        """One eth_getLogs over every tracked pair since the last covered block"""
+        head = await self.blockchain._rpc(lambda: self.blockchain.active_w3.eth.block_number)
+
+        if not self.pairs or self.last_block is None or head - self.last_block > self.max_log_range:
+            # First pass, or too far behind - a direct read is cheaper than replaying logs
+            await self.refresh(self.pairs, head)
+            self.last_block = head
+            self.synced_at = time.time()
+            return
+
+        if self._needs_refresh:
+            await self.refresh(self._needs_refresh, head)
+
+        if head > self.last_block:
+            logs = await self.blockchain._rpc(lambda: self.blockchain.active_w3.eth.get_logs({
+                'address': sorted(self.pairs),
+                'topics': [SYNC_TOPIC],
+                'fromBlock': self.last_block + 1,
+                'toBlock': head
+            }))
+            for log in logs:
+                if not log.get('removed'):
+                    self._apply_sync(log)
+            self.last_block = head
+        self.synced_at = time.time()
+
+    async def refresh(self, pairs: Iterable[str], block_number: Optional[int] = None) -> None:
+        """Read reserves directly for the given pairs in one multicall"""
+        pairs = list(pairs)
+        if not pairs:
+            return
+        if block_number is None:
+            block_number = await self.blockchain._rpc(lambda: self.blockchain.active_w3.eth.block_number)
+
+        pair_contracts = [
+            self.blockchain.active_w3.eth.contract(address=pair_address, abi=self.blockchain.pair_abi)
+            for pair_address in pairs
+        ]
+        results = await self.blockchain.multicall.aggregate(
+            [(pair_contract, 'getReserves', []) for pair_contract in pair_contracts]
+        )
+
+        now = time.time()
+        for pair_address, reserves in zip(pairs, results):
+            if reserves is None or pair_address not in self.pairs:
+                continue
+            self._set_reserves(pair_address, reserves[0], reserves[1], block_number, REFRESH_LOG_INDEX, now)
+            self._needs_refresh.discard(pair_address)
+        self.stats['refreshes'] += 1
+
+    def _apply_sync(self, log: Dict[str, Any]) -> None:
+        pair_address = Web3.to_checksum_address(log['address'])
+        if pair_address not in self.pairs:
+            return
+
+        data = HexBytes(log['data'])
+        reserve0 = int.from_bytes(data[:32], 'big')
+        reserve1 = int.from_bytes(data[32:64], 'big')
+        block_number = self._as_int(log['blockNumber'])
+        log_index = self._as_int(log['logIndex'])
+
+        if self._set_reserves(pair_address, reserve0, reserve1, block_number, log_index, time.time()):
+            self._needs_refresh.discard(pair_address)
+            self.stats['sync_events'] += 1
+
+    def _set_reserves(self, pair_address: str, reserve0: int, reserve1: int,
+                      block_number: int, log_index: int, updated_at: float) -> bool:
+        current = self.reserves.get(pair_address)
+        if current and (current['block'], current['log_index']) > (block_number, log_index):
+            # Out-of-order or replayed log
+            return False
+        self.reserves[pair_address] = {
+            'reserve0': reserve0,
+            'reserve1': reserve1,
+            'block': block_number,
+            'log_index': log_index,
+            'updated_at': updated_at
+        }
+        return True
+
+    @staticmethod
+    def _as_int(value: Any) -> int:
+        return int(value, 16) if isinstance(value, str) else int(value)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Tracked pairs, update counters and feed freshness"""
+        return {
+            **self.stats,
+            'tracked_pairs': len(self.pairs),
+            'last_block': self.last_block,
+            'feed_age_seconds': round(time.time() - self.synced_at, 1) if self.synced_at else None
+        }
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Latency-Scored RPC Endpoint Pool
+Routes every call to the healthiest endpoint with hedged reads and live failover
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from colorama import Fore, Style
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+# Calls that must not be duplicated across nodes or depend on node-local state
+UNHEDGED_METHODS = {
+    'eth_sendRawTransaction',
+    'eth_sendTransaction',
+    'eth_newFilter',
+    'eth_newBlockFilter',
+    'eth_getFilterChanges',
+    'eth_uninstallFilter',
+    'eth_subscribe',
+    'eth_unsubscribe'
+}
+
+# JSON-RPC error fragments that mean this node cannot serve the call right now - another node may
+NODE_ERRORS = ('rate limit', 'limit exceeded', 'too many requests', 'header not found', 'missing trie node',
+               'state not available', 'state is not available', 'unknown block', 'timed out', 'timeout', 'busy')
+
+# Errors about the request itself (log ranges, result sizes) - every node answers them the same
+REQUEST_ERRORS = ('range', 'returned more than')
+
+class RPCNodeError(Exception):
+    """JSON-RPC error payload from a node that is throttled or behind"""
+
+    def __init__(self, response: Dict[str, Any]):
+        super().__init__(response['error'])
+        self.response = response
+
+def is_node_error(response: Dict[str, Any]) -> bool:
+    """Whether a response is a node-side failure rather than a result or a genuine revert"""
+    error = response.get('error') if isinstance(response, dict) else None
+    if not error:
+        return False
+    message = str(error.get('message', error) if isinstance(error, dict) else error).lower()
+    if any(fragment in message for fragment in REQUEST_ERRORS):
+        return False
+    return (isinstance(error, dict) and error.get('code') == 429) or any(fragment in message for fragment in NODE_ERRORS)
+
+class RPCEndpoint:
+    """Rolling latency/error statistics for one RPC node"""
+
+    def __init__(self, url: str, provider, latency_window: int = 100):
+        self.url = url
+        self.provider = provider
+        self.latencies = deque(maxlen=latency_window)
+        self.error_rate = 0.0
+        self.consecutive_errors = 0
+        self.head_block = 0
+        self.ejected = False
+        self.requests = 0
+        self.successes = 0
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.error_rate *= 0.9
+        self.consecutive_errors = 0
+
+    def record_error(self) -> None:
+        self.error_rate = self.error_rate * 0.9 + 0.1
+        self.consecutive_errors += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    @property
+    def score(self) -> float:
+        """Lower is better - blended p50/p95 latency inflated by recent errors"""
+        median = self.percentile(50)
+        if median is None:
+            # Never tried is worth a try; only ever failed goes last
+            return float('inf') if self.error_rate else 0.0
+        return (median + self.percentile(95)) / 2 * (1 + 4 * self.error_rate)
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50 = self.percentile(50)
+        p95 = self.percentile(95)
+        return {
+            'url': self.url,
+            'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+            'p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+            'error_rate': round(self.error_rate, 3),
+            'head_block': self.head_block,
+            'ejected': self.ejected,
+            'requests': self.requests,
+            'successes': self.successes
+        }
+
+
+class RPCEndpointPool(AsyncJSONBaseProvider):
+    def __init__(self, endpoints: List[RPCEndpoint], pool_config: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        pool_config = pool_config or {}
+        self.endpoints = endpoints
+        self.hedge_reads = pool_config.get('hedge_reads', True)
+        self.hedge_min_delay = pool_config.get('hedge_min_delay_ms', 50) / 1000
+        self.hedge_max_delay = pool_config.get('hedge_max_delay_ms', 1000) / 1000
+        self.max_block_lag = pool_config.get('max_block_lag', 3)
+        self.max_consecutive_errors = pool_config.get('max_consecutive_errors', 3)
+        self.health_timeout = pool_config.get('health_check_timeout_seconds', 5)
+
+    def __str__(self) -> str:
+        return f"RPC pool ({len(self.endpoints)} endpoints)"
+
+    @property
+    def endpoint_uri(self) -> str:
+        return self.ranked_endpoints()[0].url
+
+    def ranked_endpoints(self) -> List[RPCEndpoint]:
+        """Healthy endpoints best-first; every endpoint if all are ejected"""
+        healthy = [endpoint for endpoint in self.endpoints if not endpoint.ejected]
+        return sorted(healthy or self.endpoints, key=lambda endpoint: endpoint.score)
+
+    async def make_request(self, method: str, params: Any) -> Dict[str, Any]:
+        """Route a request to the best endpoint, hedging reads and failing over on errors"""
+        candidates = self.ranked_endpoints()
+        hedge = self.hedge_reads and method not in UNHEDGED_METHODS
+        return await self._request_with_failover(method, params, candidates, hedge)
+
+    async def _request_with_failover(self, method: str, params: Any,
+                                     candidates: List[RPCEndpoint], hedge: bool) -> Dict[str, Any]:
+        pending = set()
+        next_index = 0
+        last_error: Optional[BaseException] = None
+
+        def launch():
+            nonlocal next_index
+            endpoint = candidates[next_index]
+            next_index += 1
+            pending.add(asyncio.ensure_future(self._timed_request(endpoint, method, params)))
+
+        launch()
+        try:
+            while pending:
+                # Hedge once the primary is slower than its own p95
+                can_hedge = hedge and next_index < len(candidates) and len(pending) < 2
+                timeout = self._hedge_delay(candidates[0]) if can_hedge else None
+
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch()
+                    continue
+
+                for task in done:
+                    pending.discard(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+
+                # Live failover - every in-flight attempt failed
+                if not pending and next_index < len(candidates):
+                    launch()
+
+            if isinstance(last_error, RPCNodeError):
+                # No node could serve it - hand back the error payload as a single node would
+                return last_error.response
+            raise last_error
+
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _timed_request(self, endpoint: RPCEndpoint, method: str, params: Any) -> Dict[str, Any]:
+        endpoint.requests += 1
+        start = time.monotonic()
+        try:
+            response = await endpoint.provider.make_request(method, params)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            endpoint.record_error()
+            logging.debug(f"RPC {endpoint.url} failed {method}: {e}")
+            raise
+        if is_node_error(response):
+            endpoint.record_error()
+            logging.debug(f"RPC {endpoint.url} could not serve {method}: {response['error']}")
+            raise RPCNodeError(response)
+        endpoint.record_success(time.monotonic() - start)
+        endpoint.successes += 1
+        return response
+
+    def _hedge_delay(self, endpoint: RPCEndpoint) -> float:
+        p95 = endpoint.percentile(95)
+        if p95 is None or len(endpoint.latencies) < 5:
+            return self.hedge_max_delay
+        return min(self.hedge_max_delay, max(self.hedge_min_delay, p95))
+
+    async def check_health(self) -> None:
+        """Refresh head blocks and eject endpoints that error or lag behind the best head"""
+        results = await asyncio.gather(
+            *(asyncio.wait_for(self._timed_request(endpoint, 'eth_blockNumber', []), timeout=self.health_timeout)
+              for endpoint in self.endpoints),
+            return_exceptions=True
+        )
+
+        for endpoint, result in zip(self.endpoints, results):
+            if isinstance(result, asyncio.TimeoutError):
+                endpoint.record_error()
+            if isinstance(result, Exception) or 'result' not in result:
+                continue
+            endpoint.head_block = int(result['result'], 16)
+            if hasattr(endpoint.provider, 'set_latest_block'):
+                endpoint.provider.set_latest_block(endpoint.head_block)
+
+        best_head = max(endpoint.head_block for endpoint in self.endpoints)
+        for endpoint in self.endpoints:
+            lagging = best_head - endpoint.head_block > self.max_block_lag
+            failing = endpoint.consecutive_errors >= self.max_consecutive_errors
+            should_eject = lagging or failing
+
+            if should_eject and not endpoint.ejected:
+                reason = f"{best_head - endpoint.head_block} blocks behind" if lagging else "repeated errors"
+                logging.warning(f"{Fore.YELLOW}⚠️ Ejecting RPC {endpoint.url} ({reason}){Style.RESET_ALL}")
+            elif not should_eject and endpoint.ejected:
+                logging.info(f"{Fore.GREEN}✅ RPC {endpoint.url} back in rotation{Style.RESET_ALL}")
+            endpoint.ejected = should_eject
+
+    def get_metrics(self) -> List[Dict[str, Any]]:
+        """Per-endpoint latency, error and head statistics"""
+        return [endpoint.snapshot() for endpoint in self.endpoints]
+
+    async def close(self) -> None:
+        """Close every endpoint's HTTP session"""
+        for endpoint in self.endpoints:
+            if hasattr(endpoint.provider, 'close'):
+                await endpoint.provider.close()
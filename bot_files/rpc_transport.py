@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+JSON-RPC Batch Transport
+Coalesces requests issued in the same event-loop tick into one HTTP batch
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import aiohttp
+from web3 import AsyncHTTPProvider
+
+# Reads whose result only depends on the block they are evaluated against
+BLOCK_SCOPED_METHODS = {'eth_call', 'eth_getBalance'}
+
+# Results that never change for the lifetime of a connection
+IMMUTABLE_METHODS = {'eth_chainId', 'net_version'}
+
+class BatchingHTTPProvider(AsyncHTTPProvider):
+    def __init__(self, endpoint_uri: str, request_kwargs: Optional[Dict[str, Any]] = None,
+                 max_batch_size: int = 20, latest_cache_ttl: float = 1.0, cache_size: int = 2048):
+        super().__init__(endpoint_uri, request_kwargs=request_kwargs)
+        self.max_batch_size = max_batch_size
+        self.latest_cache_ttl = latest_cache_ttl
+        self.cache_size = cache_size
+
+        # Requests waiting for the next flush: (request dict, dedupe key, future)
+        self._pending: List[Tuple[Dict[str, Any], Optional[str], asyncio.Future]] = []
+        self._flush_scheduled = False
+        self._batch_tasks = set()
+
+        # Identical block-scoped reads share one in-flight future
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+        # key -> (response, block number it was read at, time cached)
+        self._results: OrderedDict = OrderedDict()
+        self.latest_block: Optional[int] = None
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop = None
+        self._next_id = 0
+
+        self.stats = {
+            'requests': 0,
+            'http_batches': 0,
+            'deduplicated': 0,
+            'cache_hits': 0
+        }
+
+    async def make_request(self, method: str, params: Any) -> Dict[str, Any]:
+        """Queue a request for the current tick's batch and wait for its response"""
+        self.stats['requests'] += 1
+        request = json.loads(self.encode_rpc_request(method, params))
+        key = self._dedupe_key(method, request['params'])
+
+        if key is not None:
+            cached = self._cached_result(key)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                return dict(cached, id=request['id'])
+
+            shared = self._in_flight.get(key)
+            if shared is not None:
+                self.stats['deduplicated'] += 1
+                response = await asyncio.shield(shared)
+                return dict(response, id=request['id'])
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # A cancelled caller (e.g. a fail-fast security check) leaves nobody to read a failure
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        if key is not None:
+            self._in_flight[key] = future
+        self._pending.append((request, key, future))
+
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._schedule_flush)
+
+        response = await asyncio.shield(future)
+        return dict(response, id=request['id'])
+
+    def set_latest_block(self, block_number: int) -> None:
+        """Advance the head block, dropping results read against an older 'latest'"""
+        if self.latest_block is not None and block_number <= self.latest_block:
+            return
+        self.latest_block = block_number
+        for key in [k for k, (_, block, _) in self._results.items() if block is not None]:
+            del self._results[key]
+
+    async def close(self) -> None:
+        """Close the HTTP session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _dedupe_key(self, method: str, params: Any) -> Optional[str]:
+        if method not in BLOCK_SCOPED_METHODS and method not in IMMUTABLE_METHODS:
+            return None
+        return json.dumps([method, params], sort_keys=True)
+
+    def _is_latest_read(self, method: str, params: Any) -> bool:
+        return method in BLOCK_SCOPED_METHODS and (not params or params[-1] in ('latest', 'pending'))
+
+    def _cached_result(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        response, block, cached_at = entry
+        if block is not None and (block != self.latest_block or time.monotonic() - cached_at > self.latest_cache_ttl):
+            del self._results[key]
+            return None
+        self._results.move_to_end(key)
+        return response
+
+    def _store_result(self, request: Dict[str, Any], key: str, response: Dict[str, Any]) -> None:
+        if 'error' in response:
+            return
+        # 'latest' reads are tagged with the head block so they expire when it moves
+        is_latest = self._is_latest_read(request['method'], request['params'])
+        if is_latest and self.latest_block is None:
+            return
+        block = self.latest_block if is_latest else None
+        self._results[key] = (response, block, time.monotonic())
+        if len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+
+    def _schedule_flush(self) -> None:
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, []
+        for start in range(0, len(pending), self.max_batch_size):
+            task = asyncio.ensure_future(self._send_batch(pending[start:start + self.max_batch_size]))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _send_batch(self, batch: List[Tuple[Dict[str, Any], Optional[str], asyncio.Future]]) -> None:
+        """POST one JSON-RPC batch and resolve each waiting future"""
+        try:
+            # Each request in a batch needs a unique id on the wire
+            wire_requests = []
+            for request, _, _ in batch:
+                self._next_id += 1
+                wire_requests.append(dict(request, id=self._next_id))
+
+            if len(wire_requests) == 1:
+                responses = [await self._post(wire_requests[0])]
+            else:
+                responses = await self._post(wire_requests)
+                if not isinstance(responses, list):
+                    # Endpoint rejected batching - resend individually
+                    logging.warning(f"RPC batch rejected by {self.endpoint_uri}, sending individually")
+                    responses = await asyncio.gather(*(self._post(r) for r in wire_requests))
+            self.stats['http_batches'] += 1
+
+            by_id = {response.get('id'): response for response in responses if isinstance(response, dict)}
+            for wire_request, (request, key, future) in zip(wire_requests, batch):
+                response = by_id.get(wire_request['id'])
+                if response is None:
+                    response = {'jsonrpc': '2.0', 'error': {'code': -32603, 'message': 'Missing response in RPC batch'}}
+                if request['method'] == 'eth_blockNumber' and 'result' in response:
+                    self.set_latest_block(int(response['result'], 16))
+                if key is not None:
+                    self._store_result(request, key, response)
+                if not future.done():
+                    future.set_result(response)
+
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+        finally:
+            for _, key, future in batch:
+                if key is not None and self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+
+    async def _post(self, payload: Any) -> Any:
+        session = await self._get_session()
+        async with session.post(self.endpoint_uri, json=payload, **self._post_kwargs()) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    def _post_kwargs(self) -> Dict[str, Any]:
+        kwargs = dict(self.get_request_kwargs())
+        headers = kwargs.pop('headers', {})
+        return {'headers': headers, **kwargs}
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = aiohttp.ClientSession()
+            self._session_loop = loop
+        return self._session
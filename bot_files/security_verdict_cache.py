@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Security Verdict Cache
+TTL cache of comprehensive security verdicts with long-lived negative entries, persisted in SQLite
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from web3 import Web3
+
+# Token properties (from GoPlus or the token's own bytecode) that no later liquidity or holder change will undo
+DEFINITE_REJECTIONS = (
+    "Detected as honeypot",
+    "Token is blacklisted",
+    "Token is mintable",
+    "Ownership can be reclaimed",
+    "Clone of",
+    "Exposes blacklisted functions"
+)
+
+# Reasons that say a check could not run, not that the token is bad
+TRANSIENT_FAILURES = ("error", "unavailable", "failed", "not found")
+
+# Pair slot for verdicts that hold for every pair of a token
+ANY_PAIR = "*"
+
+class SecurityVerdictCache:
+    def __init__(self, config: Dict[str, Any]):
+        cache_config = config['security'].get('verdict_cache', {})
+        self.enabled = cache_config.get('enabled', True)
+        self.cache_file = cache_config.get('cache_file', 'security_verdicts.db')
+        self.ttl = cache_config.get('ttl_seconds', 60)
+        self.negative_ttl = cache_config.get('negative_ttl_seconds', 86400)
+        self.max_memory_entries = cache_config.get('max_memory_entries', 5000)
+        self.config_hash = self.hash_config(config)
+
+        # (token, pair) -> (is_safe, reasons, details, expires_at)
+        self._memory: OrderedDict = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.stats = {
+            'hits': 0,
+            'negative_hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'writes': 0,
+            'skipped': 0
+        }
+
+        if not self.enabled:
+            return
+        try:
+            self._db = sqlite3.connect(self.cache_file)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts (token TEXT NOT NULL, pair TEXT NOT NULL, config_hash TEXT NOT NULL, "
+                "is_safe INTEGER NOT NULL, reasons TEXT NOT NULL, details TEXT NOT NULL, expires_at REAL NOT NULL, "
+                "PRIMARY KEY (token, pair, config_hash))"
+            )
+            self._db.execute("DELETE FROM verdicts WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+        except Exception as e:
+            logging.warning(f"Security verdict disk cache unavailable ({e}), using memory only")
+            self._db = None
+
+    @staticmethod
+    def hash_config(config: Dict[str, Any]) -> str:
+        """Hash of every setting a verdict depends on - a config change starts a fresh cache"""
+        trading = config.get('trading', {})
+        relevant = {
+            'security': {key: value for key, value in config.get('security', {}).items() if key != 'verdict_cache'},
+            'advanced_checks': config.get('advanced_checks', {}),
+            'trading': {key: trading.get(key) for key in ('max_buy_tax', 'max_sell_tax', 'min_holders', 'min_liquidity_usd')}
+        }
+        return hashlib.sha256(json.dumps(relevant, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    def get(self, token_address: str, pair_address: str) -> Optional[Tuple[bool, List[str], Dict[str, Any]]]:
+        """Cached (is_safe, failed_reasons, detailed_results), None on miss or expiry"""
+        if not self.enabled:
+            return None
+        token_address = Web3.to_checksum_address(token_address)
+
+        # A definite rejection of the token covers every pair it shows up in
+        negative = self._lookup(token_address, ANY_PAIR)
+        if negative is not None:
+            self.stats['negative_hits'] += 1
+            return negative
+
+        entry = self._lookup(token_address, Web3.to_checksum_address(pair_address))
+        if entry is not None:
+            self.stats['hits'] += 1
+            return entry
+
+        self.stats['misses'] += 1
+        return None
+
+    def _lookup(self, token_address: str, pair_address: str) -> Optional[Tuple[bool, List[str], Dict[str, Any]]]:
+        key = (token_address, pair_address)
+        entry = self._memory.get(key)
+
+        if entry is None and self._db is not None:
+            try:
+                row = self._db.execute(
+                    "SELECT is_safe, reasons, details, expires_at FROM verdicts WHERE token = ? AND pair = ? AND config_hash = ?",
+                    (token_address, pair_address, self.config_hash)
+                ).fetchone()
+                if row is not None:
+                    entry = (bool(row[0]), json.loads(row[1]), json.loads(row[2]), row[3])
+                    self._remember(key, entry)
+            except Exception as e:
+                logging.warning(f"Security verdict disk read failed: {e}")
+
+        if entry is None:
+            return None
+        if entry[3] < time.time():
+            self.stats['expired'] += 1
+            self._memory.pop(key, None)
+            return None
+        return entry[0], entry[1], entry[2]
+
+    def put(self, token_address: str, pair_address: str, is_safe: bool,
+            failed_reasons: List[str], detailed_results: Dict[str, Any]) -> None:
+        """Cache a verdict with a TTL chosen from why it failed"""
+        if not self.enabled:
+            return
+        token_address = Web3.to_checksum_address(token_address)
+
+        ttl, pair_key = self.classify(is_safe, failed_reasons)
+        if ttl <= 0:
+            # Only errors - the next look should really re-run the checks
+            self.stats['skipped'] += 1
+            return
+        pair_key = pair_key or Web3.to_checksum_address(pair_address)
+
+        expires_at = time.time() + ttl
+        self._remember((token_address, pair_key), (is_safe, list(failed_reasons), detailed_results, expires_at))
+        self.stats['writes'] += 1
+
+        if self._db is not None:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO verdicts (token, pair, config_hash, is_safe, reasons, details, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (token_address, pair_key, self.config_hash, int(is_safe), json.dumps(failed_reasons),
+                     json.dumps(detailed_results, default=str), expires_at)
+                )
+                self._db.commit()
+            except Exception as e:
+                logging.warning(f"Security verdict disk write failed: {e}")
+
+    def _remember(self, key: Tuple[str, str], entry: Tuple[bool, List[str], Dict[str, Any], float]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def classify(self, is_safe: bool, failed_reasons: List[str]) -> Tuple[float, Optional[str]]:
+        """(ttl, pair slot) for a verdict - ANY_PAIR for definite rejections, None for this pair"""
+        if is_safe:
+            return self.ttl, None
+        if any(marker in reason for reason in failed_reasons for marker in DEFINITE_REJECTIONS):
+            return self.negative_ttl, ANY_PAIR
+        if all(any(marker in reason.lower() for marker in TRANSIENT_FAILURES) for reason in failed_reasons):
+            return 0, None
+        # Liquidity, tax and holder rejections can change within minutes
+        return self.ttl, None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Hit counts and overall hit rate"""
+        hits = self.stats['hits'] + self.stats['negative_hits']
+        lookups = hits + self.stats['misses']
+        return {
+            **self.stats,
+            'memory_entries': len(self._memory),
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0
+        }
+
+    def close(self) -> None:
+        """Close the on-disk store"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Immutable Token Metadata Cache
+In-memory LRU in front of an on-disk SQLite store for data that never changes on-chain
+"""
+
+import json
+import logging
+import sqlite3
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from web3 import Web3
+
+class TokenMetadataCache:
+    """Token name/symbol/decimals and pair token0/token1 keyed by checksum address"""
+
+    def __init__(self, cache_file: str = 'token_metadata.db', max_memory_entries: int = 5000):
+        self.cache_file = cache_file
+        self.max_memory_entries = max_memory_entries
+        self._memory: OrderedDict = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'writes': 0
+        }
+
+        try:
+            self._db = sqlite3.connect(cache_file)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS metadata (address TEXT PRIMARY KEY, kind TEXT NOT NULL, data TEXT NOT NULL)"
+            )
+            self._db.commit()
+        except Exception as e:
+            logging.warning(f"Token metadata disk cache unavailable ({e}), using memory only")
+            self._db = None
+
+    def get_token(self, token_address: str) -> Optional[Dict[str, Any]]:
+        """Cached {'name', 'symbol', 'decimals'} for a token, None on miss"""
+        return self._get('token', token_address)
+
+    def put_token(self, token_address: str, name: str, symbol: str, decimals: int) -> None:
+        self._put('token', token_address, {'name': name, 'symbol': symbol, 'decimals': decimals})
+
+    def get_pair(self, pair_address: str) -> Optional[Tuple[str, str]]:
+        """Cached (token0, token1) for a pair, None on miss"""
+        entry = self._get('pair', pair_address)
+        return (entry['token0'], entry['token1']) if entry else None
+
+    def put_pair(self, pair_address: str, token0: str, token1: str) -> None:
+        self._put('pair', pair_address, {
+            'token0': Web3.to_checksum_address(token0),
+            'token1': Web3.to_checksum_address(token1)
+        })
+
+    def _get(self, kind: str, address: str) -> Optional[Dict[str, Any]]:
+        key = (kind, Web3.to_checksum_address(address))
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.stats['memory_hits'] += 1
+            return entry
+
+        if self._db is not None:
+            try:
+                row = self._db.execute(
+                    "SELECT data FROM metadata WHERE address = ? AND kind = ?", (key[1], kind)
+                ).fetchone()
+                if row is not None:
+                    entry = json.loads(row[0])
+                    self._remember(key, entry)
+                    self.stats['disk_hits'] += 1
+                    return entry
+            except Exception as e:
+                logging.warning(f"Token metadata disk read failed: {e}")
+
+        self.stats['misses'] += 1
+        return None
+
+    def _put(self, kind: str, address: str, entry: Dict[str, Any]) -> None:
+        key = (kind, Web3.to_checksum_address(address))
+        if self._memory.get(key) == entry:
+            return
+        self._remember(key, entry)
+        self.stats['writes'] += 1
+
+        if self._db is not None:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO metadata (address, kind, data) VALUES (?, ?, ?)",
+                    (key[1], kind, json.dumps(entry))
+                )
+                self._db.commit()
+            except Exception as e:
+                logging.warning(f"Token metadata disk write failed: {e}")
+
+    def _remember(self, key: Tuple[str, str], entry: Dict[str, Any]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Hit counts and overall hit rate"""
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        lookups = hits + self.stats['misses']
+        return {
+            **self.stats,
+            'memory_entries': len(self._memory),
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0
+        }
+
+    def close(self) -> None:
+        """Close the on-disk store"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Raw Transaction Fan-Out
+Broadcasts each signed transaction to every healthy RPC endpoint at once
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple
+
+from hexbytes import HexBytes
+from web3 import Web3
+
+from nonce_manager import NonceManager
+
+class TransactionBroadcaster:
+    def __init__(self, blockchain_interface, max_tracked: int = 1000):
+        self.blockchain = blockchain_interface
+        self.max_tracked = max_tracked
+
+        # Own providers when there is no endpoint pool to borrow from
+        self._providers: Dict[str, Any] = {}
+        self._background = set()
+
+        # tx hash -> endpoint that accepted it first
+        self._first_accepted: OrderedDict = OrderedDict()
+
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+    def _targets(self) -> List[Tuple[str, Any]]:
+        if self.blockchain.rpc_pool:
+            return [(endpoint.url, endpoint.provider) for endpoint in self.blockchain.rpc_pool.ranked_endpoints()]
+
+        for url in self.blockchain.rpc_endpoints:
+            if url not in self._providers:
+                self._providers[url] = self.blockchain._create_async_provider(url)
+        return list(self._providers.items())
+
+    def _endpoint_stats(self, url: str) -> Dict[str, Any]:
+        return self.stats.setdefault(url, {
+            'accepted': 0,
+            'already_known': 0,
+            'errors': 0,
+            'first_accepted': 0,
+            'inclusions': 0,
+            'latencies': []
+        })
+
+    async def broadcast(self, raw_transaction: bytes, tx_hash: HexBytes) -> HexBytes:
+        """Send to all endpoints, returning as soon as one accepts
+
+        Slower endpoints keep propagating in the background. Raises only when
+        every endpoint rejected the transaction.
+        """
+        raw_hex = Web3.to_hex(raw_transaction)
+        tx_hash = HexBytes(tx_hash)
+        targets = self._targets()
+        start = time.monotonic()
+        accepted = asyncio.get_running_loop().create_future()
+        errors: List[str] = []
+
+        async def send(url: str, provider) -> None:
+            endpoint_stats = self._endpoint_stats(url)
+            try:
+                response = await provider.make_request('eth_sendRawTransaction', [raw_hex])
+                error = response.get('error')
+            except Exception as e:
+                error = {'message': str(e)}
+
+            message = error.get('message', str(error)) if isinstance(error, dict) else str(error)
+            if error is not None and not NonceManager.is_already_known(Exception(message)):
+                endpoint_stats['errors'] += 1
+                errors.append(f"{message} ({url})")
+                return
+
+            endpoint_stats['already_known' if error is not None else 'accepted'] += 1
+            endpoint_stats['latencies'] = (endpoint_stats['latencies'] + [time.monotonic() - start])[-100:]
+            if not accepted.done():
+                accepted.set_result(url)
+                endpoint_stats['first_accepted'] += 1
+                self._remember_first(tx_hash, url)
+
+        tasks = [asyncio.ensure_future(send(url, provider)) for url, provider in targets]
+        all_sent = asyncio.gather(*tasks)
+        await asyncio.wait([accepted, all_sent], return_when=asyncio.FIRST_COMPLETED)
+
+        if not all_sent.done():
+            self._background.add(all_sent)
+            all_sent.add_done_callback(self._background.discard)
+
+        if accepted.done():
+            return tx_hash
+
+        # Surface a nonce error first so the caller can resync
+        errors.sort(key=lambda message: not NonceManager.is_nonce_error(Exception(message)))
+        raise ValueError(errors[0] if errors else "No RPC endpoint available for broadcast")
+
+    def _remember_first(self, tx_hash: HexBytes, url: str) -> None:
+        self._first_accepted[tx_hash] = url
+        if len(self._first_accepted) > self.max_tracked:
+            self._first_accepted.popitem(last=False)
+
+    def record_inclusion(self, tx_hash) -> None:
+        """Credit an included transaction to the endpoint that accepted it first"""
+        url = self._first_accepted.pop(HexBytes(tx_hash), None)
+        if url is not None:
+            self._endpoint_stats(url)['inclusions'] += 1
+
+    def get_metrics(self) -> List[Dict[str, Any]]:
+        """Per-endpoint acceptance, latency and inclusion counts"""
+        metrics = []
+        for url, endpoint_stats in self.stats.items():
+            latencies = sorted(endpoint_stats['latencies'])
+            metrics.append({
+                'url': url,
+                **{key: value for key, value in endpoint_stats.items() if key != 'latencies'},
+                'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None
+            })
+        return metrics
+
+    async def close(self) -> None:
+        """Close providers owned by the broadcaster"""
+        for provider in self._providers.values():
+            if hasattr(provider, 'close'):
+                try:
+                    await provider.close()
+                except Exception as e:
+                    logging.warning(f"Error closing broadcast provider: {e}")
+        self._providers.clear()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Off-Chain PancakeSwap V2 Quote Engine
+Integer-exact constant-product math matching PancakeLibrary, so quotes need no router calls
+"""
+
+from typing import List, Tuple
+
+from eth_utils import keccak
+from web3 import Web3
+
+PANCAKE_V2_FEE_BPS = 25
+PANCAKE_V2_INIT_CODE_HASH = "0x00fb7f630766e6a796048ea87d01acd3068e8ff67d078148a3fa3f4a84f69bd5"
+
+class V2QuoteEngine:
+    def __init__(self, factory_address: str, fee_bps: int = PANCAKE_V2_FEE_BPS,
+                 init_code_hash: str = PANCAKE_V2_INIT_CODE_HASH):
+        self.factory_address = Web3.to_checksum_address(factory_address)
+        self.fee_bps = fee_bps
+        self.init_code_hash = bytes.fromhex(init_code_hash[2:] if init_code_hash.startswith('0x') else init_code_hash)
+
+    @staticmethod
+    def sort_tokens(token_a: str, token_b: str) -> Tuple[str, str]:
+        """Order two tokens the way the factory assigns token0/token1"""
+        token_a = Web3.to_checksum_address(token_a)
+        token_b = Web3.to_checksum_address(token_b)
+        if token_a == token_b:
+            raise ValueError("IDENTICAL_ADDRESSES")
+        return (token_a, token_b) if int(token_a, 16) < int(token_b, 16) else (token_b, token_a)
+
+    def pair_for(self, token_a: str, token_b: str) -> str:
+        """CREATE2 pair address - no getPair call needed"""
+        token0, token1 = self.sort_tokens(token_a, token_b)
+        salt = keccak(bytes.fromhex(token0[2:]) + bytes.fromhex(token1[2:]))
+        digest = keccak(b'\xff' + bytes.fromhex(self.factory_address[2:]) + salt + self.init_code_hash)
+        return Web3.to_checksum_address(digest[12:])
+
+    def get_amount_out(self, amount_in: int, reserve_in: int, reserve_out: int) -> int:
+        """PancakeLibrary.getAmountOut"""
+        if amount_in <= 0:
+            raise ValueError("INSUFFICIENT_INPUT_AMOUNT")
+        if reserve_in <= 0 or reserve_out <= 0:
+            raise ValueError("INSUFFICIENT_LIQUIDITY")
+        amount_in_with_fee = amount_in * (10000 - self.fee_bps)
+        numerator = amount_in_with_fee * reserve_out
+        denominator = reserve_in * 10000 + amount_in_with_fee
+        return numerator // denominator
+
+    def get_amount_in(self, amount_out: int, reserve_in: int, reserve_out: int) -> int:
+        """PancakeLibrary.getAmountIn"""
+        if amount_out <= 0:
+            raise ValueError("INSUFFICIENT_OUTPUT_AMOUNT")
+        if reserve_in <= 0 or reserve_out <= amount_out:
+            raise ValueError("INSUFFICIENT_LIQUIDITY")
+        numerator = reserve_in * amount_out * 10000
+        denominator = (reserve_out - amount_out) * (10000 - self.fee_bps)
+        return numerator // denominator + 1
+
+    def get_amounts_out(self, amount_in: int, hop_reserves: List[Tuple[int, int]]) -> List[int]:
+        """PancakeLibrary.getAmountsOut over (reserve_in, reserve_out) for each hop"""
+        amounts = [amount_in]
+        for reserve_in, reserve_out in hop_reserves:
+            amounts.append(self.get_amount_out(amounts[-1], reserve_in, reserve_out))
+        return amounts
+
+    def get_amounts_in(self, amount_out: int, hop_reserves: List[Tuple[int, int]]) -> List[int]:
+        """PancakeLibrary.getAmountsIn over (reserve_in, reserve_out) for each hop"""
+        amounts = [amount_out]
+        for reserve_in, reserve_out in reversed(hop_reserves):
+            amounts.insert(0, self.get_amount_in(amounts[0], reserve_in, reserve_out))
+        return amounts
+
+    def price_impact(self, amount_in: int, hop_reserves: List[Tuple[int, int]]) -> float:
+        """Percent shortfall of the executed output vs the mid price, fees included"""
+        amount_out = self.get_amounts_out(amount_in, hop_reserves)[-1]
+        mid_out = float(amount_in)
+        for reserve_in, reserve_out in hop_reserves:
+            mid_out = mid_out * reserve_out / reserve_in
+        if mid_out <= 0:
+            return 100.0
+        return max(0.0, (1 - amount_out / mid_out) * 100)
+
+    @staticmethod
+    def min_amount_out(amount_out: int, slippage_percent: float) -> int:
+        """Lower bound for amountOutMin given a slippage tolerance in percent"""
+        slippage_bps = int(round(slippage_percent * 100))
+        return amount_out * (10000 - slippage_bps) // 10000
+
+    @staticmethod
+    def max_amount_in(amount_in: int, slippage_percent: float) -> int:
+        """Upper bound for amountInMax given a slippage tolerance in percent"""
+        slippage_bps = int(round(slippage_percent * 100))
+        return -(-amount_in * (10000 + slippage_bps) // 10000)
@@ -34,7 +34,8 @@ def check_required_packages():
     required_packages = [
         'web3', 'eth_account', 'requests', 'asyncio_throttle',
         'colorama', 'telegram', 'aiohttp', 'eth_utils', 
-        'eth_typing', 'hexbytes', 'websockets', 'dotenv'
+        'eth_typing', 'hexbytes', 'websockets', 'dotenv',
+        'eth', 'coincurve'
     ]
     
     missing_packages = []
@@ -57,6 +58,25 @@ def check_bot_files():
         'advanced_security_engine.py',
         'profit_management.py',
         'telegram_notifier.py',
+        'security_verdict_cache.py',
+        'bytecode_fingerprint.py',
+        'selector_scanner.py',
+        'goplus_batcher.py',
+        'local_evm.py',
+        'rpc_pool.py',
+        'rpc_transport.py',
+        'provider_guard.py',
+        'multicall.py',
+        'pair_event_stream.py',
+        'reserve_book.py',
+        'token_metadata_cache.py',
+        'tx_broadcaster.py',
+        'nonce_manager.py',
+        'gas_oracle.py',
+        'receipt_tracker.py',
+        'allowance_cache.py',
+        'v2_quote.py',
+        'bnb_price_feed.py',
         'validate_key.py',
         'config.json',
         'requirements.txt'